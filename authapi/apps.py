@@ -4,3 +4,5 @@ from django.apps import AppConfig
 class AuthapiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "authapi"
+    def ready(self):
+        from . import signals  # noqa
@@ -2,10 +2,31 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 from rest_framework.exceptions import AuthenticationFailed
 
+from .user_cache import user_cache
+
 class CookieJWTAuthentication(JWTAuthentication):
 
+    def get_user(self, validated_token):
+        # cache de usuario + permisos (authapi/user_cache.py): sin consultas en estado estable
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None and api_settings.USER_ID_FIELD == "id" else None
+        if user is None:
+            user = super().get_user(validated_token)
+            return user_cache.put(user)
+
+        # mismas validaciones que JWTAuthentication.get_user sobre la copia cacheada
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+        return user
+
     def authenticate(self, request):
         header = self.get_header(request)
         raw_token = self.get_raw_token(header) if header is not None else request.COOKIES.get("access")
@@ -1,11 +1,11 @@
 # authapi/middleware.py
-class RefreshAccessTokenMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
+from django.utils.deprecation import MiddlewareMixin
 
-    def __call__(self, request):
-        response = self.get_response(request)
 
+class RefreshAccessTokenMiddleware(MiddlewareMixin):
+    # MiddlewareMixin la hace compatible con sync y async: bajo ASGI la cadena queda
+    # async y las vistas async (stream SSE) no se ejecutan en un hilo por request.
+    def process_response(self, request, response):
         new_access = getattr(request, "_new_access_token", None)
         if new_access:
             response.set_cookie(
@@ -59,8 +59,16 @@ class MeSerializer(serializers.ModelSerializer):
             "role",
         ]
 
+    def _group_names(self, obj):
+        # nombres cargados por el cache de usuarios (authapi/user_cache.py), ordenados por id
+        names = getattr(obj, "_cached_group_names", None)
+        if names is None:
+            names = obj._cached_group_names = list(obj.groups.order_by("id").values_list("name", flat=True))
+        return names
+
     def get_groups(self, obj):
-        return list(obj.groups.values_list("name", flat=True))
+        return list(self._group_names(obj))
 
     def get_role(self, obj):
-        return obj.groups.values_list("name", flat=True).first()
+        names = self._group_names(obj)
+        return names[0] if names else None
@@ -0,0 +1,35 @@
+# authapi/signals.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .user_cache import user_cache
+
+User = get_user_model()
+
+# ---- Invalidación del cache de usuarios/permisos ----
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    user_cache.evict(instance.pk)
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if isinstance(instance, User):
+        user_cache.evict(instance.pk)
+    else:
+        # desde el lado del grupo/permiso (group.user_set.add(...)) o un clear(): afecta a varios
+        user_cache.clear()
+
+@receiver([post_save, post_delete], sender=Group)
+@receiver([post_save, post_delete], sender=Permission)
+def group_or_permission_changed(sender, instance, **kwargs):
+    user_cache.clear()
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, **kwargs):
+    if action.startswith("post_"):
+        user_cache.clear()
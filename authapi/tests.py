@@ -1,3 +1,63 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .auth import CookieJWTAuthentication
+from .user_cache import stats, user_cache
+
+
+class UserCacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user("cajero", password="clave-1")
+
+    def authenticate(self, token=None):
+        token = token or AccessToken.for_user(self.user)
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return CookieJWTAuthentication().authenticate(request)[0]
+
+    def test_second_request_is_served_from_cache(self):
+        self.authenticate()
+        hits = stats["hits"]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate().pk, self.user.pk)
+        self.assertEqual(stats["hits"], hits + 1)
+
+    def test_deactivated_user_is_evicted(self):
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_revoked_permission_is_evicted(self):
+        perm = Permission.objects.get(codename="view_sale")
+        self.user.user_permissions.add(perm)
+        self.assertTrue(self.authenticate().has_perm("inventory.view_sale"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.user_permissions.remove(perm)
+        self.assertFalse(self.authenticate().has_perm("inventory.view_sale"))
+
+    @mock.patch.object(api_settings, "CHECK_REVOKE_TOKEN", True)  # override_settings no llega a los imports
+    def test_password_change_revokes_cached_token(self):
+        token = AccessToken.for_user(self.user)
+        self.authenticate(token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password("clave-2")
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_generation_bump_from_another_worker_drops_entries(self):
+        self.authenticate()
+        self.assertIsNotNone(user_cache.get(self.user.pk))
+        cache.incr("auth:user-cache:gen")  # lo que hace _bump en el worker que escribió
+        self.assertIsNone(user_cache.get(self.user.pk))
@@ -0,0 +1,100 @@
+# authapi/user_cache.py
+# Cache en proceso de usuario autenticado + permisos + nombres de grupo, por id.
+#
+# CookieJWTAuthentication lo consulta antes de ir a la BD; la entrada guarda el usuario
+# con los caches de permisos de ModelBackend ya cargados (_perm_cache, ...), así que
+# DjangoModelPermissions y MeSerializer no hacen consultas. Acotado en tamaño (LRU) y
+# en tiempo (TTL). Los signals de authapi/signals.py invalidan al cambiar usuarios,
+# grupos o permisos; con varios workers la invalidación se propaga con un contador de
+# generación en el cache compartido.
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+GEN_KEY = "auth:user-cache:gen"
+
+# contadores de uso (los lee /metrics)
+stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _enabled() -> bool:
+    return getattr(settings, "AUTH_USER_CACHE_ENABLED", True)
+
+
+def _generation():
+    gen = cache.get(GEN_KEY)
+    if gen is None:
+        cache.add(GEN_KEY, time.time_ns(), timeout=None)
+        gen = cache.get(GEN_KEY)
+    return gen
+
+
+class UserCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # str(user_id) → (expira, generación, usuario)
+
+    def get(self, user_id):
+        """Copia del usuario cacheado (con permisos y grupos) o None."""
+        if not _enabled():
+            return None
+        user_id = str(user_id)  # el claim del token puede venir como texto
+        gen = _generation()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < now or entry[1] != gen:
+                if entry is not None:
+                    del self._entries[user_id]
+                stats["misses"] += 1
+                return None
+            self._entries.move_to_end(user_id)
+        stats["hits"] += 1
+        # copia superficial: cada request tiene su instancia; los sets de permisos se comparten (solo lectura)
+        return copy.copy(entry[2])
+
+    def put(self, user):
+        """Carga permisos y grupos del usuario (consultas solo aquí) y lo guarda."""
+        if not _enabled():
+            return user
+        gen = _generation()
+        user.get_all_permissions()  # llena _perm_cache / _user_perm_cache / _group_perm_cache
+        user._cached_group_names = list(user.groups.order_by("id").values_list("name", flat=True))
+
+        ttl = getattr(settings, "AUTH_USER_CACHE_TTL", 60)
+        size = getattr(settings, "AUTH_USER_CACHE_SIZE", 1024)
+        with self._lock:
+            self._entries[str(user.pk)] = (time.monotonic() + ttl, gen, copy.copy(user))
+            self._entries.move_to_end(str(user.pk))
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+        return user
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+        # al hacer commit: una lectura concurrente pudo recachear los datos viejos
+        transaction.on_commit(self._bump)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        stats["invalidations"] += 1
+        try:
+            cache.incr(GEN_KEY)
+        except ValueError:
+            cache.add(GEN_KEY, time.time_ns(), timeout=None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache()
@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+El stream SSE (/api/inventory/events/) se atiende fuera de la cadena de Django para
+no retener un hilo por conexión. Servir con un servidor ASGI, p. ej.:
+    uvicorn core.asgi:application --workers 1
+(el broker de eventos es por proceso: con varios workers cada uno ve sus escrituras).
 """
 
 import os
@@ -13,4 +18,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from inventory import sse  # noqa: E402  (requiere apps cargadas)
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and scope["path"] == sse.PATH:
+        return await sse.application(scope, receive, send)
+    return await django_application(scope, receive, send)
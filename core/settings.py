@@ -9,6 +9,8 @@ SECRET_KEY = "dev-change-me"
 DEBUG = True
 ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
 FX_USD_TO_BS = Decimal(os.getenv("FX_USD_TO_BS", "382"))
+# s; tope de vida del historial de tasas en memoria (con LocMem el bump de "fx" no cruza workers)
+FX_HISTORY_TTL = float(os.getenv("FX_HISTORY_TTL", "5"))
 # --- Apps
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -28,6 +30,9 @@ INSTALLED_APPS = [
 
 # --- Middleware (CORS antes de CommonMiddleware)
 MIDDLEWARE = [
+    "inventory.metrics.MetricsMiddleware",     # 👈 primero: mide la request completa (METRICS_ENABLED)
+    "inventory.diagnostics.QueryDiagnosticsMiddleware",  # consultas lentas / N+1 (QUERY_DIAGNOSTICS)
+    "inventory.profiler.ProfilerMiddleware",   # perfil por muestreo bajo demanda (PROFILER_ENABLED)
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",   # 👈 debe ir antes de CommonMiddleware
@@ -39,9 +44,10 @@ MIDDLEWARE = [
     "authapi.middleware.RefreshAccessTokenMiddleware",
 ]
 
-# --- URLs / WSGI
+# --- URLs / WSGI / ASGI (el stream SSE de inventory/events/ requiere ASGI)
 ROOT_URLCONF = "core.urls"
 WSGI_APPLICATION = "core.wsgi.application"
+ASGI_APPLICATION = "core.asgi.application"
 
 # --- Django Templates (necesario para admin)
 TEMPLATES = [
@@ -60,13 +66,104 @@ TEMPLATES = [
     },
 ]
 
-# --- DB (sqlite dev)
+# --- DB (sqlite)
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": Path(os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3")),
     }
 }
+DATABASE_ROUTERS = []  # réplica de lectura y sharding por sede (más abajo)
+
+# Perfil de producción (SQLITE_PROFILE=production): WAL (lectores y escritor no se bloquean),
+# pragmas en cada conexión nueva, BEGIN IMMEDIATE (el lock de escritura se pide al abrir la
+# transacción y espera busy_timeout; en DEFERRED pasar de lectura a escritura falla al instante
+# con "database is locked") y conexiones persistentes. Checkpoint/VACUUM/ANALYZE:
+# manage.py sqlite_maintenance; comparación antes/después: manage.py bench_sqlite.
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "dev")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # con WAL: sin fsync por commit; un corte de luz puede perder los últimos commits, no corromper
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    "mmap_size": int(os.getenv("SQLITE_MMAP_MB", "256")) * 1024 * 1024,
+    "cache_size": -int(os.getenv("SQLITE_CACHE_MB", "64")) * 1024,  # negativo = KiB
+    "temp_store": "MEMORY",
+    "journal_size_limit": 64 * 1024 * 1024,  # el -wal se trunca a esto tras cada checkpoint
+}
+if SQLITE_PROFILE == "production":
+    DATABASES["default"].update(
+        OPTIONS={
+            "init_command": ";".join(f"PRAGMA {k}={v}" for k, v in SQLITE_PRAGMAS.items()),
+            "transaction_mode": "IMMEDIATE",
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+        CONN_MAX_AGE=int(os.getenv("DB_CONN_MAX_AGE", "600")),
+        CONN_HEALTH_CHECKS=True,
+    )
+
+# --- Réplica de lectura para reportes y KPIs (inventory/db_router.py). Réplica local de
+# prueba: copia SQLite refrescada con manage.py refresh_replica [--every N]
+REPLICA_SQLITE_PATH = os.getenv("REPLICA_SQLITE_PATH", "")
+REPLICA_MAX_STALENESS = float(os.getenv("REPLICA_MAX_STALENESS", "300"))  # s; más vieja → lee del primario
+if REPLICA_SQLITE_PATH:
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": Path(REPLICA_SQLITE_PATH),
+        "OPTIONS": {"init_command": "PRAGMA query_only=ON"},
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS.append("inventory.db_router.ReplicaRouter")
+
+# --- Sharding por sede (inventory/sharding.py): ventas y stock de cada sede en
+# shard_<store_id % SHARD_COUNT> (SQLite en SHARD_SQLITE_DIR); el catálogo queda en default.
+# Crear/migrar los shards: manage.py migrate_shards
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))
+SHARD_SQLITE_DIR = Path(os.getenv("SHARD_SQLITE_DIR", BASE_DIR / "shards"))
+for _i in range(SHARD_COUNT):
+    _options = DATABASES["default"].get("OPTIONS", {})
+    DATABASES[f"shard_{_i}"] = {
+        **DATABASES["default"],  # mismo perfil: pragmas, BEGIN IMMEDIATE, conexiones persistentes
+        "NAME": SHARD_SQLITE_DIR / f"shard_{_i}.sqlite3",
+        # sin catálogo en el shard: las FK a productos/sedes no se pueden verificar ahí
+        "OPTIONS": {**_options, "init_command": ";".join(
+            filter(None, (_options.get("init_command", ""), "PRAGMA foreign_keys=OFF")))},
+    }
+if SHARD_COUNT:
+    DATABASE_ROUTERS.append("inventory.sharding.ShardRouter")
+
+# --- Group commit de ventas (inventory/group_commit.py): un hilo escritor por proceso confirma
+# varias ventas por transacción, cada una en su savepoint; la request espera su resultado
+SALE_GROUP_COMMIT = os.getenv("SALE_GROUP_COMMIT", "0") == "1"
+SALE_GROUP_COMMIT_MAX_BATCH = int(os.getenv("SALE_GROUP_COMMIT_MAX_BATCH", "32"))
+SALE_GROUP_COMMIT_WINDOW_MS = float(os.getenv("SALE_GROUP_COMMIT_WINDOW_MS", "2"))  # espera extra para juntar lote
+SALE_GROUP_COMMIT_TIMEOUT = float(os.getenv("SALE_GROUP_COMMIT_TIMEOUT", "10"))  # s en cola antes de responder 503
+
+# --- Archivo de ventas (inventory/archive.py, manage.py archive_sales): se archivan las ventas
+# anteriores al primer día del mes de hace SALE_ARCHIVE_MONTHS meses, en lotes
+SALE_ARCHIVE_MONTHS = int(os.getenv("SALE_ARCHIVE_MONTHS", "12"))
+SALE_ARCHIVE_BATCH = int(os.getenv("SALE_ARCHIVE_BATCH", "500"))
+
+# --- Cache (KPIs y contadores de generación)
+# LocMem es por proceso: con varios workers usar un backend compartido (REDIS_URL)
+# para que la invalidación tras una venta llegue a todos.
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "tienda",
+        }
+    }
+KPI_CACHE_ENABLED = os.getenv("KPI_CACHE_ENABLED", "1") == "1"
+KPI_CACHE_TIMEOUT = int(os.getenv("KPI_CACHE_TIMEOUT", "300"))  # respaldo; la invalidación es por escritura
 
 # --- i18n
 LANGUAGE_CODE = "es-es"
@@ -123,6 +220,28 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
 
+# --- Cache de usuario + permisos de CookieJWTAuthentication (authapi/user_cache.py)
+AUTH_USER_CACHE_ENABLED = os.getenv("AUTH_USER_CACHE_ENABLED", "1") == "1"
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))  # segundos
+
+# --- Métricas por ruta en /metrics (inventory/metrics.py)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+# Authorization: Bearer <token> (para Prometheus); sin token, solo una sesión de staff
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# --- Diagnóstico de consultas (inventory/diagnostics.py): lentas con EXPLAIN y N+1 al log
+QUERY_DIAGNOSTICS = os.getenv("QUERY_DIAGNOSTICS", "0") == "1"
+QUERY_DIAGNOSTICS_SLOW_MS = float(os.getenv("QUERY_DIAGNOSTICS_SLOW_MS", "100"))
+QUERY_DIAGNOSTICS_NPLUSONE = int(os.getenv("QUERY_DIAGNOSTICS_NPLUSONE", "5"))  # repeticiones de una misma forma
+
+# --- Profiler por muestreo bajo demanda (inventory/profiler.py): header X-Profile firmado
+# (manage.py profile_token) o ruta armada por un admin en /api/inventory/profiles/
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+PROFILER_DIR = os.getenv("PROFILER_DIR", str(BASE_DIR / "profiles"))  # fuera de MEDIA_ROOT: no se sirve público
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_TOKEN_MAX_AGE = int(os.getenv("PROFILER_TOKEN_MAX_AGE", "3600"))  # segundos
+
 
 # === Archivos subidos (media) ===
 MEDIA_URL = "/media/"
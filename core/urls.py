@@ -3,8 +3,11 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
+from inventory.metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
 
     # Prefijos únicos aquí:
     path("api/auth/", include(("authapi.urls", "authapi"), namespace="authapi")),
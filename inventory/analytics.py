@@ -0,0 +1,475 @@
+# inventory/analytics.py
+# Motores analíticos vectorizados (NumPy): se leen las columnas necesarias en una
+# sola pasada con values_list y se agregan con operaciones de arrays, sin bucles
+# Python por línea.
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import CharField, F, FloatField, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from . import sharding
+from .archive import sale_item_models
+from .models import AbcAnalysis, Category, ReorderSuggestion, Stock, Store
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: solo lo necesitan los reportes analíticos
+    np = None
+
+
+class AnalyticsUnavailable(RuntimeError):
+    pass
+
+
+def per_sales_db(fn) -> list:
+    """fn() en la BD de ventas/stock: con sharding una vez por shard (en su alcance), si no en default."""
+    out = []
+    for alias in sharding.shard_aliases() or [None]:
+        with sharding.using_shard(alias):
+            out.append(fn())
+    return out
+
+
+def require_numpy():
+    if np is None:
+        raise AnalyticsUnavailable("Este reporte requiere NumPy (pip install numpy).")
+    return np
+
+
+# ---- Pivot de ventas ----
+
+PIVOT_DIMS = ("store", "category", "payment_method", "period")
+PIVOT_BUCKETS = ("day", "week", "month", "quarter", "year")
+NO_CATEGORY = "(sin categoría)"
+
+
+def _codes(arr):
+    """Etiquetas únicas ordenadas + código entero por fila (np.unique con inverse)."""
+    labels, inverse = np.unique(arr, return_inverse=True)
+    return labels, inverse.astype(np.int64).ravel()
+
+
+def _to_local_seconds(values, n):
+    """
+    'YYYY-MM-DD HH:MM:SS[...]' (texto UTC tal como lo devuelve la BD) → datetime64[s]
+    en hora local. Usa el offset vigente de la zona actual (exacto en zonas sin horario de verano).
+    """
+    text = np.fromiter((v[:19] for v in values), dtype="U19", count=n)
+    text = np.char.replace(text, " ", "T")
+    secs = text.astype("datetime64[s]")
+    offset = timezone.localtime().utcoffset() or timedelta(0)
+    return secs + np.timedelta64(int(offset.total_seconds()), "s")
+
+
+def _bucketize(secs, bucket: str):
+    """Inicio de bucket (datetime64[D]) para cada fecha, vectorizado."""
+    days = secs.astype("datetime64[D]")
+    if bucket == "day":
+        return days
+    if bucket == "week":
+        # 1970-01-01 fue jueves: (días + 3) % 7 = días desde el lunes
+        offset = (days.astype(np.int64) + 3) % 7
+        return days - offset.astype("timedelta64[D]")
+    months = days.astype("datetime64[M]")
+    if bucket == "month":
+        return months.astype("datetime64[D]")
+    if bucket == "quarter":
+        m = months.astype(np.int64)
+        return (m - m % 3).astype("datetime64[M]").astype("datetime64[D]")
+    return days.astype("datetime64[Y]").astype("datetime64[D]")
+
+
+def pivot_sales(start, end, *, dims, bucket: str = "month", store_code=None, category=None, payment_method=None) -> dict:
+    """
+    Agrega líneas de venta por cualquier combinación de dims
+    (store, category, payment_method, period) en [start, end).
+
+    Una consulta values_list (otra si el rango llega a ventas archivadas) con columnas
+    "crudas" (ids, texto de fecha, precios como float) para no convertir objetos por fila;
+    el bucketing de fechas, el pivot (np.unique + np.ravel_multi_index) y las sumas
+    (np.bincount) son vectorizados.
+    Los ids de sede/categoría se traducen a code/slug al final (solo las etiquetas únicas).
+    Un producto con varias categorías cuenta en cada una (con dims=category).
+    Devuelve arrays paralelos: una lista de etiquetas por dim y una por métrica.
+    """
+    require_numpy()
+
+    dims = [d for d in dims if d]
+    bad = [d for d in dims if d not in PIVOT_DIMS]
+    if bad or len(set(dims)) != len(dims):
+        raise ValueError(f"dims inválidas: {', '.join(bad) or 'repetidas'}. Usa: {', '.join(PIVOT_DIMS)}")
+    if bucket not in PIVOT_BUCKETS:
+        raise ValueError(f"bucket inválido. Usa: {', '.join(PIVOT_BUCKETS)}")
+
+    columns = {
+        "store": "sale__store_id",
+        "category": "product__categories",
+        "payment_method": "sale__payment_method",
+        "period": "created_text",
+    }
+    fields = [columns[d] for d in dims] + ["quantity", "price_bs", "price_usd"]
+
+    rows = []
+    for model in sale_item_models(start):  # líneas recientes y, si el rango llega, archivadas
+        qs = model.objects.filter(sale__created_at__gte=start, sale__created_at__lt=end)
+        if store_code:
+            qs = qs.filter(sale__store__code=store_code)
+        if payment_method:
+            qs = qs.filter(sale__payment_method=payment_method)
+        if category:
+            qs = qs.filter(product__categories__slug=category)
+
+        qs = qs.annotate(
+            price_bs=Cast("unit_price", FloatField()),
+            price_usd=Coalesce(Cast("unit_price_usd", FloatField()), Value(0.0)),
+        )
+        if "period" in dims:
+            qs = qs.annotate(created_text=Cast("sale__created_at", CharField()))
+        rows += qs.values_list(*fields)
+    n = len(rows)
+
+    metrics = {"lines": [], "units": [], "revenue_bs": [], "revenue_usd": []}
+    out = {"dims": dims, "bucket": bucket if "period" in dims else None, "lines_scanned": n}
+
+    if n == 0:
+        out.update({d: [] for d in dims})
+        out.update(metrics)
+        return out
+
+    cols = list(zip(*rows))
+    del rows
+
+    k = len(dims)
+    qty = np.fromiter(cols[k], dtype=np.int64, count=n)
+    # precios a centavos enteros: las sumas quedan exactas
+    price_bs = np.rint(np.fromiter(cols[k + 1], dtype=np.float64, count=n) * 100).astype(np.int64)
+    price_usd = np.rint(np.fromiter(cols[k + 2], dtype=np.float64, count=n) * 100).astype(np.int64)
+
+    labels, codes, shape = [], [], []
+    for i, d in enumerate(dims):
+        if d in ("store", "category"):
+            arr = np.fromiter((v or 0 for v in cols[i]), dtype=np.int64, count=n)
+        elif d == "period":
+            arr = _bucketize(_to_local_seconds(cols[i], n), bucket)
+        else:
+            arr = np.asarray(cols[i], dtype=object)
+        lab, code = _codes(arr)
+        labels.append(lab)
+        codes.append(code)
+        shape.append(len(lab))
+
+    if k:
+        cell = np.ravel_multi_index(codes, shape)
+        size = int(np.prod(shape))
+    else:
+        cell = np.zeros(n, dtype=np.int64)
+        size = 1
+
+    lines = np.bincount(cell, minlength=size)
+    units = np.bincount(cell, weights=qty, minlength=size)
+    rev_bs = np.bincount(cell, weights=qty * price_bs, minlength=size)
+    rev_usd = np.bincount(cell, weights=qty * price_usd, minlength=size)
+
+    present = np.nonzero(lines)[0]
+    if k:
+        idx = np.unravel_index(present, shape)
+        for d, lab, ix in zip(dims, labels, idx):
+            out[d] = _labels(d, lab)[ix].tolist()
+
+    out["lines"] = lines[present].astype(np.int64).tolist()
+    out["units"] = units[present].astype(np.int64).tolist()
+    out["revenue_bs"] = (np.rint(rev_bs[present]) / 100).tolist()
+    out["revenue_usd"] = (np.rint(rev_usd[present]) / 100).tolist()
+    return out
+
+
+def _labels(dim: str, lab):
+    """Etiquetas legibles para los códigos únicos de una dimensión."""
+    if dim == "store":
+        names = dict(Store.objects.filter(id__in=lab.tolist()).values_list("id", "code"))
+        return np.array([names.get(i, str(i)) for i in lab.tolist()], dtype=object)
+    if dim == "category":
+        names = dict(Category.objects.filter(id__in=lab.tolist()).values_list("id", "slug"))
+        return np.array([names.get(i, NO_CATEGORY) for i in lab.tolist()], dtype=object)
+    if dim == "period":
+        return np.array([str(d) for d in lab.tolist()], dtype=object)
+    return np.array([v or "" for v in lab.tolist()], dtype=object)
+
+
+# ---- Pronóstico de demanda y punto de reorden ----
+
+def daily_demand_matrix(*, days: int, now=None):
+    """
+    Demanda diaria por (producto, sede) de los últimos `days` días en una sola pasada.
+    Filas = todos los pares de Stock (incluye pares sin ventas); columnas = días.
+    Devuelve (pairs, demand) con pairs = array (P, 4): product_id, store_id, quantity, min_threshold.
+    """
+    require_numpy()
+
+    now = now or timezone.now()
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=days - 1)
+
+    pairs = np.array(
+        list(Stock.objects.order_by("product_id", "store_id")
+             .values_list("product_id", "store_id", "quantity", "min_threshold")),
+        dtype=np.int64,
+    ).reshape(-1, 4)
+    demand = np.zeros((len(pairs), days), dtype=np.float64)
+    if not len(pairs):
+        return pairs, demand
+
+    rows = [
+        row
+        for model in sale_item_models(start)
+        for row in model.objects
+        .filter(sale__created_at__gte=start, sale__created_at__lt=today + timedelta(days=1))
+        .annotate(created_text=Cast("sale__created_at", CharField()))
+        .values_list("product_id", "sale__store_id", "created_text", "quantity")
+    ]
+    if not rows:
+        return pairs, demand
+
+    n = len(rows)
+    product_ids, store_ids, created, qty = zip(*rows)
+    del rows
+
+    # clave (producto, sede) → fila de la matriz por búsqueda binaria sobre claves ordenadas
+    width = int(max(pairs[:, 1].max(), max(store_ids))) + 1
+    pair_keys = pairs[:, 0] * width + pairs[:, 1]
+    keys = np.fromiter(product_ids, dtype=np.int64, count=n) * width + np.fromiter(store_ids, dtype=np.int64, count=n)
+    row = np.searchsorted(pair_keys, keys)
+    row = np.minimum(row, len(pair_keys) - 1)
+    known = pair_keys[row] == keys
+
+    day = (_to_local_seconds(created, n).astype("datetime64[D]") - np.datetime64(start.date(), "D")).astype(np.int64)
+    ok = known & (day >= 0) & (day < days)
+
+    np.add.at(demand, (row[ok], day[ok]), np.fromiter(qty, dtype=np.float64, count=n)[ok])
+    return pairs, demand
+
+
+def forecast_demand(demand, *, method: str = "ses", alpha: float = 0.3, window: int = 28):
+    """
+    Pronóstico diario por fila (vectorizado sobre todos los pares).
+    - sma: media de los últimos `window` días.
+    - ses: suavizado exponencial simple sobre toda la serie (nivel final).
+    Devuelve (forecast, avg, std) por fila; std sobre la ventana.
+    """
+    require_numpy()
+
+    recent = demand[:, -window:] if window else demand
+    avg = demand.mean(axis=1) if demand.shape[1] else np.zeros(len(demand))
+    std = recent.std(axis=1) if recent.shape[1] else np.zeros(len(demand))
+
+    if method == "sma":
+        forecast = recent.mean(axis=1) if recent.shape[1] else np.zeros(len(demand))
+    elif method == "ses":
+        if not demand.shape[1]:
+            forecast = np.zeros(len(demand))
+        else:
+            level = demand[:, 0].copy()
+            for t in range(1, demand.shape[1]):
+                level = alpha * demand[:, t] + (1 - alpha) * level
+            forecast = level
+    else:
+        raise ValueError("method inválido. Usa: sma, ses")
+
+    return forecast, avg, std
+
+
+def compute_reorder_points(*, days: int = 90, method: str = "ses", alpha: float = 0.3, window: int = 28,
+                           lead_time_days: float = 3, service_z: float = 1.65, apply: bool = False,
+                           now=None) -> dict:
+    """
+    Calcula y guarda ReorderSuggestion para toda la matriz producto × sede:
+    - safety_stock = z · σ_diaria · √lead_time
+    - suggested_threshold = ⌈pronóstico · lead_time + safety_stock⌉
+    - days_of_cover = stock actual / pronóstico diario (null sin demanda)
+    Con apply=True también escribe Stock.min_threshold (solo en pares con demanda).
+    """
+    require_numpy()
+    from .kpi_cache import bump_on_commit
+
+    now = now or timezone.now()
+    parts = per_sales_db(lambda: daily_demand_matrix(days=days, now=now))
+    pairs, demand = (np.concatenate(c) for c in zip(*parts))
+    forecast, avg, std = forecast_demand(demand, method=method, alpha=alpha, window=window)
+
+    safety = np.ceil(service_z * std * np.sqrt(lead_time_days))
+    threshold = np.ceil(forecast * lead_time_days + safety)
+    quantity = pairs[:, 2].astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(forecast > 1e-9, quantity / forecast, np.nan)
+
+    def dec(x, places="0.001"):
+        return Decimal(str(round(float(x), 3))).quantize(Decimal(places))
+
+    suggestions = [
+        ReorderSuggestion(
+            product_id=int(p[0]), store_id=int(p[1]), method=method,
+            avg_daily_demand=dec(a), forecast_daily=dec(f), demand_std=dec(s),
+            safety_stock=int(ss), suggested_threshold=int(th),
+            quantity=int(p[2]), min_threshold=int(p[3]),
+            days_of_cover=None if np.isnan(c) else Decimal(str(round(min(float(c), 99999999999.0), 1))),
+            computed_at=now,
+        )
+        for p, a, f, s, ss, th, c in zip(pairs.tolist(), avg, forecast, std, safety, threshold, cover)
+    ]
+
+    with transaction.atomic():
+        ReorderSuggestion.objects.all().delete()
+        ReorderSuggestion.objects.bulk_create(suggestions, batch_size=1000)
+
+        applied = 0
+        if apply and len(pairs):
+            # sin demanda en el historial (umbral 0) se respeta el umbral manual
+            by_pair = {(int(p[0]), int(p[1])): int(th) for p, th in zip(pairs.tolist(), threshold) if th > 0}
+
+            def apply_thresholds():
+                stocks = list(Stock.objects.filter(product_id__in=set(pairs[:, 0].tolist())))
+                changed = []
+                for st in stocks:
+                    th = by_pair.get((st.product_id, st.store_id))
+                    if th is not None and st.min_threshold != th:
+                        st.min_threshold = th
+                        changed.append(st)
+                Stock.objects.bulk_update(changed, ["min_threshold"], batch_size=1000)
+                return len(changed)
+
+            applied = sum(per_sales_db(apply_thresholds))
+
+        bump_on_commit("stock")
+
+    return {"pairs": len(pairs), "days": days, "method": method, "applied": applied, "computed_at": now}
+
+
+# ---- Clasificación ABC y rotación ----
+
+def _abc_classes(group, value, a_cut: float, b_cut: float):
+    """
+    Clase A/B/C por grupo (sede) según el acumulado de `value` ordenado de mayor a menor.
+    Un par es A si el acumulado *antes* de él es < a_cut (el primero siempre es A),
+    B si es < b_cut y C en otro caso; los pares con valor 0 son siempre C.
+    """
+    n = len(value)
+    order = np.lexsort((-value, group))  # por sede y, dentro, valor descendente
+    g, v = group[order], value[order]
+
+    totals = np.bincount(g, weights=v)
+    cum = np.cumsum(v)
+    starts = np.r_[0, np.flatnonzero(np.diff(g)) + 1]
+    offset = np.repeat(cum[starts] - v[starts], np.diff(np.r_[starts, n]))
+    before = cum - v - offset  # acumulado previo dentro de la sede
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share_before = np.where(totals[g] > 0, before / totals[g], 1.0)
+
+    sorted_cls = np.where(share_before < a_cut, "A", np.where(share_before < b_cut, "B", "C"))
+    sorted_cls = np.where(v > 0, sorted_cls, "C")
+
+    cls = np.empty(n, dtype="U1")
+    cls[order] = sorted_cls
+    return cls
+
+
+def _abc_inputs(start, end):
+    """Pares producto × sede con stock (producto, sede, cantidad) y sus ventas en [start, end)."""
+    pairs = np.array(
+        list(Stock.objects.order_by("product_id", "store_id").values_list("product_id", "store_id", "quantity")),
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    p = len(pairs)
+
+    units = np.zeros(p, dtype=np.int64)
+    rev_bs = np.zeros(p, dtype=np.int64)   # centavos
+    rev_usd = np.zeros(p, dtype=np.int64)
+
+    rows = [
+        row
+        for model in sale_item_models(start)
+        for row in model.objects
+        .filter(sale__created_at__gte=start, sale__created_at__lt=end)
+        .values("product_id", "sale__store_id")
+        .annotate(
+            units=Sum("quantity"),
+            rev_bs=Sum(F("quantity") * F("unit_price"), output_field=FloatField()),
+            rev_usd=Coalesce(Sum(F("quantity") * F("unit_price_usd"), output_field=FloatField()), Value(0.0)),
+        )
+        .values_list("product_id", "sale__store_id", "units", "rev_bs", "rev_usd")
+    ]
+    if p and rows:
+        product_ids, store_ids, u, rb, ru = (np.asarray(c) for c in zip(*rows))
+        width = int(max(pairs[:, 1].max(), store_ids.max())) + 1
+        pair_keys = pairs[:, 0] * width + pairs[:, 1]
+        keys = product_ids.astype(np.int64) * width + store_ids.astype(np.int64)
+        row = np.minimum(np.searchsorted(pair_keys, keys), p - 1)
+        known = pair_keys[row] == keys
+        # add.at: el mismo par puede venir de las ventas recientes y de las archivadas
+        np.add.at(units, row[known], u[known].astype(np.int64))
+        np.add.at(rev_bs, row[known], np.rint(rb[known].astype(np.float64) * 100).astype(np.int64))
+        np.add.at(rev_usd, row[known], np.rint(ru[known].astype(np.float64) * 100).astype(np.int64))
+    return pairs, units, rev_bs, rev_usd
+
+
+def compute_abc(*, days: int = 90, a_cut: float = 0.8, b_cut: float = 0.95, now=None) -> dict:
+    """
+    Calcula y guarda AbcAnalysis para toda la matriz producto × sede:
+    - ventas de los últimos `days` días en una sola consulta agregada (GROUP BY producto, sede)
+    - clase ABC por ingreso (Bs) y por unidades, dentro de cada sede
+    - rotación anualizada = unidades / inventario promedio · 365 / days, con inventario
+      promedio ≈ stock actual + unidades / 2 (no hay historial de entradas)
+    - días de inventario = stock actual / venta diaria (null sin ventas)
+    """
+    require_numpy()
+    from .kpi_cache import bump_on_commit
+
+    now = now or timezone.now()
+    today = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=days - 1)
+
+    # con sharding, cada shard aporta los pares de sus sedes (la clase ABC es dentro de cada sede)
+    parts = per_sales_db(lambda: _abc_inputs(start, today + timedelta(days=1)))
+    pairs, units, rev_bs, rev_usd = (np.concatenate(c) for c in zip(*parts))
+    p = len(pairs)
+
+    results = []
+    if p:
+        store_idx = np.unique(pairs[:, 1], return_inverse=True)[1].ravel()
+        abc_rev = _abc_classes(store_idx, rev_bs.astype(np.float64), a_cut, b_cut)
+        abc_units = _abc_classes(store_idx, units.astype(np.float64), a_cut, b_cut)
+
+        store_total = np.bincount(store_idx, weights=rev_bs)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(store_total[store_idx] > 0, rev_bs / store_total[store_idx], 0.0)
+            quantity = pairs[:, 2].astype(np.float64)
+            avg_inventory = quantity + units / 2
+            turnover = np.where(avg_inventory > 0, units / avg_inventory * 365 / days, 0.0)
+            on_hand = np.where(units > 0, quantity / (units / days), np.nan)
+
+        results = [
+            AbcAnalysis(
+                product_id=int(pr[0]), store_id=int(pr[1]), days=days,
+                units=int(un), revenue=Decimal(int(rb)) / 100, revenue_usd=Decimal(int(ru)) / 100,
+                revenue_share=Decimal(str(round(float(sh), 4))),
+                abc_revenue=str(cr), abc_units=str(cu), quantity=int(pr[2]),
+                turnover=Decimal(str(round(float(t), 2))),
+                days_on_hand=None if np.isnan(d) else Decimal(str(round(min(float(d), 99999999999.0), 1))),
+                computed_at=now,
+            )
+            for pr, un, rb, ru, sh, cr, cu, t, d in zip(
+                pairs.tolist(), units.tolist(), rev_bs.tolist(), rev_usd.tolist(), share, abc_rev, abc_units,
+                turnover, on_hand,
+            )
+        ]
+
+    with transaction.atomic():
+        AbcAnalysis.objects.all().delete()
+        AbcAnalysis.objects.bulk_create(results, batch_size=1000)
+        bump_on_commit("stock")
+
+    counts = {c: sum(1 for r in results if r.abc_revenue == c) for c in "ABC"}
+    return {"pairs": p, "days": days, "counts": counts, "computed_at": now}
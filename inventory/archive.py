@@ -0,0 +1,120 @@
+# inventory/archive.py
+# Archivo de ventas viejas (hot/cold): Sale/SaleItem guardan las ventas recientes y
+# ArchivedSale/ArchivedSaleItem el historial, con los mismos ids y columnas.
+#
+# archive_sales() mueve en lotes: cada lote es una transacción con INSERT … SELECT y DELETE
+# por id en SQL, sin cargar objetos ni disparar señales. Borrar una venta por el ORM la
+# descontaría de los resúmenes diarios y recalcularía is_active de cada producto; al
+# archivar, ni los resúmenes ni el stock cambian (los KPIs por días completos siguen igual).
+# Sí cambian las tablas crudas que leen los reportes: cada lote incrementa la generación
+# "sales" del cache de KPIs al hacer commit. Un lote tiene a lo sumo MAX_BATCH ventas:
+# _move_batch liga un parámetro SQL por id y SQLite limita cuántos admite una sentencia.
+#
+# Lecturas: sales/<id>/ e invoice/ buscan en el archivo si la venta ya no está en Sale; los
+# reportes por rango que leen líneas (top-products y serie con horas, pivot, reorden/ABC) y
+# rebuild_sales_rollup suman también el archivo cuando el rango llega a él. El listado
+# sales/ muestra solo las recientes. Con sharding, cada shard archiva sus propias ventas.
+import time
+from datetime import datetime
+
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .kpi_cache import bump_on_commit
+from .models import ArchivedSale, ArchivedSaleItem, Sale, SaleItem
+
+MAX_BATCH = 900  # + archived_at: por debajo de los 999 parámetros de SQLite viejos
+
+
+def cutoff_for_months(months: int, now=None) -> datetime:
+    """Primer día (medianoche local) del mes de hace `months` meses."""
+    today = timezone.localdate(now)
+    year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+    return timezone.make_aware(datetime(year, month + 1, 1))
+
+
+def archived_until(using=None):
+    """created_at de la venta archivada más reciente (None si el archivo está vacío)."""
+    return (ArchivedSale.objects.using(using).order_by("-created_at")
+            .values_list("created_at", flat=True).first())
+
+
+def reaches_archive(start, using=None) -> bool:
+    newest = archived_until(using)
+    return newest is not None and (start is None or start <= newest)
+
+
+def sale_models(start, using=None) -> tuple:
+    """Modelos de venta a consultar para un rango que empieza en `start`."""
+    return (Sale, ArchivedSale) if reaches_archive(start, using) else (Sale,)
+
+
+def sale_item_models(start, using=None) -> tuple:
+    """Modelos de línea de venta a consultar para un rango que empieza en `start` (mismos campos)."""
+    return (SaleItem, ArchivedSaleItem) if reaches_archive(start, using) else (SaleItem,)
+
+
+def get_archived_sale(pk):
+    try:
+        return ArchivedSale.objects.filter(pk=int(pk)).first()
+    except (TypeError, ValueError):
+        return None
+
+
+# ---- Mover al archivo ----
+
+def _copy_columns(src, dst) -> list:
+    columns = {f.column for f in src._meta.concrete_fields}
+    return [f.column for f in dst._meta.concrete_fields if f.column in columns]
+
+
+def _move_batch(cur, qn, ids, archived_at) -> tuple:
+    marks = ", ".join(["%s"] * len(ids))
+    sale_cols = ", ".join(qn(c) for c in _copy_columns(Sale, ArchivedSale))
+    item_cols = ", ".join(qn(c) for c in _copy_columns(SaleItem, ArchivedSaleItem))
+    sales, archived_sales = qn(Sale._meta.db_table), qn(ArchivedSale._meta.db_table)
+    items, archived_items = qn(SaleItem._meta.db_table), qn(ArchivedSaleItem._meta.db_table)
+
+    cur.execute(f"INSERT INTO {archived_sales} ({sale_cols}, {qn('archived_at')}) "
+                f"SELECT {sale_cols}, %s FROM {sales} WHERE {qn('id')} IN ({marks})", [archived_at, *ids])
+    cur.execute(f"INSERT INTO {archived_items} ({item_cols}) "
+                f"SELECT {item_cols} FROM {items} WHERE {qn('sale_id')} IN ({marks})", ids)
+    n_items = cur.rowcount
+    cur.execute(f"DELETE FROM {items} WHERE {qn('sale_id')} IN ({marks})", ids)
+    cur.execute(f"DELETE FROM {sales} WHERE {qn('id')} IN ({marks})", ids)
+    return cur.rowcount, n_items
+
+
+def archive_sales(before, *, batch_size: int = 500, max_batches: int = None, pause: float = 0.0,
+                  on_batch=None) -> dict:
+    """
+    Mueve al archivo las ventas con created_at < before (las más viejas primero), de a
+    batch_size (a lo sumo MAX_BATCH) por transacción; `pause` segundos entre lotes deja
+    pasar a otros escritores. Usa la BD de ventas del alcance actual (el shard con
+    sharding.using_shard, si no default).
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH))
+    db = router.db_for_write(Sale)
+    conn = connections[db]
+    moved = {"sales": 0, "items": 0, "batches": 0}
+    while max_batches is None or moved["batches"] < max_batches:
+        with transaction.atomic(using=db):
+            ids = list(Sale.objects.using(db).filter(created_at__lt=before)
+                       .order_by("created_at").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            with conn.cursor() as cur:
+                n_sales, n_items = _move_batch(
+                    cur, conn.ops.quote_name, ids, conn.ops.adapt_datetimefield_value(timezone.now()),
+                )
+            bump_on_commit("sales")
+        moved["sales"] += n_sales
+        moved["items"] += n_items
+        moved["batches"] += 1
+        if on_batch:
+            on_batch(moved)
+        if len(ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return moved
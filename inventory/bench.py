@@ -0,0 +1,104 @@
+# inventory/bench.py
+# Utilidades compartidas por los comandos bench_*: datos sintéticos dentro de una
+# transacción que se revierte al final (no deja rastro en la BD).
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Category, Product, Sale, SaleItem, Store
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Ejecuta el bloque en una transacción que siempre se revierte."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def timed(fn, repeat: int = 3):
+    """(mejor tiempo en ms, último resultado) de llamar fn() `repeat` veces."""
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best * 1000, result
+
+
+def seed_sales(*, lines: int, products: int = 2000, stores: int = 1, categories: int = 0,
+               lines_per_sale: int = 4, days: int = 365, seed: int = 42, log=None) -> dict:
+    """
+    Inserta ventas sintéticas con bulk_create (SKUs calientes con peso 1/rank).
+    Pensado para usarse dentro de rolled_back().
+    """
+    rnd = random.Random(seed)
+    User = get_user_model()
+    tag = f"bench{rnd.randrange(10**9)}"
+    user = User.objects.create(username=tag)
+
+    store_objs = Store.objects.bulk_create(
+        [Store(name=f"Bench {tag} {i}", code=f"{tag}-{i}") for i in range(max(1, stores))]
+    )
+    cat_objs = Category.objects.bulk_create(
+        [Category(name=f"Bench {tag} {i}", slug=f"{tag}-{i}") for i in range(categories)]
+    )
+    product_objs = Product.objects.bulk_create(
+        [Product(sku=f"{tag}-{i:06d}", name=f"Bench {i:06d}", price_usd=Decimal("1.00")) for i in range(products)],
+        batch_size=1000,
+    )
+    if cat_objs:
+        Through = Product.categories.through
+        Through.objects.bulk_create(
+            [Through(product_id=p.id, category_id=cat_objs[i % len(cat_objs)].id) for i, p in enumerate(product_objs)],
+            batch_size=1000,
+        )
+
+    product_ids = [p.id for p in product_objs]
+    weights = [1.0 / (i + 1) for i in range(len(product_ids))]
+    methods = [m for m, _ in Sale.PAYMENT_METHODS]
+
+    now = timezone.now()
+    per_sale = max(1, lines_per_sale)
+    n_sales = max(1, lines // per_sale)
+    batch = 5000
+
+    done = 0
+    while done < n_sales:
+        k = min(batch, n_sales - done)
+        sales = Sale.objects.bulk_create(
+            [
+                Sale(
+                    store=rnd.choice(store_objs), created_by=user,
+                    created_at=now - timedelta(seconds=rnd.randrange(days * 86400)),
+                    payment_method=rnd.choice(methods),
+                )
+                for _ in range(k)
+            ]
+        )
+        items = []
+        for sale in sales:
+            for pid in rnd.choices(product_ids, weights=weights, k=per_sale):
+                items.append(SaleItem(sale=sale, product_id=pid, quantity=rnd.randint(1, 5),
+                                      unit_price_usd=Decimal("1.00"), unit_price=Decimal("40.00")))
+        SaleItem.objects.bulk_create(items, batch_size=5000)
+        done += k
+        if log:
+            log(f"  ventas {done}/{n_sales}")
+
+    return {"user": user, "stores": store_objs, "categories": cat_objs, "products": product_objs}
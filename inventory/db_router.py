@@ -0,0 +1,129 @@
+# inventory/db_router.py
+# Router de réplica de lectura para reportes y KPIs.
+#
+# Solo las vistas marcadas con @replica_reads leen de la réplica, y solo los modelos de
+# inventory (usuarios, permisos y sesiones siguen en el primario: un usuario recién creado
+# todavía no está en la réplica). Toda escritura va al primario, también la de un objeto
+# leído de la réplica. Flujos de lectura-tras-escritura (crear venta, invoice/) no se marcan.
+#
+# Réplica local de prueba: REPLICA_SQLITE_PATH + manage.py refresh_replica (copia con la API
+# de backup de SQLite y deja la hora del snapshot en <réplica>.meta.json). Si la réplica es
+# más vieja que REPLICA_MAX_STALENESS, la vista lee del primario. Cabeceras de respuesta:
+# X-Replica: replica | primary y X-Replica-Staleness: segundos desde el snapshot.
+#
+# El cache de KPIs incluye replica_snapshot() en la clave: lo calculado contra la réplica
+# no sobrevive al siguiente snapshot, sin depender del bump de refresh_replica.
+import contextvars
+import functools
+import json
+import os
+import time
+
+from django.conf import settings
+from django.db import connections
+
+REPLICA = "replica"
+REPLICA_APPS = {"inventory"}
+
+_use_replica = contextvars.ContextVar("use_replica", default=False)
+
+# contadores (los lee /metrics): lecturas de vistas marcadas servidas por réplica o primario
+stats = {"replica": 0, "primary": 0}
+
+
+def is_configured() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+def meta_path() -> str:
+    return f"{settings.DATABASES[REPLICA]['NAME']}.meta.json"
+
+
+# la hora del snapshot se relee del disco a lo sumo una vez por segundo por proceso
+_meta_local = {"checked": 0.0, "refreshed_at": None}
+
+
+def _refreshed_at():
+    now = time.monotonic()
+    if now - _meta_local["checked"] > 1.0:
+        try:
+            with open(meta_path()) as f:
+                refreshed_at = json.load(f)["refreshed_at"]
+        except (OSError, ValueError, KeyError):
+            try:  # sin metadatos: la fecha del archivo (optimista)
+                refreshed_at = os.path.getmtime(settings.DATABASES[REPLICA]["NAME"])
+            except OSError:
+                refreshed_at = None
+        _meta_local.update(checked=now, refreshed_at=refreshed_at)
+    return _meta_local["refreshed_at"]
+
+
+def staleness():
+    """Segundos desde el snapshot de la réplica; None si no hay réplica o no se sabe."""
+    if not is_configured():
+        return None
+    refreshed_at = _refreshed_at()
+    return None if refreshed_at is None else max(0.0, time.time() - refreshed_at)
+
+
+def replica_snapshot():
+    """Hora del snapshot si la vista en curso lee de la réplica; None si lee del primario."""
+    return _refreshed_at() if _use_replica.get() else None
+
+
+def replica_usable() -> bool:
+    lag = staleness()
+    return lag is not None and lag <= getattr(settings, "REPLICA_MAX_STALENESS", 300)
+
+
+def _reopen_if_refreshed():
+    # refresh_replica reemplaza el archivo: una conexión abierta antes (persistente, o de un
+    # hilo que no cierra por request) seguiría leyendo el snapshot anterior
+    conn = connections[REPLICA]
+    refreshed_at = _refreshed_at()
+    if getattr(conn, "replica_snapshot", None) != refreshed_at and not conn.in_atomic_block:
+        conn.close()
+        conn.replica_snapshot = refreshed_at
+
+
+def replica_reads(fn):
+    """Decorador para APIView.get: las lecturas de modelos de inventory van a la réplica si está al día."""
+    @functools.wraps(fn)
+    def wrapper(self, request, *args, **kwargs):
+        if not is_configured():
+            return fn(self, request, *args, **kwargs)
+        use = replica_usable()
+        stats["replica" if use else "primary"] += 1
+        if use:
+            _reopen_if_refreshed()
+        token = _use_replica.set(use)
+        try:
+            response = fn(self, request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+        response["X-Replica"] = REPLICA if use else "primary"
+        lag = staleness()
+        if lag is not None:
+            response["X-Replica-Staleness"] = f"{lag:.0f}"
+        return response
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and model._meta.app_label in REPLICA_APPS:
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        # sin esto, un objeto leído de la réplica se guardaría en ella
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db == REPLICA:
+            return "default"
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # misma BD lógica (la réplica es copia del primario)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA  # la réplica se copia, no se migra
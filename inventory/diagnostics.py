@@ -0,0 +1,183 @@
+# inventory/diagnostics.py
+# Modo diagnóstico de consultas: registro de consultas lentas (con vista, stack de la
+# app y EXPLAIN QUERY PLAN) y detección de N+1 (misma forma de consulta repetida en
+# una request). Lo usan QueryDiagnosticsMiddleware (QUERY_DIAGNOSTICS en settings) y
+# el comando diagnose_endpoints.
+import logging
+import re
+import time
+import traceback
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("inventory.diagnostics")
+
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# wrappers de BD/middlewares propios: no aportan al stack de quien hizo la consulta
+_SKIP_FILES = ("inventory/diagnostics.py", "inventory/metrics.py")
+
+
+def query_shape(sql: str) -> str:
+    """Forma de la consulta: listas IN y literales colapsados (misma forma = mismo SQL con otros valores)."""
+    return _LITERAL.sub("?", _IN_LIST.sub("(…)", sql))
+
+
+def app_stack(limit: int = 8) -> list:
+    """Frames del código del proyecto (sin Django/DRF ni wrappers propios), del más interno al externo."""
+    base = str(settings.BASE_DIR)
+    frames = [
+        f"{f.filename[len(base) + 1:]}:{f.lineno} in {f.name}"
+        for f in traceback.extract_stack()
+        if f.filename.startswith(base) and "site-packages" not in f.filename and not f.filename.endswith(_SKIP_FILES)
+    ]
+    return frames[::-1][:limit]
+
+
+class Query:
+    __slots__ = ("sql", "params", "ms", "alias", "shape", "stack")
+
+    def __init__(self, sql, params, ms, alias, shape, stack):
+        self.sql = sql
+        self.params = params
+        self.ms = ms
+        self.alias = alias
+        self.shape = shape
+        self.stack = stack
+
+
+class QueryRecorder:
+    """
+    Context manager: registra las consultas de todas las conexiones del hilo.
+    El stack se captura para la primera consulta de cada forma y para las lentas.
+    """
+
+    def __init__(self, *, slow_ms: float = None):
+        self.slow_ms = slow_ms if slow_ms is not None else getattr(settings, "QUERY_DIAGNOSTICS_SLOW_MS", 100)
+        self.queries = []
+        self._seen = set()
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for conn in connections.all():
+            self._stack.enter_context(conn.execute_wrapper(self._wrapper(conn.alias)))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+        return False
+
+    def _wrapper(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            t0 = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                ms = (time.perf_counter() - t0) * 1000
+                shape = query_shape(sql)
+                stack = None
+                if ms >= self.slow_ms or shape not in self._seen:
+                    self._seen.add(shape)
+                    stack = app_stack()
+                self.queries.append(Query(sql, None if many else params, ms, alias, shape, stack))
+        return wrapper
+
+    @property
+    def total_ms(self) -> float:
+        return sum(q.ms for q in self.queries)
+
+    def slow(self) -> list:
+        return [q for q in self.queries if q.ms >= self.slow_ms]
+
+    def repeated(self, min_count: int = None) -> list:
+        """[(forma, veces, ms totales, primera Query)] de formas repetidas >= min_count (probable N+1)."""
+        min_count = min_count or getattr(settings, "QUERY_DIAGNOSTICS_NPLUSONE", 5)
+        groups = {}
+        for q in self.queries:
+            g = groups.get(q.shape)
+            if g is None:
+                groups[q.shape] = [1, q.ms, q]
+            else:
+                g[0] += 1
+                g[1] += q.ms
+        out = [(shape, n, ms, first) for shape, (n, ms, first) in groups.items() if n >= min_count]
+        return sorted(out, key=lambda r: -r[1])
+
+
+def explain(query: Query) -> list:
+    """
+    Plan de la consulta (EXPLAIN QUERY PLAN en SQLite, EXPLAIN en otros motores).
+    Solo SELECT/WITH; se ejecuta fuera del QueryRecorder. [] si no aplica o falla.
+    """
+    if query.params is None or not query.sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        return []
+    conn = connections[query.alias]
+    prefix = "EXPLAIN QUERY PLAN " if conn.vendor == "sqlite" else "EXPLAIN "
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(prefix + query.sql, query.params)
+            rows = cursor.fetchall()
+    except Exception as e:  # el plan es informativo: nunca rompe la request
+        return [f"(sin plan: {e})"]
+    if conn.vendor == "sqlite":
+        return [str(r[-1]) for r in rows]
+    return [" ".join(str(c) for c in r) for r in rows]
+
+
+def full_scans(plan: list) -> list:
+    """Líneas del plan de SQLite que recorren una tabla completa (SCAN sin índice)."""
+    return [line for line in plan if line.startswith("SCAN ") and " INDEX " not in line]
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return request.path
+    return match.view_name or match._func_path
+
+
+def log_request(rec: QueryRecorder, view: str) -> int:
+    """Registra consultas lentas (con plan) y formas repetidas. Devuelve cuántas advertencias."""
+    warnings = 0
+    for q in rec.slow():
+        warnings += 1
+        plan = explain(q)
+        logger.warning(
+            "consulta lenta %.1f ms en %s\n  SQL: %s\n  stack:\n    %s\n  plan:\n    %s",
+            q.ms, view, q.sql, "\n    ".join(q.stack or ["?"]), "\n    ".join(plan or ["-"]),
+        )
+    for shape, n, ms, first in rec.repeated():
+        warnings += 1
+        logger.warning(
+            "posible N+1 en %s: %d consultas con la misma forma (%.1f ms)\n  SQL: %s\n  stack:\n    %s",
+            view, n, ms, shape, "\n    ".join(first.stack or ["?"]),
+        )
+    return warnings
+
+
+class QueryDiagnosticsMiddleware:
+    """
+    Activo con QUERY_DIAGNOSTICS=1: registra consultas lentas (QUERY_DIAGNOSTICS_SLOW_MS)
+    y formas repetidas (QUERY_DIAGNOSTICS_NPLUSONE) por request en el logger
+    inventory.diagnostics y añade X-Query-Count / X-Query-Warnings a la respuesta.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_DIAGNOSTICS", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rec = QueryRecorder()
+        with rec:
+            response = self.get_response(request)
+
+        warnings = log_request(rec, _view_name(request))
+        response["X-Query-Count"] = str(len(rec.queries))
+        if warnings:
+            response["X-Query-Warnings"] = str(warnings)
+        return response
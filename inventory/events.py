@@ -0,0 +1,159 @@
+# inventory/events.py
+# Broker pub/sub en proceso para el stream SSE (ver sse.py).
+#
+# Las rutas de escritura publican al hacer commit (publish_on_commit) desde cualquier
+# hilo; cada suscriptor es una asyncio.Queue en el event loop del servidor ASGI y la
+# entrega se hace con loop.call_soon_threadsafe (un callback por loop, no por cliente).
+# Los últimos eventos quedan en un buffer circular para reanudar con Last-Event-ID.
+#
+# El broker es por proceso: con varios workers cada uno ve solo sus propias escrituras.
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import deque
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import sharding
+
+EVENT_TYPES = ("stock", "low_stock", "out_of_stock", "restocked", "sale", "fx")
+BUFFER_SIZE = 2048    # eventos que se pueden reanudar con Last-Event-ID
+QUEUE_SIZE = 1000     # pendientes por cliente antes de desconectarlo (reconecta y reanuda)
+LOW_STOCK_FALLBACK = 5  # mismo umbral por defecto que kpis/stock/alerts/
+
+# contadores de uso (los lee /metrics)
+stats = {"published": 0, "delivered": 0, "dropped_clients": 0, "subscribers": 0}
+
+
+class Event:
+    __slots__ = ("id", "type", "store_id", "data")
+
+    def __init__(self, id, type, store_id, data):
+        self.id = id
+        self.type = type
+        self.store_id = store_id
+        self.data = data
+
+    def encode(self) -> bytes:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n".encode()
+
+
+class Subscription:
+    def __init__(self, broker, loop, store_id=None, types=None):
+        self.broker = broker
+        self.loop = loop
+        self.store_id = store_id
+        self.types = set(types) if types else None
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+
+    def wants(self, event: Event) -> bool:
+        if self.types is not None and event.type not in self.types:
+            return False
+        # eventos sin sede (fx) van a todos
+        return self.store_id is None or event.store_id is None or event.store_id == self.store_id
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    def __init__(self, buffer_size: int = BUFFER_SIZE):
+        self._lock = threading.Lock()
+        # ids crecientes entre reinicios: un Last-Event-ID de otra ejecución nunca es "futuro"
+        self._ids = itertools.count(int(time.time() * 1000) * 1000)
+        self._buffer = deque(maxlen=buffer_size)
+        self._subs = {}  # loop → set(Subscription)
+
+    def publish(self, type: str, data: dict, *, store_id=None) -> Event:
+        payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+        with self._lock:
+            event = Event(next(self._ids), type, store_id, payload)
+            self._buffer.append(event)
+            loops = list(self._subs)
+        stats["published"] += 1
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._fanout, loop, event)
+            except RuntimeError:  # loop cerrado
+                with self._lock:
+                    self._subs.pop(loop, None)
+        return event
+
+    def _fanout(self, loop, event: Event):
+        """Corre dentro del loop: reparte el evento a sus suscriptores."""
+        for sub in list(self._subs.get(loop, ())):
+            if not sub.wants(event):
+                continue
+            try:
+                sub.queue.put_nowait(event)
+                stats["delivered"] += 1
+            except asyncio.QueueFull:
+                # cliente lento: se corta y al reconectar reanuda desde su último id
+                sub.overflowed = True
+                self.unsubscribe(sub)
+                stats["dropped_clients"] += 1
+
+    def subscribe(self, *, store_id=None, types=None, last_event_id=None):
+        """
+        Registra un suscriptor en el loop actual. Devuelve (sub, replay, gap):
+        replay son los eventos del buffer posteriores a last_event_id y gap indica
+        que el id ya salió del buffer (el cliente debe recargar su estado).
+        """
+        loop = asyncio.get_running_loop()
+        sub = Subscription(self, loop, store_id=store_id, types=types)
+        with self._lock:
+            self._subs.setdefault(loop, set()).add(sub)
+            buffered = list(self._buffer)
+        stats["subscribers"] += 1
+
+        replay, gap = [], False
+        if last_event_id is not None:
+            replay = [e for e in buffered if e.id > last_event_id and sub.wants(e)]
+            gap = bool(buffered) and buffered[0].id > last_event_id + 1
+        return sub, replay, gap
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            subs = self._subs.get(sub.loop)
+            if subs is None or sub not in subs:
+                return
+            subs.discard(sub)
+            if not subs:
+                self._subs.pop(sub.loop, None)
+        stats["subscribers"] -= 1
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subs.values())
+
+
+broker = Broker()
+
+
+def stock_crossing(old, new, min_threshold):
+    """Tipo de evento si la cantidad cruzó el umbral (None si no hubo cruce o no hay valor previo)."""
+    if old is None or old == new:
+        return None
+    threshold = min_threshold or LOW_STOCK_FALLBACK
+    if new == 0 and old > 0:
+        return "out_of_stock"
+    if new <= threshold < old:
+        return "low_stock"
+    if old <= threshold < new:
+        return "restocked"
+    return None
+
+
+def publish_on_commit(type: str, data, *, store_id=None) -> None:
+    """
+    Publica cuando la transacción actual hace commit (inmediato fuera de un atomic; con
+    sharding, la del shard de la venta). data puede ser un callable: se evalúa al commit,
+    con los valores finales.
+    """
+    def send():
+        broker.publish(type, data() if callable(data) else data, store_id=store_id)
+
+    sharding.on_commit(send)
@@ -0,0 +1,170 @@
+# inventory/group_commit.py
+# Escritor único con group commit para la creación de ventas (SALE_GROUP_COMMIT=1).
+#
+# POST sales/ valida en el hilo de la request y encola la escritura. Un hilo escritor por
+# proceso toma todo lo encolado (hasta SALE_GROUP_COMMIT_MAX_BATCH, esperando a lo sumo
+# SALE_GROUP_COMMIT_WINDOW_MS a que llegue más) y lo ejecuta en UNA transacción, cada venta
+# en su propio savepoint: la que falla (stock insuficiente, integridad) se revierte sola y
+# su request recibe la excepción; las demás se confirman juntas (un lock de escritura y un
+# fsync por lote en vez de uno por venta). Los on_commit (KPIs, SSE) corren tras el commit.
+#
+# Con sharding cada venta va al lote de su shard (una transacción por shard y lote): el
+# lock y el fsync que se ahorran son los del shard, que es donde se escribe la venta.
+#
+# El escritor es por proceso: con varios workers hay un escritor por worker, que compiten
+# entre ellos pero ya no con los hilos de su worker. Rinde más con pocos procesos y muchos hilos.
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from . import sharding
+
+# contadores (los lee /metrics)
+stats = {"batches": 0, "committed": 0, "failed": 0, "cancelled": 0, "max_batch": 0}
+
+
+class GroupCommitBusy(RuntimeError):
+    pass
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "SALE_GROUP_COMMIT", False)
+
+
+class _Job:
+    __slots__ = ("fn", "using", "event", "lock", "state", "result", "error")
+
+    def __init__(self, fn, using=None):
+        self.fn = fn
+        self.using = using  # alias de la BD donde escribe (None: default)
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.state = "queued"  # queued → running → done | cancelled
+        self.result = None
+        self.error = None
+
+    def start(self) -> bool:
+        with self.lock:
+            if self.state != "queued":
+                return False
+            self.state = "running"
+            return True
+
+    def cancel(self) -> bool:
+        """Solo se cancela lo que el escritor todavía no tomó: lo tomado termina y se informa."""
+        with self.lock:
+            if self.state != "queued":
+                return False
+            self.state = "cancelled"
+            return True
+
+
+class Writer:
+    def __init__(self, max_batch: int = 32, window: float = 0.002):
+        self.max_batch = max_batch
+        self.window = window
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, fn, timeout: float = None, using=None):
+        """Ejecuta fn() en el hilo escritor dentro de un lote de `using`; devuelve su resultado o relanza su error."""
+        job = _Job(fn, using)
+        self._ensure_started()
+        self._queue.put(job)
+        if not job.event.wait(timeout) and job.cancel():
+            stats["cancelled"] += 1
+            raise GroupCommitBusy("Cola de escritura de ventas saturada; reintente.")
+        job.event.wait()  # ya estaba en un lote: esperar su resultado real
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _ensure_started(self):
+        # arranque perezoso: el hilo nace en el worker (después de un fork), no en el master
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sale-group-commit", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    pass
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=left))
+                except queue.Empty:
+                    break
+            self._commit([job for job in batch if job.start()])
+
+    def _commit(self, jobs):
+        if not jobs:
+            return
+        close_old_connections()  # respeta CONN_MAX_AGE / health checks como una request
+        by_db = {}
+        for job in jobs:
+            by_db.setdefault(job.using, []).append(job)
+        for using, group in by_db.items():
+            self._commit_group(using, group)
+
+    def _commit_group(self, using, jobs):
+        try:
+            with sharding.using_shard(using), transaction.atomic(using=using):
+                for job in jobs:
+                    try:
+                        with transaction.atomic(using=using):  # savepoint: atomicidad por venta
+                            job.result = job.fn()
+                    except Exception as e:
+                        job.error = e
+        except Exception as e:  # falló BEGIN o COMMIT: no se confirmó ninguna
+            for job in jobs:
+                if job.error is None:
+                    job.result, job.error = None, e
+        finally:
+            failed = sum(1 for job in jobs if job.error is not None)
+            stats["batches"] += 1
+            stats["committed"] += len(jobs) - failed
+            stats["failed"] += failed
+            stats["max_batch"] = max(stats["max_batch"], len(jobs))
+            for job in jobs:
+                with job.lock:
+                    job.state = "done"
+                job.event.set()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def writer() -> Writer:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = Writer(
+                    max_batch=getattr(settings, "SALE_GROUP_COMMIT_MAX_BATCH", 32),
+                    window=getattr(settings, "SALE_GROUP_COMMIT_WINDOW_MS", 2) / 1000,
+                )
+    return _writer
+
+
+def submit(fn, using=None):
+    """
+    Encola fn() en el escritor del proceso, en el lote de la BD `using` (None: default), y
+    espera su resultado (GroupCommitBusy si vence la espera).
+    """
+    return writer().submit(fn, timeout=getattr(settings, "SALE_GROUP_COMMIT_TIMEOUT", 10), using=using)
@@ -0,0 +1,129 @@
+# inventory/kpi_cache.py
+# Cache de respuestas de KPIs invalidado por contadores de generación.
+#
+# Cada dependencia ("sales", "stock", "fx") tiene un contador en el cache. Las rutas
+# de escritura lo incrementan al hacer commit (bump_on_commit) y la clave de cada
+# respuesta incluye los contadores vigentes: tras una venta la siguiente lectura
+# recalcula, el resto del tiempo se sirve del cache. El TTL es solo un respaldo.
+#
+# Con varios workers el backend de cache debe ser compartido (ver CACHES en settings).
+#
+# Vistas con @replica_reads: si la respuesta sale de la réplica, la clave lleva además la
+# hora de su snapshot. Un cálculo contra un snapshot que no tiene la última venta queda
+# bajo ese snapshot y el siguiente refresh_replica lo descarta aunque el bump del comando
+# no llegue a los workers (cache por proceso).
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.response import Response
+
+from . import db_router, sharding
+
+GEN_PREFIX = "kpi:gen:"
+KEY_PREFIX = "kpi:resp:"
+
+# contadores de uso (los lee /metrics)
+stats = {"hits": 0, "misses": 0, "bumps": 0}
+
+
+def _gen_key(dep: str) -> str:
+    return f"{GEN_PREFIX}{dep}"
+
+
+def generations(deps) -> tuple:
+    """Generación vigente de cada dependencia (la crea si el cache la perdió)."""
+    keys = [_gen_key(d) for d in deps]
+    found = cache.get_many(keys)
+    out = []
+    for k in keys:
+        val = found.get(k)
+        if val is None:
+            # valor inicial único: si el cache expulsó el contador no se reusan claves viejas
+            cache.add(k, time.time_ns(), timeout=None)
+            val = cache.get(k)
+        out.append(val)
+    return tuple(out)
+
+
+def bump(*deps) -> None:
+    for d in deps:
+        k = _gen_key(d)
+        try:
+            cache.incr(k)
+        except ValueError:
+            cache.add(k, time.time_ns(), timeout=None)
+        stats["bumps"] += 1
+
+
+def bump_on_commit(*deps) -> None:
+    """
+    Incrementa las generaciones cuando la transacción actual hace commit (fuera de un
+    atomic, en el acto; con sharding, la del shard de la venta). Cada llamada registra su
+    propio callback: una venta de varias líneas hace varios incrementos, que son baratos.
+    Deduplicarlos exigiría saber si un callback sigue registrado tras revertir un
+    savepoint, y eso es interno de Django.
+    """
+    sharding.on_commit(lambda: bump(*deps))
+
+
+def _permission_scope(user) -> str:
+    if not getattr(user, "is_authenticated", False):
+        return "anon"
+    if user.is_superuser:
+        return "su"
+    perms = ",".join(sorted(user.get_all_permissions()))
+    return hashlib.sha1(perms.encode()).hexdigest()[:16]
+
+
+def request_fingerprint(view, request, args=(), kwargs=None, *, extra=()) -> str:
+    """
+    Huella de una petición GET: vista, query params, args de URL, alcance de
+    permisos y día local (+ extra). La usan el cache de KPIs y el single-flight.
+    """
+    params = sorted((k, tuple(v)) for k, v in request.query_params.lists())
+    raw = repr((
+        type(view).__name__, params, tuple(args), sorted((kwargs or {}).items()),
+        _permission_scope(request.user), timezone.localdate().isoformat(), tuple(extra),
+    ))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def cached_kpi(*deps, timeout=None):
+    """
+    Decorador para APIView.get: cachea response.data (solo 200) por endpoint,
+    query params, alcance de permisos, día local, generaciones de `deps` y snapshot
+    de la réplica si se lee de ella.
+    Añade la cabecera X-Cache: HIT | MISS.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, request, *args, **kwargs):
+            if not getattr(settings, "KPI_CACHE_ENABLED", True):
+                return fn(self, request, *args, **kwargs)
+
+            extra = generations(deps) + (db_router.replica_snapshot(),)
+            key = KEY_PREFIX + request_fingerprint(self, request, args, kwargs, extra=extra)
+
+            data = cache.get(key)
+            if data is not None:
+                stats["hits"] += 1
+                response = Response(data)
+                response["X-Cache"] = "HIT"
+                return response
+
+            stats["misses"] += 1
+            # single_flight (debajo) coalesce con esta misma clave: una petición que llega
+            # tras un bump no se une a un cálculo de la generación anterior
+            request.kpi_cache_key = key
+            response = fn(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                ttl = timeout if timeout is not None else getattr(settings, "KPI_CACHE_TIMEOUT", 300)
+                cache.set(key, response.data, ttl)
+            response["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,65 @@
+# inventory/management/commands/archive_sales.py
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from inventory import sharding
+from inventory.archive import MAX_BATCH, archive_sales, cutoff_for_months
+from inventory.models import Sale
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve las ventas viejas a ArchivedSale/ArchivedSaleItem en lotes (una transacción por lote, "
+        "sin señales: resúmenes diarios y stock no cambian). Por defecto, las anteriores al primer día "
+        "del mes de hace SALE_ARCHIVE_MONTHS meses. Factura, detalle y reportes siguen leyéndolas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months", type=int, default=None, help="Meses a conservar en caliente (default: SALE_ARCHIVE_MONTHS).")
+        parser.add_argument("--before", default="", help="Fecha de corte YYYY-MM-DD (reemplaza --months).")
+        parser.add_argument("--batch-size", type=int, default=None, help="Ventas por transacción (default: SALE_ARCHIVE_BATCH; máx. 900).")
+        parser.add_argument("--max-batches", type=int, default=None, help="Lotes como máximo por BD (para correr por tramos).")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Segundos de pausa entre lotes.")
+        parser.add_argument("--dry-run", action="store_true", help="Solo cuenta las ventas a archivar.")
+
+    def handle(self, *args, **opts):
+        before = self._cutoff(opts)
+        batch_size = opts["batch_size"] or settings.SALE_ARCHIVE_BATCH
+        if not 1 <= batch_size <= MAX_BATCH:
+            raise CommandError(f"--batch-size debe estar entre 1 y {MAX_BATCH}.")
+        self.stdout.write(f"Corte: ventas anteriores a {before:%Y-%m-%d %H:%M %Z}")
+
+        total = {"sales": 0, "items": 0, "batches": 0}
+        for alias in sharding.shard_aliases() or [None]:  # con sharding, cada shard archiva lo suyo
+            label = alias or "default"
+            with sharding.using_shard(alias):
+                if opts["dry_run"]:
+                    n = Sale.objects.filter(created_at__lt=before).count()
+                    self.stdout.write(f"{label}: {n} ventas a archivar")
+                    continue
+                moved = archive_sales(
+                    before, batch_size=batch_size, max_batches=opts["max_batches"], pause=opts["sleep"],
+                    on_batch=lambda m: self.stdout.write(f"  {label}: {m['sales']} ventas, {m['items']} líneas"),
+                )
+            self.stdout.write(f"{label}: {moved['sales']} ventas ({moved['items']} líneas) en {moved['batches']} lotes")
+            for k in total:
+                total[k] += moved[k]
+
+        if not opts["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"Archivadas {total['sales']} ventas ({total['items']} líneas)."))
+            if total["sales"]:
+                self.stdout.write("Para devolver el espacio al disco: manage.py sqlite_maintenance --vacuum")
+
+    def _cutoff(self, opts):
+        if opts["before"]:
+            try:
+                return timezone.make_aware(datetime.strptime(opts["before"], "%Y-%m-%d"))
+            except ValueError:
+                raise CommandError("--before debe ser YYYY-MM-DD.")
+        months = settings.SALE_ARCHIVE_MONTHS if opts["months"] is None else opts["months"]
+        if months < 1:
+            raise CommandError("--months debe ser >= 1.")
+        return cutoff_for_months(months)
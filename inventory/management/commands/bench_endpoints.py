@@ -0,0 +1,265 @@
+# inventory/management/commands/bench_endpoints.py
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from inventory.models import Sale, Stock
+from inventory.synthetic import generate
+
+BUDGETS = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "bench_budgets.json")
+
+# nombre → (método, url, status esperado, líneas de venta para POST)
+CASES = {
+    "sale_create_1": ("POST", "/api/inventory/sales/", 201, 1),
+    "sale_create_10": ("POST", "/api/inventory/sales/", 201, 10),
+    "sale_create_100": ("POST", "/api/inventory/sales/", 201, 100),
+    "product_list": ("GET", "/api/inventory/products/", 200, 0),
+    "product_search": ("GET", "/api/inventory/products/?search=Harina", 200, 0),
+    "stats": ("GET", "/api/inventory/stats/", 200, 0),
+    "top_products": ("GET", "/api/inventory/kpis/sales/top-products/?period=month", 200, 0),
+    "stock_alerts": ("GET", "/api/inventory/kpis/stock/alerts/", 200, 0),
+    "invoice": ("GET", "/api/inventory/sales/{sale}/invoice/", 200, 0),
+    "auth_me": ("GET", "/api/auth/me/", 200, 0),
+}
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = math.floor(k), math.ceil(k)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class _QueryCounter:
+    """execute_wrapper mínimo: solo cuenta (no distorsiona la latencia medida)."""
+
+    def __init__(self):
+        self.n = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.n += 1
+        return execute(sql, params, many, context)
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de endpoints (URLconf real, en proceso) sobre un dataset sintético en una BD de "
+        "prueba nueva (no toca la BD configurada): p50/p95 y consultas por endpoint, comparados con "
+        "inventory/bench_budgets.json. Guarda el resultado en JSON y falla si alguno excede su presupuesto."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sales", type=int, default=20_000)
+        parser.add_argument("--products", type=int, default=500)
+        parser.add_argument("--stores", type=int, default=3)
+        parser.add_argument("--repeat", type=int, default=20, help="Mediciones por endpoint.")
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--only", nargs="+", default=[], help=f"Casos: {', '.join(CASES)}")
+        parser.add_argument("--budgets", default=BUDGETS)
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Margen sobre el p95 presupuestado.")
+        parser.add_argument("--output", default="", help="JSON de resultados (default: bench_results/endpoints-<fecha>.json).")
+        parser.add_argument("--update-budgets", action="store_true", help="Reescribe los presupuestos con esta corrida.")
+        parser.add_argument("--kpi-cache", action="store_true", help="Mide con el cache de KPIs activo.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        unknown = [c for c in opts["only"] if c not in CASES]
+        if unknown:
+            raise CommandError(f"Casos desconocidos: {', '.join(unknown)}")
+        cases = opts["only"] or list(CASES)
+        dataset = {"sales": opts["sales"], "products": opts["products"], "stores": opts["stores"], "seed": opts["seed"]}
+
+        # BD de prueba vacía: los conteos de consultas no dependen de lo que haya en la BD real
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+        try:
+            with override_settings(KPI_CACHE_ENABLED=opts["kpi_cache"],
+                                   ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+                t0 = time.perf_counter()
+                generate(sales=opts["sales"], products=opts["products"], stores=opts["stores"],
+                         categories=20, prefix="bench", seed=opts["seed"])
+                self.stdout.write(f"Dataset sintético: {time.perf_counter() - t0:.1f}s")
+                results = self._run(cases, opts)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        report = {
+            "created_at": datetime.now(dt_timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "kpi_cache": opts["kpi_cache"],
+            "repeat": opts["repeat"],
+            "dataset": dataset,
+            "results": results,
+        }
+        self._write_report(report, opts)
+
+        if opts["update_budgets"]:
+            self._update_budgets(report, opts["budgets"])
+            return
+        failures = self._check(report, opts)
+        if failures:
+            raise CommandError(f"{len(failures)} endpoint(s) sobre presupuesto: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("Todos los endpoints dentro del presupuesto."))
+
+    # ---- Medición ----
+
+    def _run(self, cases, opts):
+        user = get_user_model().objects.create_superuser("bench-endpoints", password=None)
+        client = APIClient()
+        client.cookies["access"] = str(RefreshToken.for_user(user).access_token)  # mismo camino que el frontend
+        client.raise_request_exception = False
+
+        store = Sale.objects.values_list("store_id", flat=True).order_by("-id").first()
+        # stock de sobra en la sede de las ventas medidas
+        Stock.objects.filter(store_id=store).update(quantity=10**6)
+        products = list(
+            Stock.objects.filter(store_id=store).order_by("product_id").values_list("product_id", flat=True)[:100]
+        )
+        ids = {"sale": Sale.objects.order_by("-id").values_list("id", flat=True).first()}
+
+        results = {}
+        for name in cases:
+            method, url, expected, lines = CASES[name]
+            url = url.format(**ids)
+            body = None
+            if lines:
+                if len(products) < lines:
+                    raise CommandError(f"{name}: el dataset tiene solo {len(products)} productos en la sede.")
+                body = {
+                    "store": store, "payment_method": "PAGO_MOVIL", "payment_reference": "000123",
+                    "customer_name": "Bench", "customer_id_doc": "V1",
+                    "items": [{"product_id": pid, "quantity": 1} for pid in products[:lines]],
+                }
+
+            times, queries, statuses = [], [], set()
+            for i in range(opts["warmup"] + max(1, opts["repeat"])):
+                counter = _QueryCounter()
+                for conn in connections.all():
+                    conn.execute_wrappers.append(counter)
+                t0 = time.perf_counter()
+                try:
+                    if body is None:
+                        response = client.get(url)
+                    else:
+                        response = client.post(url, body, format="json")
+                finally:
+                    elapsed = (time.perf_counter() - t0) * 1000
+                    for conn in connections.all():
+                        conn.execute_wrappers.remove(counter)
+                if i < opts["warmup"]:
+                    continue
+                times.append(elapsed)
+                queries.append(counter.n)
+                statuses.add(response.status_code)
+
+            results[name] = {
+                "method": method,
+                "url": url,
+                "status": sorted(statuses),
+                "ok": statuses == {expected},
+                "p50_ms": round(statistics.median(times), 2),
+                "p95_ms": round(_percentile(times, 95), 2),
+                "max_ms": round(max(times), 2),
+                "queries": max(queries),
+                "queries_min": min(queries),
+            }
+            r = results[name]
+            self.stdout.write(
+                f"{name:<18} {','.join(map(str, r['status'])):>7} p50 {r['p50_ms']:>9.1f} ms  "
+                f"p95 {r['p95_ms']:>9.1f} ms  consultas {r['queries']:>5}"
+            )
+        return results
+
+    # ---- Resultados y presupuestos ----
+
+    def _write_report(self, report, opts):
+        path = opts["output"]
+        if not path:
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(settings.BASE_DIR, "bench_results", f"endpoints-{stamp}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        self.stdout.write(f"Resultados: {path}")
+
+    def _load_budgets(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise CommandError(f"No existe {path}: genera presupuestos con --update-budgets.")
+
+    def _check(self, report, opts):
+        budgets = self._load_budgets(opts["budgets"])
+        if budgets.get("dataset") != report["dataset"]:
+            self.stdout.write(self.style.WARNING(
+                f"Dataset distinto al de los presupuestos ({budgets.get('dataset')}): latencias no comparables."
+            ))
+
+        failures = []
+        self.stdout.write(f"\n{'endpoint':<18} {'consultas':>13} {'p95 ms':>17}")
+        for name, r in report["results"].items():
+            budget = budgets.get("endpoints", {}).get(name)
+            problems = []
+            if not r["ok"]:
+                problems.append(f"status {r['status']}")
+            if budget is None:
+                self.stdout.write(self.style.WARNING(f"{name:<18} sin presupuesto"))
+                continue
+            limit_ms = budget["p95_ms"] * (1 + opts["tolerance"])
+            if r["queries"] > budget["queries"]:
+                problems.append(f"consultas {r['queries']} > {budget['queries']}")
+            if r["p95_ms"] > limit_ms:
+                problems.append(f"p95 {r['p95_ms']:.1f} > {limit_ms:.1f} ms")
+            line = (f"{name:<18} {r['queries']:>5} / {budget['queries']:<5} "
+                    f"{r['p95_ms']:>7.1f} / {budget['p95_ms']:<7}")
+            if problems:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"{line} ✗ {'; '.join(problems)}"))
+            else:
+                self.stdout.write(line)
+        return failures
+
+    def _update_budgets(self, report, path):
+        # consultas: exactas (deterministas); p95: el doble de lo medido (varía entre máquinas)
+        endpoints = {
+            name: {"queries": r["queries"], "p95_ms": max(10, math.ceil(r["p95_ms"] * 2))}
+            for name, r in report["results"].items()
+        }
+        try:
+            budgets = self._load_budgets(path)
+        except CommandError:
+            budgets = {}
+        budgets.setdefault("endpoints", {}).update(endpoints)
+        budgets["dataset"] = report["dataset"]
+        budgets["measured_at"] = report["created_at"]
+        budgets["commit"] = report["commit"]
+        with open(path, "w") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write("\n")
+        self.stdout.write(self.style.SUCCESS(f"Presupuestos actualizados: {path}"))
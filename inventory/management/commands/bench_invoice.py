@@ -0,0 +1,67 @@
+# inventory/management/commands/bench_invoice.py
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory.models import Product, Sale, SaleItem, Store
+from inventory.pdf import render_sale_pdf
+
+
+class Command(BaseCommand):
+    help = "Mide el tiempo de render_sale_pdf para ventas de 10, 100 y 1000 líneas (sin tocar la BD)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, nargs="+", default=[10, 100, 1000])
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--currency", choices=["USD", "VES"], default="USD")
+
+    def _fake_sale(self, n_lines: int):
+        store = Store(id=1, name="Sede Bench", code="bench")
+        sale = Sale(
+            id=123456,
+            store=store,
+            created_at=timezone.now(),
+            fx_usd=Decimal("40.0000"),
+            customer_name="Cliente Mayorista C.A.",
+            customer_address="Av. Principal, Caracas",
+            customer_id_doc="J-12345678-9",
+            customer_phone="04120000000",
+            payment_method="PUNTO",
+        )
+        items = []
+        total_bs = Decimal("0.00")
+        for i in range(n_lines):
+            product = Product(id=i + 1, sku=f"SKU-{i:05d}", name=f"Producto de prueba {i}")
+            up_usd = Decimal("1.25") + Decimal(i % 50)
+            up_bs = (up_usd * sale.fx_usd).quantize(Decimal("0.01"))
+            qty = 1 + (i % 7)
+            items.append(SaleItem(sale=sale, product=product, quantity=qty,
+                                  unit_price_usd=up_usd, unit_price=up_bs))
+            total_bs += up_bs * qty
+
+        sale.total = total_bs
+        sale.subtotal_bs = (total_bs / Decimal("1.16")).quantize(Decimal("0.01"))
+        sale.vat_bs = total_bs - sale.subtotal_bs
+        sale.total_usd = (total_bs / sale.fx_usd).quantize(Decimal("0.01"))
+        return sale, items
+
+    def handle(self, *args, **opts):
+        repeat = max(1, opts["repeat"])
+        self.stdout.write(f"{'líneas':>8} {'mejor ms':>10} {'medio ms':>10} {'µs/línea':>10} {'KB':>8}")
+
+        for n in opts["lines"]:
+            sale, items = self._fake_sale(n)
+            times = []
+            size = 0
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                pdf = render_sale_pdf(sale, currency=opts["currency"], items=items)
+                times.append(time.perf_counter() - t0)
+                size = len(pdf)
+
+            best = min(times) * 1000
+            mean = sum(times) / len(times) * 1000
+            per_line = best * 1000 / max(1, n)
+            self.stdout.write(f"{n:>8} {best:>10.2f} {mean:>10.2f} {per_line:>10.1f} {size / 1024:>8.1f}")
@@ -0,0 +1,52 @@
+# inventory/management/commands/bench_pivot.py
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory.analytics import pivot_sales
+from inventory.bench import rolled_back, seed_sales, timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el pivot vectorizado (store × category × payment_method × period) sobre datos "
+        "sintéticos de varios tamaños. Cada tamaño se genera en una transacción que se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, nargs="+", default=[100_000, 1_000_000])
+        parser.add_argument("--products", type=int, default=2000)
+        parser.add_argument("--stores", type=int, default=5)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        combos = [
+            ["store"],
+            ["store", "period"],
+            ["category", "period"],
+            ["store", "category", "payment_method", "period"],
+        ]
+        end = timezone.now() + timedelta(seconds=1)
+        start = end - timedelta(days=366)
+
+        self.stdout.write(f"{'líneas':>10} {'dims':<40} {'ms':>9} {'líneas/s':>12} {'celdas':>8}")
+        for n in opts["lines"]:
+            with rolled_back():
+                t0 = time.perf_counter()
+                seed_sales(
+                    lines=n, products=opts["products"], stores=opts["stores"],
+                    categories=opts["categories"], seed=opts["seed"],
+                )
+                self.stdout.write(f"Datos sintéticos ({n} líneas): {time.perf_counter() - t0:.1f}s")
+
+                for dims in combos:
+                    ms, res = timed(lambda: pivot_sales(start, end, dims=dims, bucket="month"), opts["repeat"])
+                    rate = res["lines_scanned"] / (ms / 1000) if ms else 0
+                    self.stdout.write(
+                        f"{n:>10} {','.join(dims):<40} {ms:>9.1f} {rate:>12,.0f} {len(res['lines']):>8}"
+                    )
+        self.stdout.write("Datos sintéticos revertidos.")
@@ -0,0 +1,114 @@
+# inventory/management/commands/bench_sqlite.py
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.sqlite_bench import prepare, summarize, worker
+
+PROFILES = ("dev", "production")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara perfiles de SQLite (SQLITE_PROFILE) con lectores y escritores concurrentes (procesos) "
+        "sobre una BD temporal con datos sintéticos: lecturas/s, ventas/s, p50/p95 y errores de lock. "
+        "No toca la BD configurada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=4, help="Procesos lectores.")
+        parser.add_argument("--writers", type=int, default=2, help="Procesos que crean ventas.")
+        parser.add_argument("--duration", type=float, default=10, help="Segundos por perfil.")
+        parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=PROFILES)
+        parser.add_argument("--sales", type=int, default=5000, help="Ventas del dataset inicial.")
+        parser.add_argument("--products", type=int, default=300)
+        parser.add_argument("--stores", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", default="", help="JSON de resultados (default: bench_results/sqlite-<fecha>.json).")
+        parser.add_argument("--keep", action="store_true", help="Conserva las BD temporales.")
+
+    def handle(self, *args, **opts):
+        if opts["readers"] + opts["writers"] < 1:
+            raise CommandError("Hace falta al menos un lector o un escritor.")
+        cfg = {k: opts[k] for k in ("duration", "sales", "products", "stores", "seed")}
+        ctx = get_context("spawn")
+        tmp = tempfile.mkdtemp(prefix="bench-sqlite-")
+        template = os.path.join(tmp, "template.sqlite3")
+        try:
+            self.stdout.write(f"Dataset sintético ({opts['sales']} ventas) en {tmp} …")
+            with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                cfg.update(pool.submit(prepare, template, cfg).result())
+
+            results = {}
+            for profile in opts["profiles"]:
+                path = os.path.join(tmp, f"{profile}.sqlite3")
+                shutil.copy(template, path)  # misma BD de partida para cada perfil
+                results[profile] = self._run(ctx, path, profile, cfg, opts)
+        finally:
+            if not opts["keep"]:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+        self._print(results, opts)
+        self._write_report(results, cfg, opts)
+
+    def _run(self, ctx, path, profile, cfg, opts):
+        roles = ["read"] * opts["readers"] + ["write"] * opts["writers"]
+        with ctx.Manager() as manager, ProcessPoolExecutor(len(roles), mp_context=ctx) as pool:
+            barrier = manager.Barrier(len(roles))
+            futures = [pool.submit(worker, path, profile, role, cfg, i, barrier) for i, role in enumerate(roles)]
+            parts = [f.result() for f in futures]
+        summary = summarize(parts, opts["duration"])
+        wal = f"{path}-wal"
+        summary["wal_mb"] = round(os.path.getsize(wal) / 1024 / 1024, 1) if os.path.exists(wal) else 0
+        return summary
+
+    def _print(self, results, opts):
+        self.stdout.write(f"\n{opts['readers']} lectores + {opts['writers']} escritores, {opts['duration']:.0f}s por perfil")
+        self.stdout.write(f"{'perfil':<11} {'rol':<6} {'ok/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'máx ms':>8} "
+                          f"{'locks':>6} {'otros':>6}")
+        for profile, summary in results.items():
+            for role in ("read", "write"):
+                r = summary.get(role)
+                if r is None:
+                    continue
+                line = (f"{profile:<11} {role:<6} {r['per_s']:>8} {r['p50_ms'] or '-':>8} {r['p95_ms'] or '-':>8} "
+                        f"{r['max_ms'] or '-':>8} {r['lock_errors']:>6} {sum(r['errors'].values()):>6}")
+                self.stdout.write(self.style.WARNING(line) if r["lock_errors"] else line)
+                for name, n in sorted(r["errors"].items(), key=lambda kv: -kv[1])[:5]:
+                    self.stdout.write(f"    {n}× {name}")
+            if summary["wal_mb"]:
+                self.stdout.write(f"{profile:<11} -wal al terminar: {summary['wal_mb']} MB")
+
+        if len(results) > 1:
+            base, *others = results
+            for other in others:
+                for role in ("read", "write"):
+                    a, b = results[base].get(role), results[other].get(role)
+                    if a and b and a["per_s"]:
+                        self.stdout.write(f"{other} vs {base} ({role}): ×{b['per_s'] / a['per_s']:.2f} ops/s")
+
+    def _write_report(self, results, cfg, opts):
+        path = opts["output"]
+        if not path:
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(settings.BASE_DIR, "bench_results", f"sqlite-{stamp}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        report = {
+            "created_at": datetime.now(dt_timezone.utc).isoformat(),
+            "readers": opts["readers"],
+            "writers": opts["writers"],
+            "duration_s": opts["duration"],
+            "dataset": {k: cfg[k] for k in ("sales", "products", "stores", "seed")},
+            "pragmas": settings.SQLITE_PRAGMAS,
+            "results": results,
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        self.stdout.write(f"Resultados: {path}")
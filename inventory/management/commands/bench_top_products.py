@@ -0,0 +1,56 @@
+# inventory/management/commands/bench_top_products.py
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory.bench import rolled_back, seed_sales, timed
+from inventory.reports import top_products_raw, top_products_rollup
+from inventory.services import rebuild_sales_rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el ranking de TopSellingProductsView directo sobre SaleItem vs. el resumen "
+        "ProductSalesDaily. Genera datos sintéticos dentro de una transacción que se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, default=1_000_000, help="Líneas de venta sintéticas.")
+        parser.add_argument("--products", type=int, default=2000)
+        parser.add_argument("--lines-per-sale", type=int, default=4)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        with rolled_back():
+            t0 = time.perf_counter()
+            seed_sales(
+                lines=opts["lines"], products=opts["products"], lines_per_sale=opts["lines_per_sale"],
+                days=opts["days"], seed=opts["seed"],
+            )
+            self.stdout.write(f"Datos sintéticos: {time.perf_counter() - t0:.1f}s")
+
+            t0 = time.perf_counter()
+            rebuild_sales_rollup()
+            self.stdout.write(f"rebuild_sales_rollup: {time.perf_counter() - t0:.1f}s")
+
+            today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+            end = today + timedelta(days=1)
+            ranges = {
+                "week": (end - timedelta(days=7), end),
+                "month": (end - timedelta(days=30), end),
+                "year": (end - timedelta(days=365), end),
+            }
+
+            self.stdout.write(f"{'rango':>6} {'SaleItem ms':>12} {'rollup ms':>10} {'x':>6}  iguales")
+            for name, (start, stop) in ranges.items():
+                raw_ms, raw = timed(lambda: list(top_products_raw(start, stop)[:10]), opts["repeat"])
+                roll_ms, roll = timed(lambda: list(top_products_rollup(start, stop)[:10]), opts["repeat"])
+                same = [r["product_id"] for r in raw] == [r["product_id"] for r in roll]
+                self.stdout.write(
+                    f"{name:>6} {raw_ms:>12.1f} {roll_ms:>10.1f} {raw_ms / max(roll_ms, 1e-6):>6.1f}  {same}"
+                )
+        self.stdout.write("Datos sintéticos revertidos.")
@@ -0,0 +1,40 @@
+# inventory/management/commands/compute_reorder_points.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.analytics import AnalyticsUnavailable, compute_reorder_points
+
+
+class Command(BaseCommand):
+    help = (
+        "Pronostica la demanda diaria por producto × sede desde SaleItem y guarda umbrales "
+        "sugeridos (ReorderSuggestion). Con --apply también actualiza Stock.min_threshold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90, help="Historial a considerar (días).")
+        parser.add_argument("--method", choices=["ses", "sma"], default="ses")
+        parser.add_argument("--alpha", type=float, default=0.3, help="Suavizado exponencial (0-1).")
+        parser.add_argument("--window", type=int, default=28, help="Ventana de la media móvil y de σ (días).")
+        parser.add_argument("--lead-time", type=float, default=3, help="Días de reposición.")
+        parser.add_argument("--z", type=float, default=1.65, help="Factor de nivel de servicio (1.65 ≈ 95%%).")
+        parser.add_argument("--apply", action="store_true", help="Escribe el umbral sugerido en Stock.min_threshold.")
+
+    def handle(self, *args, **opts):
+        if opts["days"] < 1 or not (0 < opts["alpha"] <= 1):
+            raise CommandError("--days debe ser >= 1 y --alpha estar en (0, 1].")
+
+        t0 = time.perf_counter()
+        try:
+            res = compute_reorder_points(
+                days=opts["days"], method=opts["method"], alpha=opts["alpha"], window=opts["window"],
+                lead_time_days=opts["lead_time"], service_z=opts["z"], apply=opts["apply"],
+            )
+        except AnalyticsUnavailable as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{res['pairs']} pares producto × sede ({res['method']}, {res['days']} días) "
+            f"en {time.perf_counter() - t0:.2f}s; umbrales aplicados: {res['applied']}."
+        ))
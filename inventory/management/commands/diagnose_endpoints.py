@@ -0,0 +1,152 @@
+# inventory/management/commands/diagnose_endpoints.py
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from inventory.bench import rolled_back, seed_sales
+from inventory.diagnostics import QueryRecorder, explain, full_scans
+from inventory.models import Stock
+from inventory.services import rebuild_sales_rollup
+
+ENDPOINTS = [
+    "/api/inventory/products/",
+    "/api/inventory/products/{product}/",
+    "/api/inventory/stores/",
+    "/api/inventory/categories/",
+    "/api/inventory/sales/",
+    "/api/inventory/sales/{sale}/",
+    "/api/inventory/sales/{sale}/invoice/",
+    "/api/inventory/fx/",
+    "/api/inventory/stats/",
+    "/api/inventory/kpis/sales/top-products/?period=year",
+    "/api/inventory/kpis/stock/alerts/",
+    "/api/inventory/kpis/stock/reorder/",
+    "/api/inventory/kpis/stock/abc/",
+    "/api/inventory/kpis/sales/timeseries/?period=month",
+    "/api/inventory/reports/pivot/",
+    "/api/auth/me/",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Recorre los endpoints principales sobre datos sintéticos (transacción revertida) y reporta "
+        "consultas, tiempo de BD, posibles N+1, consultas lentas y planes (SCAN sin índice por tabla)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, default=20_000, help="Líneas de venta sintéticas.")
+        parser.add_argument("--products", type=int, default=500)
+        parser.add_argument("--stores", type=int, default=3)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--slow-ms", type=float, default=50)
+        parser.add_argument("--nplusone", type=int, default=5, help="Repeticiones de una forma para marcar N+1.")
+        parser.add_argument("--only", default="", help="Solo endpoints que contengan este texto.")
+        parser.add_argument("--plans", action="store_true", help="Imprime el plan de cada consulta distinta.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        with rolled_back(), override_settings(KPI_CACHE_ENABLED=False,
+                                              ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            t0 = time.perf_counter()
+            data = seed_sales(
+                lines=opts["lines"], products=opts["products"], stores=opts["stores"],
+                categories=opts["categories"], seed=opts["seed"],
+            )
+            Stock.objects.bulk_create(
+                [Stock(product=p, store=s, quantity=(p.id * 7 + s.id) % 40, min_threshold=(p.id % 3) * 5)
+                 for p in data["products"] for s in data["stores"]],
+                batch_size=1000,
+            )
+            rebuild_sales_rollup()
+            self.stdout.write(f"Datos sintéticos ({opts['lines']} líneas): {time.perf_counter() - t0:.1f}s\n")
+
+            user = get_user_model().objects.create_superuser(f"{data['user'].username}-admin", password=None)
+            client = APIClient()
+            client.force_authenticate(user)
+            client.raise_request_exception = False  # un endpoint que falla queda como 500 en el reporte
+            ids = {
+                "product": data["products"][0].id,
+                "sale": data["user"].sales_created.order_by("id").values_list("id", flat=True).first(),
+            }
+
+            report = []
+            for path in ENDPOINTS:
+                url = path.format(**ids)
+                if opts["only"] and opts["only"] not in url:
+                    continue
+                client.get(url)  # calienta caches de proceso (fx, usuarios)
+                rec = QueryRecorder(slow_ms=opts["slow_ms"])
+                t0 = time.perf_counter()
+                with rec:
+                    response = client.get(url)
+                report.append((url, response.status_code, (time.perf_counter() - t0) * 1000, rec))
+
+            self._print_summary(report, opts)
+            self._print_problems(report, opts)
+            self._print_plans(report, opts)
+        self.stdout.write("Datos sintéticos revertidos.")
+
+    def _print_summary(self, report, opts):
+        self.stdout.write(f"{'endpoint':<58} {'st':>3} {'ms':>8} {'consultas':>9} {'ms BD':>8} {'N+1':>4} {'lentas':>6}")
+        for url, status, ms, rec in report:
+            flag = len(rec.repeated(opts["nplusone"]))
+            line = (f"{url[:58]:<58} {status:>3} {ms:>8.1f} {len(rec.queries):>9} {rec.total_ms:>8.1f} "
+                    f"{flag:>4} {len(rec.slow()):>6}")
+            self.stdout.write(self.style.WARNING(line) if flag or rec.slow() else line)
+
+    def _print_problems(self, report, opts):
+        for url, _, _, rec in report:
+            for shape, n, ms, first in rec.repeated(opts["nplusone"]):
+                self.stdout.write(self.style.WARNING(f"\nN+1 en {url}: {n}× ({ms:.1f} ms)"))
+                self.stdout.write(f"  {shape[:300]}")
+                for frame in (first.stack or [])[:4]:
+                    self.stdout.write(f"    {frame}")
+            for q in rec.slow():
+                self.stdout.write(self.style.WARNING(f"\nLenta en {url}: {q.ms:.1f} ms"))
+                self.stdout.write(f"  {q.sql[:300]}")
+                for line in explain(q):
+                    self.stdout.write(f"    plan: {line}")
+
+    def _print_plans(self, report, opts):
+        # plan de cada forma distinta; SCAN sin índice agrupado por tabla
+        scans = defaultdict(set)  # tabla → endpoints
+        seen = set()
+        for url, _, _, rec in report:
+            for q in rec.queries:
+                if q.shape in seen:
+                    continue
+                seen.add(q.shape)
+                plan = explain(q)
+                if opts["plans"] and plan:
+                    self.stdout.write(f"\n{url}\n  {q.sql[:200]}")
+                    for line in plan:
+                        self.stdout.write(f"    {line}")
+                for line in full_scans(plan):
+                    words = line.split()
+                    scans[words[2] if words[1] == "TABLE" else words[1]].add(url)
+
+        self.stdout.write("\nTablas recorridas completas (SCAN sin índice):")
+        tables = set(connection.introspection.table_names())
+        scans = {t: urls for t, urls in scans.items() if t in tables}  # fuera subconsultas/CTE
+        if not scans:
+            self.stdout.write("  ninguna")
+        with connection.cursor() as cursor:
+            for table, urls in sorted(scans.items()):
+                try:
+                    constraints = connection.introspection.get_constraints(cursor, table)
+                except Exception:
+                    constraints = {}
+                indexes = sorted(
+                    f"{name}({', '.join(c['columns'])})" for name, c in constraints.items() if c.get("index") or c.get("unique")
+                )
+                self.stdout.write(self.style.WARNING(f"  {table}: {len(urls)} endpoint(s)"))
+                for u in sorted(urls):
+                    self.stdout.write(f"    {u}")
+                self.stdout.write(f"    índices: {', '.join(indexes) or '-'}")
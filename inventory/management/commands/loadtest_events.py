@@ -0,0 +1,144 @@
+# inventory/management/commands/loadtest_events.py
+import asyncio
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.events import broker
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga del stream SSE: abre N conexiones contra la app ASGI (core/asgi.py) "
+        "en un solo event loop, publica eventos desde otro hilo y mide hilos, memoria y "
+        "latencia de entrega. No escribe en la BD (los eventos se publican directo al broker)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=2000)
+        parser.add_argument("--events", type=int, default=50, help="Eventos a publicar.")
+        parser.add_argument("--rate", type=float, default=10, help="Eventos por segundo.")
+        parser.add_argument("--idle", type=float, default=2.0, help="Segundos con las conexiones inactivas.")
+        parser.add_argument("--username", default=None, help="Usuario del token (default: primer superusuario).")
+        parser.add_argument("--store-id", type=int, default=None, help="Publica con esta sede (default: sin sede).")
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        users = User.objects.filter(is_active=True)
+        user = (users.filter(username=opts["username"]) if opts["username"] else users.filter(is_superuser=True)).first()
+        if user is None:
+            raise CommandError("No hay usuario para el token (usa --username).")
+
+        from rest_framework_simplejwt.tokens import RefreshToken
+        token = str(RefreshToken.for_user(user).access_token)
+
+        from core.asgi import application
+        report = asyncio.run(self._run(application, token, opts))
+
+        lat = sorted(report["latencies"])
+        pct = (lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1000) if lat else (lambda q: 0.0)
+        self.stdout.write(
+            f"clientes: {opts['clients']}  conectados en {report['connect_s']:.2f}s\n"
+            f"hilos: {report['threads_before']} antes → {report['threads_connected']} con clientes\n"
+            f"memoria máx. del proceso: {report['maxrss_mb']:.0f} MB\n"
+            f"eventos: {opts['events']}  entregas: {report['delivered']}/{opts['events'] * opts['clients']}\n"
+            f"latencia publicación→cliente: p50 {pct(0.5):.1f} ms · p95 {pct(0.95):.1f} ms · "
+            f"máx {(lat[-1] * 1000 if lat else 0):.1f} ms · media {(statistics.mean(lat) * 1000 if lat else 0):.1f} ms\n"
+            f"suscriptores al cerrar: {report['subscribers_after']}"
+        )
+        ok = report["delivered"] == opts["events"] * opts["clients"] and report["subscribers_after"] == 0
+        if not ok:
+            raise CommandError("No todos los eventos llegaron o quedaron suscriptores abiertos.")
+        self.stdout.write(self.style.SUCCESS("OK"))
+
+    async def _run(self, application, token, opts):
+        n = opts["clients"]
+        published = {}  # id de evento → perf_counter al publicar
+        received = []   # (id, perf_counter al recibir)
+        counts = {"delivered": 0, "started": 0}
+        disconnect = asyncio.Event()
+        hosts = [h for h in settings.ALLOWED_HOSTS if h and not h.startswith(".") and h != "*"]
+        host = (hosts[0] if hosts else "localhost").encode()
+
+        def scope():
+            return {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "GET", "scheme": "http", "path": "/api/inventory/events/",
+                "raw_path": b"/api/inventory/events/", "query_string": b"types=stock,sale,fx",
+                "root_path": "", "server": (host.decode(), 80), "client": ("127.0.0.1", 0),
+                "headers": [(b"host", host), (b"authorization", f"Bearer {token}".encode())],
+            }
+
+        async def client():
+            sent_request = False
+
+            async def receive():
+                nonlocal sent_request
+                if not sent_request:
+                    sent_request = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await disconnect.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    if message["status"] != 200:
+                        raise CommandError(f"status {message['status']} al conectar")
+                    counts["started"] += 1
+                elif message["type"] == "http.response.body":
+                    now = time.perf_counter()
+                    for line in message.get("body", b"").split(b"\n"):
+                        if line.startswith(b"id: "):
+                            received.append((int(line[4:]), now))
+                            counts["delivered"] += 1
+
+            await application(scope(), receive, send)
+
+        threads_before = threading.active_count()
+        t0 = time.perf_counter()
+        tasks = [asyncio.create_task(client()) for _ in range(n)]
+        while broker.subscriber_count() < n:
+            if any(t.done() for t in tasks):
+                for t in tasks:
+                    if t.done() and t.exception():
+                        raise t.exception()
+            await asyncio.sleep(0.05)
+        connect_s = time.perf_counter() - t0
+        threads_connected = threading.active_count()
+
+        def writer():
+            # publica desde otro hilo, como lo harían las vistas sync al hacer commit
+            for i in range(opts["events"]):
+                t = time.perf_counter()
+                event = broker.publish("stock", {"seq": i}, store_id=opts["store_id"])
+                published[event.id] = t
+                time.sleep(1 / opts["rate"])
+
+        await asyncio.to_thread(writer)
+        deadline = time.perf_counter() + 10
+        while counts["delivered"] < opts["events"] * n and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+
+        await asyncio.sleep(opts["idle"])
+        disconnect.set()
+        await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=30)
+
+        latencies = [t - published[i] for i, t in received if i in published]
+        return {
+            "connect_s": connect_s,
+            "threads_before": threads_before,
+            "threads_connected": threads_connected,
+            "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else 0.0,
+            "delivered": counts["delivered"],
+            "latencies": latencies,
+            "subscribers_after": broker.subscriber_count(),
+        }
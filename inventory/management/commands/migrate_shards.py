@@ -0,0 +1,37 @@
+# inventory/management/commands/migrate_shards.py
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from inventory.models import Sale
+from inventory.sharding import SALE_ID_BLOCK, shard_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea/migra las BD de los shards por sede (SHARD_COUNT, SHARD_SQLITE_DIR) y arranca la secuencia "
+        "de ventas de cada shard en (n + 1) · 10^12, para que el id de una venta indique su shard."
+    )
+
+    def handle(self, *args, **opts):
+        if not shard_aliases():
+            raise CommandError("Sharding desactivado (SHARD_COUNT=0).")
+        os.makedirs(settings.SHARD_SQLITE_DIR, exist_ok=True)
+        table = Sale._meta.db_table
+        for i, alias in enumerate(shard_aliases()):
+            self.stdout.write(f"== {alias}: {settings.DATABASES[alias]['NAME']}")
+            call_command("migrate", database=alias, verbosity=opts["verbosity"], interactive=False)
+
+            start = (i + 1) * SALE_ID_BLOCK
+            with connections[alias].cursor() as cur:
+                cur.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", [table])
+                row = cur.fetchone()
+                if row is None:
+                    cur.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)", [table, start])
+                elif row[0] < start:
+                    cur.execute("UPDATE sqlite_sequence SET seq = %s WHERE name = %s", [start, table])
+            self.stdout.write(f"   ventas desde id {start + 1}")
+        self.stdout.write(self.style.SUCCESS(f"{len(shard_aliases())} shards listos."))
@@ -0,0 +1,21 @@
+# inventory/management/commands/profile_token.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from inventory.profiler import HEADER, make_token
+
+
+class Command(BaseCommand):
+    help = "Genera el header X-Profile (firmado con SECRET_KEY) para perfilar requests de una ruta."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Prefijo de ruta, p. ej. /api/inventory/sales/")
+
+    def handle(self, *args, **opts):
+        path = opts["path"]
+        if not path.startswith("/"):
+            path = "/" + path
+        if not settings.PROFILER_ENABLED:
+            self.stderr.write(self.style.WARNING("PROFILER_ENABLED está apagado: el header se ignorará."))
+        self.stdout.write(f"{HEADER}: {make_token(path)}")
+        self.stdout.write(f"(válido {settings.PROFILER_TOKEN_MAX_AGE}s para rutas que empiecen con {path})")
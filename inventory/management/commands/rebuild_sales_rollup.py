@@ -0,0 +1,16 @@
+# inventory/management/commands/rebuild_sales_rollup.py
+from django.core.management.base import BaseCommand
+
+from inventory import sharding
+from inventory.services import rebuild_sales_rollup
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los resúmenes diarios de ventas (SaleDailyRollup y ProductSalesDaily) desde Sale/SaleItem."
+
+    def handle(self, *args, **opts):
+        n = 0
+        for alias in sharding.shard_aliases() or [None]:  # con sharding, cada shard con sus ventas
+            with sharding.using_shard(alias):
+                n += rebuild_sales_rollup()
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes reconstruidos: {n} filas."))
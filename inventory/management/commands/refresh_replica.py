@@ -0,0 +1,69 @@
+# inventory/management/commands/refresh_replica.py
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from inventory.db_router import REPLICA, meta_path
+from inventory.kpi_cache import bump
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresca la réplica local (REPLICA_SQLITE_PATH) con la API de backup de SQLite: snapshot "
+        "consistente del primario en un archivo temporal que luego reemplaza a la réplica, más la hora "
+        "del snapshot en <réplica>.meta.json (staleness). Con --every N repite cada N segundos. "
+        "El bump de los KPIs solo llega a los workers con un cache compartido (REDIS_URL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--every", type=float, default=0, help="Segundos entre refrescos (0: una vez).")
+
+    def handle(self, *args, **opts):
+        if REPLICA not in settings.DATABASES:
+            raise CommandError("No hay réplica configurada (REPLICA_SQLITE_PATH).")
+        src, dst = (settings.DATABASES[a] for a in (DEFAULT_DB_ALIAS, REPLICA))
+        if not all(d["ENGINE"].endswith("sqlite3") for d in (src, dst)):
+            raise CommandError("refresh_replica solo copia SQLite → SQLite; otra réplica la mantiene su motor.")
+
+        while True:
+            self._refresh(str(src["NAME"]), str(dst["NAME"]))
+            if opts["every"] <= 0:
+                return
+            time.sleep(opts["every"])
+
+    def _refresh(self, src, dst):
+        tmp = f"{dst}.tmp"
+        started = time.time()  # el snapshot es al menos tan nuevo como esto
+        source = sqlite3.connect(f"file:{src}?mode=ro", uri=True)
+        target = sqlite3.connect(tmp)
+        try:
+            source.backup(target)  # de una vez: snapshot consistente (en WAL no bloquea al escritor)
+            target.execute("PRAGMA journal_mode=DELETE")  # la copia hereda WAL del primario
+        finally:
+            target.close()
+            source.close()
+        os.replace(tmp, dst)  # las conexiones abiertas siguen con el archivo anterior hasta cerrarse
+
+        meta = {
+            "refreshed_at": started,
+            "refreshed_at_iso": datetime.fromtimestamp(started, dt_timezone.utc).isoformat(),
+            "source": src,
+            "duration_ms": round((time.time() - started) * 1000, 1),
+            "bytes": os.path.getsize(dst),
+        }
+        with open(f"{meta_path()}.tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(f"{meta_path()}.tmp", meta_path())
+
+        # KPIs calculados contra el snapshot anterior quedan viejos. El bump corre en este
+        # proceso: solo llega a los workers con un cache compartido (Redis). Con LocMem lo que
+        # los invalida es la hora del snapshot en la clave (kpi_cache + db_router).
+        bump("sales", "stock", "fx")
+        self.stdout.write(f"Réplica {dst}: {meta['bytes'] / 1024 / 1024:.1f} MB en {meta['duration_ms']:.0f} ms "
+                          f"({meta['refreshed_at_iso']})")
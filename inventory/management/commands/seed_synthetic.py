@@ -0,0 +1,63 @@
+# inventory/management/commands/seed_synthetic.py
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.synthetic import DEFAULT_PAYMENT_MIX, generate, parse_mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un dataset sintético grande y realista (sedes, categorías, productos, stock, "
+        "historial de tasas, ventas y líneas) con sesgo configurable. Escribe en la BD configurada "
+        "con bulk inserts por lote; mismo --seed y --end-date = mismos datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sales", type=int, default=1_000_000)
+        parser.add_argument("--lines-per-sale", type=float, default=3.0, help="Media de líneas por venta.")
+        parser.add_argument("--products", type=int, default=5000)
+        parser.add_argument("--stores", type=int, default=5)
+        parser.add_argument("--categories", type=int, default=30)
+        parser.add_argument("--days", type=int, default=730)
+        parser.add_argument("--end-date", default="", help="YYYY-MM-DD (default: hoy).")
+        parser.add_argument("--sku-skew", type=float, default=1.1, help="Exponente Zipf de popularidad de SKUs (0 = uniforme).")
+        parser.add_argument("--store-skew", type=float, default=0.8, help="Exponente Zipf de movimiento por sede.")
+        default_mix = ",".join(f"{m}={w}" for m, w in DEFAULT_PAYMENT_MIX.items())
+        parser.add_argument("--payment-mix", default=default_mix, help=f"Pesos por forma de pago (default: {default_mix}).")
+        parser.add_argument("--fx-start", type=float, default=36.0, help="Tasa Bs/USD al inicio del período.")
+        parser.add_argument("--fx-drift", type=float, default=0.0015, help="Devaluación media diaria (log).")
+        parser.add_argument("--prefix", default="syn", help="Prefijo de códigos/SKUs (permite varios datasets).")
+        parser.add_argument("--batch", type=int, default=10_000, help="Ventas por transacción.")
+        parser.add_argument("--no-rollup", action="store_true", help="No reconstruir los resúmenes al final.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        try:
+            mix = parse_mix(opts["payment_mix"])
+            end_date = datetime.strptime(opts["end_date"], "%Y-%m-%d").date() if opts["end_date"] else None
+        except ValueError as e:
+            raise CommandError(str(e))
+        if opts["sales"] < 0 or opts["products"] < 1 or opts["days"] < 1 or opts["batch"] < 1:
+            raise CommandError("--sales >= 0, --products/--days/--batch >= 1.")
+
+        t0 = time.perf_counter()
+        try:
+            counts = generate(
+                stores=opts["stores"], categories=opts["categories"], products=opts["products"],
+                sales=opts["sales"], lines_per_sale=opts["lines_per_sale"], days=opts["days"],
+                end_date=end_date, sku_skew=opts["sku_skew"], store_skew=opts["store_skew"],
+                payment_mix=mix, fx_start=opts["fx_start"], fx_daily_drift=opts["fx_drift"],
+                prefix=opts["prefix"], seed=opts["seed"], batch=opts["batch"],
+                rollup=not opts["no_rollup"], log=self.stdout.write,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        elapsed = time.perf_counter() - t0
+        self.stdout.write(self.style.SUCCESS(
+            f"Listo en {elapsed:.1f}s: " + ", ".join(f"{k}={v}" for k, v in counts.items())
+        ))
+        if elapsed:
+            self.stdout.write(f"{(counts['sales'] + counts['sale_items']) / elapsed:,.0f} filas de venta/s")
@@ -0,0 +1,95 @@
+# inventory/management/commands/sqlite_maintenance.py
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+
+def _mb(n) -> str:
+    return f"{n / 1024 / 1024:.1f} MB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Mantenimiento de la BD SQLite: checkpoint del WAL (PASSIVE y, si el -wal sigue grande, TRUNCATE), "
+        "PRAGMA optimize y, a pedido, ANALYZE completo, VACUUM y quick_check. Pensado para cron: "
+        "el checkpoint cada pocos minutos, --vacuum de noche (bloquea escrituras mientras corre)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checkpoint", choices=[m.lower() for m in CHECKPOINT_MODES], default="passive",
+                            help="Modo del primer checkpoint.")
+        parser.add_argument("--wal-max-mb", type=float, default=64,
+                            help="Si tras el checkpoint el -wal supera esto, reintenta en TRUNCATE.")
+        parser.add_argument("--analyze", action="store_true", help="ANALYZE completo (si no, PRAGMA optimize).")
+        parser.add_argument("--vacuum", action="store_true", help="VACUUM: reescribe la BD y libera páginas vacías.")
+        parser.add_argument("--integrity", action="store_true", help="PRAGMA quick_check.")
+
+    def handle(self, *args, **opts):
+        if connection.vendor != "sqlite":
+            raise CommandError(f"Solo SQLite (backend actual: {connection.vendor}).")
+        path = str(connection.settings_dict["NAME"])
+        self._status(path)
+
+        with connection.cursor() as cursor:
+            if self._pragma(cursor, "journal_mode") == "wal":
+                self._checkpoint(cursor, path, opts["checkpoint"].upper(), opts["wal_max_mb"])
+            else:
+                self.stdout.write("journal_mode no es WAL: sin checkpoint (SQLITE_PROFILE=production lo activa).")
+
+            if opts["integrity"]:
+                t0 = time.perf_counter()
+                result = [row[0] for row in cursor.execute("PRAGMA quick_check").fetchall()]
+                ok = result == ["ok"]
+                msg = f"quick_check: {'ok' if ok else '; '.join(result[:10])} ({time.perf_counter() - t0:.1f}s)"
+                self.stdout.write(self.style.SUCCESS(msg) if ok else self.style.ERROR(msg))
+
+            t0 = time.perf_counter()
+            cursor.execute("ANALYZE" if opts["analyze"] else "PRAGMA optimize")
+            self.stdout.write(f"{'ANALYZE' if opts['analyze'] else 'PRAGMA optimize'}: {time.perf_counter() - t0:.2f}s")
+
+            if opts["vacuum"]:
+                before = os.path.getsize(path)
+                t0 = time.perf_counter()
+                cursor.execute("VACUUM")
+                if self._pragma(cursor, "journal_mode") == "wal":
+                    cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # VACUUM reescribe todo en el -wal
+                after = os.path.getsize(path)
+                self.stdout.write(f"VACUUM: {_mb(before)} → {_mb(after)} ({time.perf_counter() - t0:.1f}s)")
+
+        self._status(path)
+
+    def _pragma(self, cursor, name):
+        return cursor.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def _wal_size(self, path) -> int:
+        try:
+            return os.path.getsize(f"{path}-wal")
+        except OSError:
+            return 0
+
+    def _status(self, path):
+        with connection.cursor() as cursor:
+            page = self._pragma(cursor, "page_size")
+            pages = self._pragma(cursor, "page_count")
+            free = self._pragma(cursor, "freelist_count")
+            journal = self._pragma(cursor, "journal_mode")
+        self.stdout.write(
+            f"{path}: {_mb(page * pages)} ({pages} páginas de {page} B, {free} libres = {_mb(page * free)})  "
+            f"journal_mode={journal}  -wal {_mb(self._wal_size(path))}"
+        )
+
+    def _checkpoint(self, cursor, path, mode, wal_max_mb):
+        t0 = time.perf_counter()
+        busy, log, done = cursor.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        self.stdout.write(f"checkpoint {mode}: {done}/{log} frames copiados"
+                          f"{' (bloqueado por lectores/escritor)' if busy else ''} ({time.perf_counter() - t0:.2f}s)")
+        # PASSIVE no espera a los lectores: con lecturas continuas el -wal puede crecer sin límite
+        if self._wal_size(path) > wal_max_mb * 1024 * 1024 and mode != "TRUNCATE":
+            t0 = time.perf_counter()
+            busy, log, done = cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            msg = f"checkpoint TRUNCATE: {done}/{log} frames ({time.perf_counter() - t0:.2f}s)"
+            self.stdout.write(self.style.WARNING(msg + " — no pudo completar, lectores activos") if busy else msg)
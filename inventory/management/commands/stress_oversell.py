@@ -0,0 +1,170 @@
+# inventory/management/commands/stress_oversell.py
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Sum
+
+from inventory.models import Product, ProductSalesDaily, Sale, SaleDailyRollup, SaleItem, Stock, Store
+from inventory.stress import merge, process_main, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress de concurrencia sobre ventas, adjust_stock y set_stock (API real) contra pocos SKUs desde "
+        "varios procesos e hilos. Verifica invariantes (sin stock negativo, stock + vendido = inicial, "
+        "is_active, resúmenes) y reporta throughput, locks y reintentos. Escribe en la BD configurada "
+        "(sede y productos propios, borrados al final salvo --keep): usar una copia, no producción."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=2)
+        parser.add_argument("--threads", type=int, default=8, help="Hilos por proceso.")
+        parser.add_argument("--ops", type=int, default=200, help="Operaciones por hilo.")
+        parser.add_argument("--duration", type=float, default=120, help="Tope en segundos.")
+        parser.add_argument("--skus", type=int, default=4, help="SKUs calientes.")
+        parser.add_argument("--set-skus", type=int, default=1, help="De ellos, cuántos reciben set_stock.")
+        parser.add_argument("--initial", type=int, default=300, help="Stock inicial por SKU.")
+        parser.add_argument("--mix", default="70,25,5", help="Pesos venta,adjust,set_stock.")
+        parser.add_argument("--max-retries", type=int, default=5, help="Reintentos por lock antes de fallar.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--keep", action="store_true", help="No borra los datos del stress.")
+
+    def handle(self, *args, **opts):
+        try:
+            mix = [float(x) for x in opts["mix"].split(",")]
+        except ValueError:
+            raise CommandError("--mix: tres pesos separados por coma (venta,adjust,set_stock).")
+        if len(mix) != 3 or not 0 <= opts["set_skus"] < opts["skus"]:
+            raise CommandError("--mix necesita 3 pesos y --set-skus debe ser menor que --skus.")
+
+        tag = f"stress-{int(time.time())}"
+        store, user, products = self._setup(tag, opts)
+        ids = [p.id for p in products]
+        cfg = {
+            "store_id": store.id, "user_id": user.id, "n_skus": len(ids),
+            "set_skus": ids[: opts["set_skus"]], "ledger_skus": ids[opts["set_skus"]:],
+            "mix": mix, "ops": opts["ops"], "threads": opts["threads"], "max_retries": opts["max_retries"],
+            "deadline": time.time() + opts["duration"], "seed": opts["seed"],
+        }
+        self.stdout.write(self._backend())
+        self.stdout.write(f"{opts['processes']} proceso(s) × {opts['threads']} hilos × {opts['ops']} ops "
+                          f"sobre {len(ids)} SKUs ({opts['set_skus']} con set_stock), stock inicial {opts['initial']}")
+
+        try:
+            t0 = time.perf_counter()
+            if opts["processes"] <= 1:
+                stats = process_main(cfg, 0)
+            else:
+                connections.close_all()  # los hijos abren sus propias conexiones
+                with ProcessPoolExecutor(opts["processes"], mp_context=get_context("spawn")) as pool:
+                    stats = merge(pool.map(process_main, [cfg] * opts["processes"], range(opts["processes"])))
+            elapsed = time.perf_counter() - t0
+
+            self._report(stats, elapsed)
+            failures = self._check(stats, store, products, opts["initial"], cfg)
+        finally:
+            if not opts["keep"]:
+                self._cleanup(store, user, products)
+
+        if failures:
+            raise CommandError(f"{len(failures)} invariante(s) violada(s).")
+        self.stdout.write(self.style.SUCCESS("Invariantes OK."))
+
+    def _setup(self, tag, opts):
+        store = Store.objects.create(name=f"Stress {tag}", code=tag)
+        user = get_user_model().objects.create_superuser(tag, password=None)
+        products = Product.objects.bulk_create([
+            Product(sku=f"{tag}-{i}", name=f"Stress {i}", price_usd="1.00") for i in range(opts["skus"])
+        ])
+        Stock.objects.bulk_create([
+            Stock(product=p, store=store, quantity=opts["initial"]) for p in products
+        ])
+        return store, user, products
+
+    def _backend(self) -> str:
+        line = f"Backend: {connection.vendor} ({connection.settings_dict['NAME']})"
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                journal = cursor.fetchone()[0]
+                cursor.execute("PRAGMA busy_timeout")
+                busy = cursor.fetchone()[0]
+            line += f" journal_mode={journal} busy_timeout={busy}ms"
+        return line
+
+    def _report(self, stats, elapsed):
+        ok = sum(stats["ok"].values())
+        lat = summarize(stats)
+        self.stdout.write(f"\nDuración: {elapsed:.1f}s  ops OK: {ok} ({ok / elapsed:.1f}/s)  "
+                          f"ventas: {stats['ok']['sale']} ({stats['ok']['sale'] / elapsed:.1f}/s)")
+        self.stdout.write(f"latencia por op (con reintentos): p50 {lat['p50_ms']} ms  p95 {lat['p95_ms']} ms  "
+                          f"máx {lat['max_ms']} ms")
+        self.stdout.write(f"{'op':<8} {'total':>7} {'ok':>7} {'sin stock':>10} {'fallidas':>9}")
+        for kind in ("sale", "adjust", "set"):
+            self.stdout.write(f"{kind:<8} {stats['ops'][kind]:>7} {stats['ok'][kind]:>7} "
+                              f"{stats['rejected'][kind]:>10} {stats['failed'][kind]:>9}")
+        if stats["rejected_500"]:
+            self.stdout.write(self.style.WARNING(
+                f"{stats['rejected_500']} rechazo(s) por stock llegaron como HTTP 500 (ValidationError de Django)"
+            ))
+        self.stdout.write(f"errores de lock: {stats['lock_errors']}  reintentos: {stats['retries']}  "
+                          f"tiempo perdido en locks: {stats['lock_wait_s']:.2f}s")
+        for name, n in sorted(stats["errors"].items(), key=lambda kv: -kv[1]):
+            self.stdout.write(self.style.WARNING(f"  {n}× {name}"))
+
+    def _check(self, stats, store, products, initial, cfg):
+        failures = []
+
+        def fail(msg):
+            failures.append(msg)
+            self.stdout.write(self.style.ERROR(f"  ✗ {msg}"))
+
+        self.stdout.write("\nInvariantes:")
+        ids = [p.id for p in products]
+        qty = dict(Stock.objects.filter(store=store).values_list("product_id", "quantity"))
+        totals = dict(Stock.objects.filter(product_id__in=ids).values("product_id")
+                      .annotate(s=Sum("quantity")).values_list("product_id", "s"))
+        active = dict(Product.objects.filter(id__in=ids).values_list("id", "is_active"))
+        sold_db = dict(SaleItem.objects.filter(sale__store=store).values("product_id")
+                       .annotate(u=Sum("quantity")).values_list("product_id", "u"))
+        daily_units = dict(ProductSalesDaily.objects.filter(product_id__in=ids).values("product_id")
+                           .annotate(u=Sum("units")).values_list("product_id", "u"))
+
+        for pid in ids:
+            if qty.get(pid, 0) < 0:
+                fail(f"producto {pid}: stock negativo ({qty[pid]})")
+            if pid in cfg["ledger_skus"]:
+                expected = initial + stats["adjusted"].get(pid, 0) - stats["sold"].get(pid, 0)
+                if qty.get(pid) != expected:
+                    fail(f"producto {pid}: stock {qty.get(pid)} ≠ inicial + ajustes − vendido = {expected}")
+            if sold_db.get(pid, 0) != stats["sold"].get(pid, 0):
+                fail(f"producto {pid}: vendido en BD {sold_db.get(pid, 0)} ≠ ventas confirmadas "
+                     f"{stats['sold'].get(pid, 0)}")
+            if active.get(pid) != ((totals.get(pid) or 0) > 0):
+                fail(f"producto {pid}: is_active={active.get(pid)} con stock total {totals.get(pid)}")
+            if (daily_units.get(pid) or 0) != sold_db.get(pid, 0):
+                fail(f"producto {pid}: ProductSalesDaily {daily_units.get(pid)} ≠ vendido {sold_db.get(pid, 0)}")
+
+        n_sales = Sale.objects.filter(store=store).count()
+        if n_sales != stats["sales"]:
+            fail(f"ventas en BD {n_sales} ≠ ventas confirmadas {stats['sales']}")
+        rollup = SaleDailyRollup.objects.filter(store=store).aggregate(n=Sum("sales_count"))["n"] or 0
+        if rollup != n_sales:
+            fail(f"SaleDailyRollup suma {rollup} ventas ≠ {n_sales}")
+
+        if not failures:
+            self.stdout.write("  sin stock negativo; stock + vendido − ajustes = inicial; is_active y resúmenes "
+                              "coherentes")
+        return failures
+
+    def _cleanup(self, store, user, products):
+        for sale in Sale.objects.filter(store=store):
+            sale.delete()  # signals: descuenta los resúmenes
+        Stock.objects.filter(store=store).delete()
+        Product.objects.filter(id__in=[p.id for p in products]).delete()
+        store.delete()
+        user.delete()
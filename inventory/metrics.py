@@ -0,0 +1,226 @@
+# inventory/metrics.py
+# Métricas por ruta (latencia, consultas, tiempo de BD, bytes) y aciertos de caches,
+# expuestas en formato de texto de Prometheus en /metrics.
+#
+# Los contadores son por hilo (cada hilo escribe solo en los suyos, sin locks en el
+# camino de la request); /metrics suma todos los hilos al exportar. Son por proceso:
+# con varios workers Prometheus debe leer cada uno (o agregar en el scrape).
+# Se activa con METRICS_ENABLED (ver settings); apagado, el middleware no se instala.
+import hmac
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # segundos
+
+_registry = []            # un _ThreadMetrics por hilo que atendió requests
+_registry_lock = threading.Lock()
+_local = threading.local()
+
+
+class _ThreadMetrics:
+    __slots__ = ("routes", "statuses", "queries", "db_time")
+
+    def __init__(self):
+        # (route, method) → [n por bucket..., +Inf, suma_s, n, consultas, tiempo_bd_s, bytes]
+        self.routes = {}
+        # (route, method, "2xx") → n
+        self.statuses = {}
+        # contadores de la request en curso (los llena _DbTimer)
+        self.queries = 0
+        self.db_time = 0.0
+
+
+class _DbTimer:
+    """execute_wrapper reutilizable por hilo: cuenta consultas y tiempo de BD."""
+    __slots__ = ("m",)
+
+    def __init__(self, m):
+        self.m = m
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.m.db_time += time.perf_counter() - t0
+            self.m.queries += 1
+
+
+def _thread_metrics():
+    m = getattr(_local, "m", None)
+    if m is None:
+        m = _local.m = _ThreadMetrics()
+        _local.timer = _DbTimer(m)
+        with _registry_lock:
+            _registry.append(m)
+    return m
+
+
+def _enabled() -> bool:
+    return getattr(settings, "METRICS_ENABLED", False)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if not _enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.width = len(BUCKETS) + 1
+
+    def __call__(self, request):
+        m = _thread_metrics()
+        m.queries = 0
+        m.db_time = 0.0
+        timer = _local.timer
+
+        # el wrapper queda instalado en las conexiones de este hilo (sin costo entre requests)
+        for conn in connections.all():
+            if timer not in conn.execute_wrappers:
+                conn.execute_wrappers.append(timer)
+
+        t0 = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - t0
+
+        match = getattr(request, "resolver_match", None)
+        route = match.view_name if match is not None else "unmatched"
+        key = (route, request.method)
+
+        row = m.routes.get(key)
+        if row is None:
+            row = m.routes[key] = [0] * (self.width + 5)
+        row[bisect_left(BUCKETS, elapsed)] += 1
+        w = self.width
+        row[w] += elapsed
+        row[w + 1] += 1
+        row[w + 2] += m.queries
+        row[w + 3] += m.db_time
+        if not response.streaming:
+            row[w + 4] += len(response.content)
+
+        skey = (route, request.method, f"{response.status_code // 100}xx")
+        m.statuses[skey] = m.statuses.get(skey, 0) + 1
+        return response
+
+
+# ---- Exportación (formato de texto de Prometheus) ----
+
+def _label(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _cache_stats():
+    """(cache, resultado, n) de los caches de la app."""
+    from authapi.user_cache import stats as auth_stats
+    from .kpi_cache import stats as kpi_stats
+    from .services import fx_stats
+    from .singleflight import stats as sf_stats
+
+    yield "kpi", "hit", kpi_stats.get("hits", 0)
+    yield "kpi", "miss", kpi_stats.get("misses", 0)
+    yield "auth_user", "hit", auth_stats.get("hits", 0)
+    yield "auth_user", "miss", auth_stats.get("misses", 0)
+    yield "fx", "hit", fx_stats.get("hits", 0)
+    yield "fx", "miss", fx_stats.get("loads", 0)
+    for result, n in sf_stats.items():
+        yield "singleflight", result, n
+
+
+def render() -> str:
+    with _registry_lock:
+        threads = list(_registry)
+
+    width = len(BUCKETS) + 1
+    routes, statuses = {}, {}
+    for m in threads:
+        for key, row in list(m.routes.items()):
+            acc = routes.get(key)
+            if acc is None:
+                routes[key] = list(row)
+            else:
+                for i, v in enumerate(row):
+                    acc[i] += v
+        for key, n in list(m.statuses.items()):
+            statuses[key] = statuses.get(key, 0) + n
+
+    out = [
+        "# HELP tienda_http_request_duration_seconds Latencia de requests por ruta.",
+        "# TYPE tienda_http_request_duration_seconds histogram",
+    ]
+    for (route, method), row in sorted(routes.items()):
+        lab = f'route="{_label(route)}",method="{method}"'
+        cum = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), row[:width]):
+            cum += n
+            out.append(f'tienda_http_request_duration_seconds_bucket{{{lab},le="{bound}"}} {cum}')
+        out.append(f"tienda_http_request_duration_seconds_sum{{{lab}}} {row[width]:.6f}")
+        out.append(f"tienda_http_request_duration_seconds_count{{{lab}}} {row[width + 1]}")
+
+    for name, idx, help_, fmt in (
+        ("tienda_db_queries_total", 2, "Consultas SQL por ruta.", "{}"),
+        ("tienda_db_query_seconds_total", 3, "Tiempo en la BD por ruta.", "{:.6f}"),
+        ("tienda_http_response_bytes_total", 4, "Bytes de respuesta por ruta (sin streams).", "{}"),
+    ):
+        out += [f"# HELP {name} {help_}", f"# TYPE {name} counter"]
+        for (route, method), row in sorted(routes.items()):
+            out.append(f'{name}{{route="{_label(route)}",method="{method}"}} {fmt.format(row[width + idx])}')
+
+    out += ["# HELP tienda_http_responses_total Respuestas por ruta y clase de status.",
+            "# TYPE tienda_http_responses_total counter"]
+    for (route, method, status), n in sorted(statuses.items()):
+        out.append(f'tienda_http_responses_total{{route="{_label(route)}",method="{method}",status="{status}"}} {n}')
+
+    out += ["# HELP tienda_cache_requests_total Lecturas de caches de la app por resultado.",
+            "# TYPE tienda_cache_requests_total counter"]
+    for cache_name, result, n in _cache_stats():
+        out.append(f'tienda_cache_requests_total{{cache="{cache_name}",result="{_label(result)}"}} {n}')
+
+    from .group_commit import stats as gc_stats
+    out += ["# HELP tienda_sale_group_commit_total Group commit de ventas: lotes y ventas por resultado.",
+            "# TYPE tienda_sale_group_commit_total counter"]
+    for kind in ("batches", "committed", "failed", "cancelled"):
+        out.append(f'tienda_sale_group_commit_total{{kind="{kind}"}} {gc_stats.get(kind, 0)}')
+
+    from .db_router import staleness, stats as replica_stats
+    out += ["# HELP tienda_replica_reads_total Vistas de reportes por BD que sirvió las lecturas.",
+            "# TYPE tienda_replica_reads_total counter"]
+    for db, n in replica_stats.items():
+        out.append(f'tienda_replica_reads_total{{db="{db}"}} {n}')
+    lag = staleness()
+    if lag is not None:
+        out += ["# HELP tienda_replica_staleness_seconds Antigüedad del snapshot de la réplica.",
+                "# TYPE tienda_replica_staleness_seconds gauge",
+                f"tienda_replica_staleness_seconds {lag:.1f}"]
+
+    from .events import stats as event_stats
+    out += ["# HELP tienda_sse_subscribers Conexiones SSE abiertas en este proceso.",
+            "# TYPE tienda_sse_subscribers gauge",
+            f"tienda_sse_subscribers {event_stats.get('subscribers', 0)}"]
+
+    return "\n".join(out) + "\n"
+
+
+def metrics_view(request):
+    """
+    GET /metrics (texto de Prometheus). 404 si METRICS_ENABLED está apagado; con
+    METRICS_TOKEN exige el header Authorization: Bearer <token>, sin él una sesión de staff
+    (nunca público: expone rutas, latencias y volumen).
+    """
+    if not _enabled():
+        raise Http404
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        sent = request.headers.get("Authorization", "")
+        allowed = hmac.compare_digest(sent.encode(), f"Bearer {token}".encode())
+    else:
+        user = getattr(request, "user", None)
+        allowed = bool(user and user.is_authenticated and user.is_staff)
+    if not allowed:
+        return HttpResponse("forbidden\n", status=403, content_type="text/plain")
+    return HttpResponse(render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:44
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def fill_sale_daily_rollup(apps, schema_editor):
+    # mismo agrupado que services.rebuild_sales_rollup: sin esto las ventas existentes no
+    # cuentan en stats ni en la serie por días completos hasta reconstruir a mano
+    Sale = apps.get_model("inventory", "Sale")
+    SaleDailyRollup = apps.get_model("inventory", "SaleDailyRollup")
+    zero = Decimal("0.00")
+    groups = (
+        Sale.objects
+        .annotate(day=TruncDate("created_at"))
+        .values("store_id", "day", "payment_method")
+        .annotate(
+            n=Count("id"),
+            s_total=Coalesce(Sum("total"), zero),
+            s_usd=Coalesce(Sum("total_usd"), zero),
+            s_vat=Coalesce(Sum("vat_bs"), zero),
+        )
+        .order_by()
+    )
+    SaleDailyRollup.objects.bulk_create(
+        [
+            SaleDailyRollup(
+                store_id=g["store_id"], day=g["day"], payment_method=g["payment_method"] or "",
+                sales_count=g["n"], total=g["s_total"], total_usd=g["s_usd"], vat_bs=g["s_vat"],
+            )
+            for g in groups
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_sale_customer_address_sale_customer_id_doc_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaleDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('payment_method', models.CharField(blank=True, default='', max_length=20)),
+                ('sales_count', models.PositiveIntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('total_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('vat_bs', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='inventory.store')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='inventory_s_day_181910_idx')],
+                'unique_together': {('store', 'day', 'payment_method')},
+            },
+        ),
+        migrations.RunPython(fill_sale_daily_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def fill_product_sales_daily(apps, schema_editor):
+    # mismo agrupado que services.rebuild_sales_rollup: top-products por días completos
+    # lee esta tabla, así que las ventas existentes tienen que estar desde el principio
+    SaleItem = apps.get_model("inventory", "SaleItem")
+    ProductSalesDaily = apps.get_model("inventory", "ProductSalesDaily")
+    groups = (
+        SaleItem.objects
+        .annotate(day=TruncDate("sale__created_at"))
+        .values("product_id", "day")
+        .annotate(units=Coalesce(Sum("quantity"), 0), n=Count("id"))
+        .order_by()
+    )
+    ProductSalesDaily.objects.bulk_create(
+        [ProductSalesDaily(product_id=g["product_id"], day=g["day"], units=g["units"], lines=g["n"]) for g in groups],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_saledailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSalesDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('lines', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='inventory.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'product', 'units', 'lines'], name='inventory_p_day_148078_idx')],
+                'unique_together': {('product', 'day')},
+            },
+        ),
+        migrations.RunPython(fill_product_sales_daily, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_productsalesdaily'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['store', 'product', 'quantity', 'min_threshold'], name='inventory_s_store_i_b13715_idx'),
+        ),
+    ]
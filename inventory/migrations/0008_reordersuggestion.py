@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_stock_alerts_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReorderSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(choices=[('sma', 'Media móvil'), ('ses', 'Suavizado exponencial')], default='ses', max_length=10)),
+                ('avg_daily_demand', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=12)),
+                ('forecast_daily', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=12)),
+                ('demand_std', models.DecimalField(decimal_places=3, default=Decimal('0.000'), max_digits=12)),
+                ('safety_stock', models.PositiveIntegerField(default=0)),
+                ('suggested_threshold', models.PositiveIntegerField(default=0)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('min_threshold', models.PositiveIntegerField(default=0)),
+                ('days_of_cover', models.DecimalField(blank=True, decimal_places=1, max_digits=12, null=True)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_suggestions', to='inventory.product')),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_suggestions', to='inventory.store')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['store', 'days_of_cover'], name='inventory_r_store_i_b92889_idx')],
+                'unique_together': {('product', 'store')},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_reordersuggestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AbcAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('days', models.PositiveIntegerField(default=90)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('revenue_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('revenue_share', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=7)),
+                ('abc_revenue', models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C')], default='C', max_length=1)),
+                ('abc_units', models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C')], default='C', max_length=1)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('turnover', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('days_on_hand', models.DecimalField(blank=True, decimal_places=1, max_digits=12, null=True)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='abc_analysis', to='inventory.product')),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='abc_analysis', to='inventory.store')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['store', 'abc_revenue', 'revenue'], name='inventory_a_store_i_84dc36_idx')],
+                'unique_together': {('product', 'store')},
+            },
+        ),
+    ]
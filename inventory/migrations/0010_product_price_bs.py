@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:04
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_price_bs(apps, schema_editor):
+    # mismo redondeo que SaleSerializer.create; luego se mantiene con reprice_catalog
+    Product = apps.get_model("inventory", "Product")
+    FxRate = apps.get_model("inventory", "FxRate")
+    rate = FxRate.objects.order_by("-effective_date", "-id").values_list("usd_to_bs", flat=True).first()
+    fx = Decimal(str(rate if rate is not None else getattr(settings, "FX_USD_TO_BS", "1.00")))
+    cent = Decimal("0.01")
+    products = list(Product.objects.only("id", "price_usd"))
+    for p in products:
+        up_usd = Decimal(p.price_usd or 0).quantize(cent, rounding=ROUND_HALF_UP)
+        p.price_bs = (up_usd * fx).quantize(cent, rounding=ROUND_HALF_UP)
+        p.price_bs_fx = fx
+    Product.objects.bulk_update(products, ["price_bs", "price_bs_fx"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_abcanalysis'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='price_bs',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='price_bs_fx',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True),
+        ),
+        migrations.RunPython(fill_price_bs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_product_price_bs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSale',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('total_usd', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('fx_usd', models.DecimalField(decimal_places=4, default=Decimal('1.0000'), max_digits=12)),
+                ('notes', models.TextField(blank=True, default='')),
+                ('customer_name', models.CharField(blank=True, default='', max_length=180)),
+                ('customer_address', models.TextField(blank=True, default='')),
+                ('customer_id_doc', models.CharField(blank=True, default='', max_length=40)),
+                ('customer_phone', models.CharField(blank=True, default='', max_length=40)),
+                ('payment_method', models.CharField(blank=True, choices=[('PAGO_MOVIL', 'Pago móvil'), ('PUNTO', 'Punto'), ('DIVISAS', 'Divisas'), ('USDT', 'USDT')], default='', max_length=20)),
+                ('payment_reference', models.CharField(blank=True, default='', max_length=60)),
+                ('vat_rate', models.DecimalField(decimal_places=4, default=Decimal('0.16'), max_digits=6)),
+                ('subtotal_bs', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('vat_bs', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_sales_created', to=settings.AUTH_USER_MODEL)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_sales', to='inventory.store')),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSaleItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('quantity', models.PositiveIntegerField()),
+                ('unit_price_usd', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventory.product')),
+                ('sale', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='inventory.archivedsale')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedsale',
+            index=models.Index(fields=['created_at'], name='inventory_a_created_7daaef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedsale',
+            index=models.Index(fields=['store', 'created_at'], name='inventory_a_store_i_19a6bb_idx'),
+        ),
+    ]
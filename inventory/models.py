@@ -45,6 +45,9 @@ class Product(models.Model):
     description = models.TextField(blank=True)
     categories = models.ManyToManyField(Category, blank=True, related_name="products")
     price_usd = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # precio en Bs precalculado con la tasa price_bs_fx (se recalcula al cambiar la tasa)
+    price_bs = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    price_bs_fx = models.DecimalField(max_digits=12, decimal_places=4, null=True, blank=True)
     is_active = models.BooleanField(default=True) 
     image = models.ImageField(upload_to=product_image_upload_to, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -61,8 +64,8 @@ class Product(models.Model):
 
     @property
     def total_stock(self) -> int:
-        agg = self.stocks.aggregate(s=models.Sum("quantity"))
-        return agg["s"] or 0
+        from .sharding import total_stock  # con sharding suma los stocks de todos los shards
+        return total_stock(self)
 
 
 class Stock(models.Model):
@@ -74,6 +77,17 @@ class Stock(models.Model):
 
     class Meta:
         unique_together = ("product", "store")
+        indexes = [
+            # alertas por sede: SUM(quantity)/MAX(min_threshold) agrupando por producto
+            models.Index(fields=["store", "product", "quantity", "min_threshold"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        obj = super().from_db(db, field_names, values)
+        # cantidad leída de la BD: los eventos de stock detectan cruces de umbral
+        obj._loaded_quantity = obj.__dict__.get("quantity")
+        return obj
 
     def __str__(self):
         return f"{self.product.sku} @ {self.store.code}: {self.quantity}"
@@ -168,3 +182,166 @@ class SaleItem(models.Model):
     @property
     def line_total(self) -> Decimal:
         return (Decimal(self.quantity) * Decimal(self.unit_price)).quantize(Decimal("0.01"))
+
+
+# Resumen diario de ventas (store × día × forma de pago), mantenido en la misma
+# transacción que crea la venta. Se puede reconstruir con `rebuild_sales_rollup`.
+class SaleDailyRollup(models.Model):
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="daily_sales")
+    day = models.DateField()
+    payment_method = models.CharField(max_length=20, blank=True, default="")
+
+    sales_count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))      # Bs
+    total_usd = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    vat_bs = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        unique_together = ("store", "day", "payment_method")
+        indexes = [
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.store_id} {self.payment_method or '-'}: {self.sales_count}"
+
+
+# Resumen diario por producto (unidades y líneas vendidas), para rankings por rango.
+class ProductSalesDaily(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="daily_sales")
+    day = models.DateField()
+    units = models.PositiveIntegerField(default=0)
+    lines = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("product", "day")
+        indexes = [
+            # cubre el rango por día y la suma sin tocar la tabla
+            models.Index(fields=["day", "product", "units", "lines"]),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.product_id}: {self.units}"
+
+
+# Ventas archivadas (manage.py archive_sales): las ventas viejas se mueven aquí en lotes,
+# con el mismo id y las mismas columnas, para que Sale/SaleItem (y sus índices) queden chicos.
+# Los resúmenes diarios no cambian al archivar; factura y reportes leen ambas tablas.
+class ArchivedSale(models.Model):
+    id = models.BigIntegerField(primary_key=True)  # el de la venta original
+    store = models.ForeignKey(Store, on_delete=models.PROTECT, related_name="archived_sales")
+    created_by = models.ForeignKey(User, on_delete=models.PROTECT, related_name="archived_sales_created")
+    created_at = models.DateTimeField()
+
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    total_usd = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    fx_usd = models.DecimalField(max_digits=12, decimal_places=4, default=Decimal("1.0000"))
+    notes = models.TextField(blank=True, default="")
+
+    customer_name = models.CharField(max_length=180, blank=True, default="")
+    customer_address = models.TextField(blank=True, default="")
+    customer_id_doc = models.CharField(max_length=40, blank=True, default="")
+    customer_phone = models.CharField(max_length=40, blank=True, default="")
+
+    payment_method = models.CharField(max_length=20, choices=Sale.PAYMENT_METHODS, blank=True, default="")
+    payment_reference = models.CharField(max_length=60, blank=True, default="")
+
+    vat_rate = models.DecimalField(max_digits=6, decimal_places=4, default=Decimal("0.16"))
+    subtotal_bs = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    vat_bs = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["store", "created_at"]),
+        ]
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"Sale #{self.id} (archivada) - {self.store.code} - {self.created_at:%Y-%m-%d}"
+
+
+class ArchivedSaleItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    sale = models.ForeignKey(ArchivedSale, related_name="items", on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name="+")
+    quantity = models.PositiveIntegerField()
+    unit_price_usd = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+
+    @property
+    def line_total(self) -> Decimal:
+        return (Decimal(self.quantity) * Decimal(self.unit_price)).quantize(Decimal("0.01"))
+
+
+# Sugerencias de punto de reorden por producto × sede (las calcula `compute_reorder_points`).
+class ReorderSuggestion(models.Model):
+    METHODS = [
+        ("sma", "Media móvil"),
+        ("ses", "Suavizado exponencial"),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="reorder_suggestions")
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="reorder_suggestions")
+
+    method = models.CharField(max_length=10, choices=METHODS, default="ses")
+    avg_daily_demand = models.DecimalField(max_digits=12, decimal_places=3, default=Decimal("0.000"))
+    forecast_daily = models.DecimalField(max_digits=12, decimal_places=3, default=Decimal("0.000"))
+    demand_std = models.DecimalField(max_digits=12, decimal_places=3, default=Decimal("0.000"))
+    safety_stock = models.PositiveIntegerField(default=0)
+    suggested_threshold = models.PositiveIntegerField(default=0)
+
+    # fotografía del stock al calcular
+    quantity = models.PositiveIntegerField(default=0)
+    min_threshold = models.PositiveIntegerField(default=0)
+    days_of_cover = models.DecimalField(max_digits=12, decimal_places=1, null=True, blank=True)  # null = sin demanda
+
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ("product", "store")
+        indexes = [
+            models.Index(fields=["store", "days_of_cover"]),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.store_id}: {self.suggested_threshold}"
+
+
+# Clasificación ABC y rotación por producto × sede (la calcula `compute_abc`).
+class AbcAnalysis(models.Model):
+    CLASSES = [
+        ("A", "A"),
+        ("B", "B"),
+        ("C", "C"),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="abc_analysis")
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="abc_analysis")
+
+    days = models.PositiveIntegerField(default=90)  # ventana de ventas analizada
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))      # Bs
+    revenue_usd = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    revenue_share = models.DecimalField(max_digits=7, decimal_places=4, default=Decimal("0.0000"))  # dentro de la sede
+
+    abc_revenue = models.CharField(max_length=1, choices=CLASSES, default="C")
+    abc_units = models.CharField(max_length=1, choices=CLASSES, default="C")
+
+    # fotografía del stock al calcular
+    quantity = models.PositiveIntegerField(default=0)
+    turnover = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))        # veces por año
+    days_on_hand = models.DecimalField(max_digits=12, decimal_places=1, null=True, blank=True)      # null = sin ventas
+
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ("product", "store")
+        indexes = [
+            models.Index(fields=["store", "abc_revenue", "revenue"]),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.store_id}: {self.abc_revenue}/{self.abc_units}"
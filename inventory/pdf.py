@@ -5,7 +5,7 @@ from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
 
 
-def render_sale_pdf(sale, *, currency: str = "USD") -> bytes:
+def render_sale_pdf(sale, *, currency: str = "USD", items=None) -> bytes:
     """
     Factura estilo Venezuela con campos tipo SENIAT (plantilla).
 
@@ -14,6 +14,9 @@ def render_sale_pdf(sale, *, currency: str = "USD") -> bytes:
     - IVA / Base imponible ahora salen de lo congelado en Sale: subtotal_bs (BASE), vat_bs (IVA), total (TOTAL Bs).
     - Si la impresión es USD: convierte BASE/IVA/TOTAL desde Bs a USD usando fx_usd, para mantener moneda única.
     - Forma de pago: marca la opción seleccionada y muestra referencia si es Pago móvil.
+    - Multi-página: encabezado y cabecera de tabla se repiten en cada hoja, las hojas
+      intermedias indican continuación y los totales van solo en la última.
+    - items: lista opcional de SaleItem ya cargados (si no, se consultan una sola vez).
     """
 
     cur = (currency or "USD").upper()
@@ -111,251 +114,282 @@ def render_sale_pdf(sale, *, currency: str = "USD") -> bytes:
     margin_x = 15 * mm
     top_y = H - 15 * mm
 
-    # Header empresa
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(margin_x, top_y, f"{empresa_nombre}")
-    c.setFont("Helvetica", 11)
-    c.drawString(margin_x, top_y - 10 * mm, f"RIF: {empresa_rif}")
-    c.setFont("Helvetica", 9)
-    c.drawString(margin_x, top_y - 18 * mm, f"{empresa_dir}   TELÉFONOS: {empresa_tel}")
-
-    # Caja principal
     box_x = margin_x
     box_y = 35 * mm
     box_w = W - 2 * margin_x
     box_h = (top_y - 25 * mm) - box_y
-    rect(box_x, box_y, box_w, box_h, lw=1.0)
-
-    y = top_y - 30 * mm  # inicio interno
-
-    # ----------------------------
-    # Fila FACTURA / FECHA / CONTROL
-    # ----------------------------
-    row_h = 10 * mm
-    rect(box_x, y - row_h, box_w, row_h)
-
-    x_fact_w = 70 * mm
-    x_mid_w = 60 * mm
-    line(box_x + x_fact_w, y - row_h, box_x + x_fact_w, y)
-    line(box_x + x_fact_w + x_mid_w, y - row_h, box_x + x_fact_w + x_mid_w, y)
 
-    mid_x0 = box_x + x_fact_w
-    third = x_mid_w / 3
-    line(mid_x0 + third, y - row_h, mid_x0 + third, y)
-    line(mid_x0 + 2 * third, y - row_h, mid_x0 + 2 * third, y)
-
-    # FACTURA (izq)
-    c.setFont("Helvetica", 9)
-    c.drawString(box_x + 2 * mm, y - 7.2 * mm, f"FACTURA N° {factura_no}")
+    footer_h = 38 * mm
+    footer_bottom = box_y
+    footer_top = box_y + footer_h
 
-    # CONTROL (der)
-    c.setFont("Helvetica", 9)
-    c.drawString(box_x + x_fact_w + x_mid_w + 2 * mm, y - 7.2 * mm, f"N° CONTROL {control_no}")
+    col_cant = 18 * mm
+    col_desc = 92 * mm
+    col_alic = 25 * mm
+    col_pu = 25 * mm
 
-    # FECHA (centro)
-    c.setFont("Helvetica", 8)
-    c.drawCentredString(mid_x0 + third / 2, y - 6.0 * mm, "DÍA")
-    c.drawCentredString(mid_x0 + third + third / 2, y - 6.0 * mm, "MES")
-    c.drawCentredString(mid_x0 + 2 * third + third / 2, y - 6.0 * mm, "AÑO")
+    x1 = box_x + col_cant
+    x2 = x1 + col_desc
+    x3 = x2 + col_alic
+    x4 = x3 + col_pu
 
-    c.setFont("Helvetica", 10)
-    c.drawCentredString(mid_x0 + third / 2, y - 9.0 * mm, day)
-    c.drawCentredString(mid_x0 + third + third / 2, y - 9.0 * mm, month)
-    c.drawCentredString(mid_x0 + 2 * third + third / 2, y - 9.0 * mm, year)
+    item_row_h = 10 * mm
 
-    y -= row_h
+    # Encabezado fijo: datos (30) + factura (10) + 3 filas cliente (30) + pago (18) + cabecera tabla (10)
+    table_top = top_y - 30 * mm - 10 * mm - 3 * 10 * mm - 18 * mm - 10 * mm
+    rows_per_page = max(1, int((table_top - footer_top) // item_row_h))
 
-    # ----------------------------
-    # Nombre o razón social
-    # ----------------------------
-    row_h = 10 * mm
-    rect(box_x, y - row_h, box_w, row_h)
-    c.setFont("Helvetica", 9)
-    c.drawString(box_x + 2 * mm, y - 7 * mm, "NOMBRE O RAZÓN SOCIAL:")
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(box_x + 55 * mm, y - 7 * mm, cliente_nombre)
-    y -= row_h
+    # Items: una sola consulta; la paginación es O(n) sobre la lista
+    items = list(items) if items is not None else list(sale.items.select_related("product"))
+    pages = max(1, -(-len(items) // rows_per_page))
 
     # ----------------------------
-    # Domicilio fiscal
+    # Encabezado (se repite en cada página)
     # ----------------------------
-    rect(box_x, y - row_h, box_w, row_h)
-    c.setFont("Helvetica", 9)
-    c.drawString(box_x + 2 * mm, y - 7 * mm, "DOMICILIO FISCAL:")
-    c.setFont("Helvetica", 10)
-    c.drawString(box_x + 40 * mm, y - 7 * mm, cliente_dir[:90])
-    y -= row_h
+    def draw_header(page_no: int) -> float:
+        # Header empresa
+        c.setFont("Helvetica-Bold", 16)
+        c.drawString(margin_x, top_y, f"{empresa_nombre}")
+        c.setFont("Helvetica", 11)
+        c.drawString(margin_x, top_y - 10 * mm, f"RIF: {empresa_rif}")
+        c.setFont("Helvetica", 9)
+        c.drawString(margin_x, top_y - 18 * mm, f"{empresa_dir}   TELÉFONOS: {empresa_tel}")
+
+        if pages > 1:
+            c.setFont("Helvetica-Bold", 9)
+            c.drawRightString(box_x + box_w, top_y, f"PÁGINA {page_no} DE {pages}")
+
+        # Caja principal
+        rect(box_x, box_y, box_w, box_h, lw=1.0)
+
+        y = top_y - 30 * mm  # inicio interno
+
+        # ----------------------------
+        # Fila FACTURA / FECHA / CONTROL
+        # ----------------------------
+        row_h = 10 * mm
+        rect(box_x, y - row_h, box_w, row_h)
 
-    # ----------------------------
-    # Cédula/RIF + Teléfono
-    # ----------------------------
-    rect(box_x, y - row_h, box_w, row_h)
+        x_fact_w = 70 * mm
+        x_mid_w = 60 * mm
+        line(box_x + x_fact_w, y - row_h, box_x + x_fact_w, y)
+        line(box_x + x_fact_w + x_mid_w, y - row_h, box_x + x_fact_w + x_mid_w, y)
 
-    rif_w = 70 * mm
-    line(box_x + rif_w, y - row_h, box_x + rif_w, y)
+        mid_x0 = box_x + x_fact_w
+        third = x_mid_w / 3
+        line(mid_x0 + third, y - row_h, mid_x0 + third, y)
+        line(mid_x0 + 2 * third, y - row_h, mid_x0 + 2 * third, y)
 
-    c.setFont("Helvetica", 9)
-    c.drawString(box_x + 2 * mm, y - 7 * mm, "N° CEDULA:")
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(box_x + 25 * mm, y - 7 * mm, cliente_id)
+        # FACTURA (izq)
+        c.setFont("Helvetica", 9)
+        c.drawString(box_x + 2 * mm, y - 7.2 * mm, f"FACTURA N° {factura_no}")
 
-    c.setFont("Helvetica", 9)
-    c.drawString(box_x + rif_w + 2 * mm, y - 7 * mm, "TELÉFONO:")
-    c.setFont("Helvetica", 10)
-    c.drawString(box_x + rif_w + 25 * mm, y - 7 * mm, cliente_tel)
-    y -= row_h
+        # CONTROL (der)
+        c.setFont("Helvetica", 9)
+        c.drawString(box_x + x_fact_w + x_mid_w + 2 * mm, y - 7.2 * mm, f"N° CONTROL {control_no}")
 
-    # ----------------------------
-    # Forma de pago (marcar opción + referencia)
-    # ----------------------------
-    row_h = 18 * mm
-    rect(box_x, y - row_h, box_w, row_h)
+        # FECHA (centro)
+        c.setFont("Helvetica", 8)
+        c.drawCentredString(mid_x0 + third / 2, y - 6.0 * mm, "DÍA")
+        c.drawCentredString(mid_x0 + third + third / 2, y - 6.0 * mm, "MES")
+        c.drawCentredString(mid_x0 + 2 * third + third / 2, y - 6.0 * mm, "AÑO")
 
-    left_w = 28 * mm
-    line(box_x + left_w, y - row_h, box_x + left_w, y)
+        c.setFont("Helvetica", 10)
+        c.drawCentredString(mid_x0 + third / 2, y - 9.0 * mm, day)
+        c.drawCentredString(mid_x0 + third + third / 2, y - 9.0 * mm, month)
+        c.drawCentredString(mid_x0 + 2 * third + third / 2, y - 9.0 * mm, year)
 
-    c.setFont("Helvetica", 9)
-    c.drawString(box_x + 2 * mm, y - 7 * mm, "FORMA DE")
-    c.drawString(box_x + 2 * mm, y - 12 * mm, "PAGO")
+        y -= row_h
 
-    x0 = box_x + left_w + 2 * mm
-    c.setFont("Helvetica", 9)
+        # ----------------------------
+        # Nombre o razón social
+        # ----------------------------
+        row_h = 10 * mm
+        rect(box_x, y - row_h, box_w, row_h)
+        c.setFont("Helvetica", 9)
+        c.drawString(box_x + 2 * mm, y - 7 * mm, "NOMBRE O RAZÓN SOCIAL:")
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(box_x + 55 * mm, y - 7 * mm, cliente_nombre)
+        y -= row_h
 
-    # Opciones marcadas
-    is_pm = pm == "PAGO_MOVIL"
-    is_punto = pm == "PUNTO"
-    is_div = pm == "DIVISAS"
-    is_usdt = pm == "USDT"
+        # ----------------------------
+        # Domicilio fiscal
+        # ----------------------------
+        rect(box_x, y - row_h, box_w, row_h)
+        c.setFont("Helvetica", 9)
+        c.drawString(box_x + 2 * mm, y - 7 * mm, "DOMICILIO FISCAL:")
+        c.setFont("Helvetica", 10)
+        c.drawString(box_x + 40 * mm, y - 7 * mm, cliente_dir[:90])
+        y -= row_h
 
-    c.drawString(x0, y - 6 * mm, f"[{check(is_pm)}] PAGO MÓVIL    [{check(is_punto)}] PUNTO")
-    c.drawString(x0, y - 12 * mm, f"[{check(is_div)}] DIVISAS       [{check(is_usdt)}] USDT")
+        # ----------------------------
+        # Cédula/RIF + Teléfono
+        # ----------------------------
+        rect(box_x, y - row_h, box_w, row_h)
 
-    # Referencia (solo si pago móvil)
-    c.setFont("Helvetica", 9)
-    if is_pm:
-        c.drawRightString(box_x + box_w - 2 * mm, y - 12 * mm, f"REF: {pref}"[:40])
+        rif_w = 70 * mm
+        line(box_x + rif_w, y - row_h, box_x + rif_w, y)
 
-    c.setFont("Helvetica-Bold", 9)
-    c.drawRightString(box_x + box_w - 2 * mm, y - 6 * mm, f"MONEDA: {moneda_label}")
-    y -= row_h
+        c.setFont("Helvetica", 9)
+        c.drawString(box_x + 2 * mm, y - 7 * mm, "N° CEDULA:")
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(box_x + 25 * mm, y - 7 * mm, cliente_id)
 
-    # -----------------------------
-    # TABLA + FOOTER (sin solapes)
-    # -----------------------------
-    footer_h = 38 * mm
-    footer_bottom = box_y
-    footer_top = box_y + footer_h
+        c.setFont("Helvetica", 9)
+        c.drawString(box_x + rif_w + 2 * mm, y - 7 * mm, "TELÉFONO:")
+        c.setFont("Helvetica", 10)
+        c.drawString(box_x + rif_w + 25 * mm, y - 7 * mm, cliente_tel)
+        y -= row_h
 
-    # Header tabla
-    header_h = 10 * mm
-    rect(box_x, y - header_h, box_w, header_h)
+        # ----------------------------
+        # Forma de pago (marcar opción + referencia)
+        # ----------------------------
+        row_h = 18 * mm
+        rect(box_x, y - row_h, box_w, row_h)
 
-    col_cant = 18 * mm
-    col_desc = 92 * mm
-    col_alic = 25 * mm
-    col_pu = 25 * mm
+        left_w = 28 * mm
+        line(box_x + left_w, y - row_h, box_x + left_w, y)
 
-    x1 = box_x + col_cant
-    x2 = x1 + col_desc
-    x3 = x2 + col_alic
-    x4 = x3 + col_pu
+        c.setFont("Helvetica", 9)
+        c.drawString(box_x + 2 * mm, y - 7 * mm, "FORMA DE")
+        c.drawString(box_x + 2 * mm, y - 12 * mm, "PAGO")
 
-    for xx in (x1, x2, x3, x4):
-        line(xx, y - header_h, xx, y)
+        x0 = box_x + left_w + 2 * mm
+        c.setFont("Helvetica", 9)
 
-    c.setFont("Helvetica-Bold", 9)
-    c.drawCentredString(box_x + col_cant / 2, y - 7 * mm, "CANT.")
-    c.drawCentredString(x1 + col_desc / 2, y - 7 * mm, "DESCRIPCIÓN")
-    c.drawCentredString(x2 + col_alic / 2, y - 7 * mm, "% ALÍCUOTA")
-    c.drawCentredString(x3 + col_pu / 2, y - 7 * mm, col_unit_label)
-    c.drawCentredString(x4 + (box_x + box_w - x4) / 2, y - 7 * mm, col_total_label)
+        # Opciones marcadas
+        is_pm = pm == "PAGO_MOVIL"
+        is_punto = pm == "PUNTO"
+        is_div = pm == "DIVISAS"
+        is_usdt = pm == "USDT"
 
-    y -= header_h
+        c.drawString(x0, y - 6 * mm, f"[{check(is_pm)}] PAGO MÓVIL    [{check(is_punto)}] PUNTO")
+        c.drawString(x0, y - 12 * mm, f"[{check(is_div)}] DIVISAS       [{check(is_usdt)}] USDT")
 
-    # filas vacías (hasta footer_top)
-    available_h = (y - footer_top)
-    row_h = 10 * mm
-    rows = max(1, int(available_h // row_h))
+        # Referencia (solo si pago móvil)
+        c.setFont("Helvetica", 9)
+        if is_pm:
+            c.drawRightString(box_x + box_w - 2 * mm, y - 12 * mm, f"REF: {pref}"[:40])
 
-    for _ in range(rows):
-        rect(box_x, y - row_h, box_w, row_h)
-        for xx in (x1, x2, x3, x4):
-            line(xx, y - row_h, xx, y)
+        c.setFont("Helvetica-Bold", 9)
+        c.drawRightString(box_x + box_w - 2 * mm, y - 6 * mm, f"MONEDA: {moneda_label}")
         y -= row_h
 
-    # Rellenar items
-    start_y = y + rows * row_h
-    write_y = start_y - 7 * mm
-    i = 0
+        # Header tabla
+        header_h = 10 * mm
+        rect(box_x, y - header_h, box_w, header_h)
 
-    c.setFont("Helvetica", 9)
-    for it in sale.items.select_related("product"):
-        if i >= rows:
-            break
-
-        qty = it.quantity
+        for xx in (x1, x2, x3, x4):
+            line(xx, y - header_h, xx, y)
 
-        if cur == "USD":
-            unit = (it.unit_price_usd if it.unit_price_usd is not None
-                    else (Decimal(it.unit_price) / (sale.fx_usd or Decimal("1"))))
-            line_total = Decimal(unit) * Decimal(qty)
-        else:
-            unit = Decimal(it.unit_price)
-            line_total = unit * Decimal(qty)
+        c.setFont("Helvetica-Bold", 9)
+        c.drawCentredString(box_x + col_cant / 2, y - 7 * mm, "CANT.")
+        c.drawCentredString(x1 + col_desc / 2, y - 7 * mm, "DESCRIPCIÓN")
+        c.drawCentredString(x2 + col_alic / 2, y - 7 * mm, "% ALÍCUOTA")
+        c.drawCentredString(x3 + col_pu / 2, y - 7 * mm, col_unit_label)
+        c.drawCentredString(x4 + (box_x + box_w - x4) / 2, y - 7 * mm, col_total_label)
 
-        c.drawCentredString(box_x + col_cant / 2, write_y, str(qty))
-        c.drawString(x1 + 2 * mm, write_y, f"{it.product.name}"[:55])
-        c.drawRightString(x4 - 2 * mm, write_y, money(unit))
-        c.drawRightString(box_x + box_w - 2 * mm, write_y, money(line_total))
+        return y - header_h
 
-        write_y -= row_h
-        i += 1
+    # ----------------------------
+    # Filas de la tabla (rejilla + items de la página)
+    # ----------------------------
+    def draw_rows(y: float, page_items) -> None:
+        for _ in range(rows_per_page):
+            rect(box_x, y - item_row_h, box_w, item_row_h)
+            for xx in (x1, x2, x3, x4):
+                line(xx, y - item_row_h, xx, y)
+            y -= item_row_h
+
+        write_y = y + rows_per_page * item_row_h - 7 * mm
+
+        c.setFont("Helvetica", 9)
+        for it in page_items:
+            qty = it.quantity
+
+            if cur == "USD":
+                unit = (it.unit_price_usd if it.unit_price_usd is not None
+                        else (Decimal(it.unit_price) / (sale.fx_usd or Decimal("1"))))
+                line_total = Decimal(unit) * Decimal(qty)
+            else:
+                unit = Decimal(it.unit_price)
+                line_total = unit * Decimal(qty)
+
+            c.drawCentredString(box_x + col_cant / 2, write_y, str(qty))
+            c.drawString(x1 + 2 * mm, write_y, f"{it.product.name}"[:55])
+            c.drawRightString(x4 - 2 * mm, write_y, money(unit))
+            c.drawRightString(box_x + box_w - 2 * mm, write_y, money(line_total))
+
+            write_y -= item_row_h
 
     # -----------------------------
     # FOOTER (zona reservada)
     # -----------------------------
-    line(box_x, footer_top, box_x + box_w, footer_top, w=1.0)
-
-    totals_x = box_x + 120 * mm
-    totals_right = box_x + box_w
-    line(totals_x, footer_bottom, totals_x, footer_top)
-
-    # Nota izquierda
-    c.setFont("Helvetica", 9)
-    c.drawCentredString((box_x + totals_x) / 2, footer_bottom + 20 * mm,
-                        "ESTA FACTURA VA SIN TACHADURA NI ENMIENDA")
-    c.setFont("Helvetica-Bold", 10)
-    c.drawString(box_x + 55 * mm, footer_bottom + 12 * mm, "ORIGINAL")
-
-    # Totales derecha
-    r1 = 9 * mm
-    r2 = 9 * mm
-    r3 = 9 * mm
-    yT = footer_top
-
-    line(totals_x, yT - r1, totals_right, yT - r1)
-    line(totals_x, yT - r1 - r2, totals_right, yT - r1 - r2)
-    line(totals_x, yT - r1 - r2 - r3, totals_right, yT - r1 - r2 - r3)
-
-    c.setFont("Helvetica", 9)
-    c.drawString(totals_x + 4 * mm, yT - 6 * mm, "SUB-TOTAL")
-    c.drawString(totals_x + 4 * mm, yT - r1 - 6 * mm, "AJUSTES")
-    c.drawString(totals_x + 4 * mm, yT - r1 - r2 - 6 * mm, "IVA")
-    c.drawString(totals_x + 4 * mm, yT - r1 - r2 - r3 - 6 * mm, "TOTAL A PAGAR")
-
-    c.setFont("Helvetica-Bold", 10)
-    # SUBTOTAL (base imponible)
-    c.drawRightString(totals_right - 4 * mm, yT - 6 * mm, money(base))
-    # AJUSTES (lo dejamos en blanco / 0)
-    c.setFont("Helvetica", 10)
-    c.drawRightString(totals_right - 4 * mm, yT - r1 - 6 * mm, money(Decimal("0.00")))
-    # IVA
-    c.setFont("Helvetica", 10)
-    c.drawRightString(totals_right - 4 * mm, yT - r1 - r2 - 6 * mm, money(iva))
-    # TOTAL
-    c.setFont("Helvetica-Bold", 10)
-    c.drawRightString(totals_right - 4 * mm, yT - r1 - r2 - r3 - 6 * mm, money(total))
-
-    c.showPage()
+    def draw_footer_continued(page_no: int) -> None:
+        line(box_x, footer_top, box_x + box_w, footer_top, w=1.0)
+
+        c.setFont("Helvetica-Bold", 10)
+        c.drawCentredString(box_x + box_w / 2, footer_bottom + 22 * mm,
+                            f"CONTINÚA EN LA PÁGINA {page_no + 1} DE {pages}")
+        c.setFont("Helvetica", 9)
+        c.drawCentredString(box_x + box_w / 2, footer_bottom + 14 * mm,
+                            "LOS TOTALES SE INDICAN EN LA ÚLTIMA PÁGINA")
+
+    def draw_footer_totals() -> None:
+        line(box_x, footer_top, box_x + box_w, footer_top, w=1.0)
+
+        totals_x = box_x + 120 * mm
+        totals_right = box_x + box_w
+        line(totals_x, footer_bottom, totals_x, footer_top)
+
+        # Nota izquierda
+        c.setFont("Helvetica", 9)
+        c.drawCentredString((box_x + totals_x) / 2, footer_bottom + 20 * mm,
+                            "ESTA FACTURA VA SIN TACHADURA NI ENMIENDA")
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(box_x + 55 * mm, footer_bottom + 12 * mm, "ORIGINAL")
+
+        # Totales derecha
+        r1 = 9 * mm
+        r2 = 9 * mm
+        r3 = 9 * mm
+        yT = footer_top
+
+        line(totals_x, yT - r1, totals_right, yT - r1)
+        line(totals_x, yT - r1 - r2, totals_right, yT - r1 - r2)
+        line(totals_x, yT - r1 - r2 - r3, totals_right, yT - r1 - r2 - r3)
+
+        c.setFont("Helvetica", 9)
+        c.drawString(totals_x + 4 * mm, yT - 6 * mm, "SUB-TOTAL")
+        c.drawString(totals_x + 4 * mm, yT - r1 - 6 * mm, "AJUSTES")
+        c.drawString(totals_x + 4 * mm, yT - r1 - r2 - 6 * mm, "IVA")
+        c.drawString(totals_x + 4 * mm, yT - r1 - r2 - r3 - 6 * mm, "TOTAL A PAGAR")
+
+        c.setFont("Helvetica-Bold", 10)
+        # SUBTOTAL (base imponible)
+        c.drawRightString(totals_right - 4 * mm, yT - 6 * mm, money(base))
+        # AJUSTES (lo dejamos en blanco / 0)
+        c.setFont("Helvetica", 10)
+        c.drawRightString(totals_right - 4 * mm, yT - r1 - 6 * mm, money(Decimal("0.00")))
+        # IVA
+        c.setFont("Helvetica", 10)
+        c.drawRightString(totals_right - 4 * mm, yT - r1 - r2 - 6 * mm, money(iva))
+        # TOTAL
+        c.setFont("Helvetica-Bold", 10)
+        c.drawRightString(totals_right - 4 * mm, yT - r1 - r2 - r3 - 6 * mm, money(total))
+
+    # ----------------------------
+    # Páginas
+    # ----------------------------
+    for page_no in range(1, pages + 1):
+        offset = (page_no - 1) * rows_per_page
+        y = draw_header(page_no)
+        draw_rows(y, items[offset:offset + rows_per_page])
+        if page_no < pages:
+            draw_footer_continued(page_no)
+        else:
+            draw_footer_totals()
+        c.showPage()
+
     c.save()
     return buf.getvalue()
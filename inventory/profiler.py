@@ -0,0 +1,248 @@
+# inventory/profiler.py
+# Profiler por muestreo bajo demanda para requests individuales en producción.
+#
+# Una request se perfila si trae el header X-Profile con un token firmado (comando
+# profile_token) o si un admin armó el perfilado para una ruta (POST profiles/; DELETE
+# profiles/ lo desarma).
+# Mientras corre la request, un hilo aparte toma el stack del hilo que la atiende cada
+# PROFILER_INTERVAL_MS (sys._current_frames) y al terminar guarda las muestras en
+# formato "folded" (flamegraph.pl, speedscope) en PROFILER_DIR, fuera de MEDIA_ROOT.
+# Los frames de librerías (p. ej. ReportLab en invoice/) se incluyen.
+#
+# Con PROFILER_ENABLED apagado el middleware no se instala (costo cero); encendido,
+# una request sin header ni ruta armada solo paga un dict lookup y una comparación.
+import json
+import os
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+
+HEADER = "X-Profile"
+ARM_KEY = "profiler:armed"
+SALT = "inventory.profiler"
+SUFFIX = ".folded"
+
+_NAME_OK = re.compile(r"^[\w.-]+\.folded$")
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "PROFILER_ENABLED", False)
+
+
+def profile_dir() -> str:
+    return str(getattr(settings, "PROFILER_DIR", settings.BASE_DIR / "profiles"))
+
+
+# ---- Activación: token firmado o ruta armada ----
+
+def make_token(path_prefix: str) -> str:
+    """Valor del header X-Profile para requests cuya ruta empiece con path_prefix."""
+    return signing.TimestampSigner(salt=SALT).sign_object({"path": path_prefix})
+
+
+def _token_matches(token: str, path: str) -> bool:
+    max_age = getattr(settings, "PROFILER_TOKEN_MAX_AGE", 3600)
+    try:
+        data = signing.TimestampSigner(salt=SALT).unsign_object(token, max_age=max_age)
+    except signing.BadSignature:  # incluye SignatureExpired
+        return False
+    return path.startswith(data.get("path") or "/")
+
+
+def arm(path_prefix: str, count: int = 1, ttl: int = 600) -> dict:
+    """Perfila las próximas `count` requests cuya ruta empiece con path_prefix (en todos los workers)."""
+    state = {"path": path_prefix, "count": count, "expires": time.time() + ttl}
+    cache.set(ARM_KEY, state, timeout=ttl)
+    cache.set(f"{ARM_KEY}:left", count, timeout=ttl)
+    _armed_local.update(checked=0.0)
+    return state
+
+
+def disarm():
+    cache.delete_many([ARM_KEY, f"{ARM_KEY}:left"])
+    _armed_local.update(checked=0.0, state=None)
+
+
+def armed_state():
+    state = cache.get(ARM_KEY)
+    if state is None:
+        return None
+    return {**state, "count": max(cache.get(f"{ARM_KEY}:left") or 0, 0)}
+
+
+# el estado armado se relee del cache compartido a lo sumo una vez por segundo por proceso
+_armed_local = {"checked": 0.0, "state": None}
+
+
+def _armed_for(path: str) -> bool:
+    now = time.monotonic()
+    if now - _armed_local["checked"] > 1.0:
+        _armed_local.update(checked=now, state=cache.get(ARM_KEY))
+    state = _armed_local["state"]
+    if state is None or not path.startswith(state["path"]) or state["expires"] < time.time():
+        return False
+    try:
+        left = cache.decr(f"{ARM_KEY}:left")
+    except ValueError:  # expiró o lo desarmaron
+        left = -1
+    if left < 0:
+        _armed_local["state"] = None
+        return False
+    return True
+
+
+# ---- Muestreo ----
+
+_ROOTS = sorted(
+    {p for p in (sysconfig.get_paths().get("purelib"), sysconfig.get_paths().get("stdlib")) if p},
+    key=len, reverse=True,
+)
+
+
+def _label(code) -> str:
+    filename = code.co_filename
+    base = str(settings.BASE_DIR)
+    if filename.startswith(base) and "site-packages" not in filename:
+        filename = filename[len(base) + 1:]
+    else:
+        for root in _ROOTS:
+            if filename.startswith(root):
+                filename = filename[len(root) + 1:]
+                break
+        else:
+            filename = os.path.basename(filename)
+    # ';' separa frames en el formato folded
+    return f"{filename}:{code.co_name}".replace(";", ":").replace(" ", "_")
+
+
+class Sampler:
+    """Muestrea el stack de un hilo cada `interval` segundos hasta stop()."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()  # tupla de code objects (raíz → hoja) → n
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self):
+        wait = self._stop.wait
+        while not wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        labels = {}
+        lines = []
+        for stack, n in self.samples.most_common():
+            names = []
+            for code in stack:
+                name = labels.get(code)
+                if name is None:
+                    name = labels[code] = _label(code)
+                names.append(name)
+            lines.append(f"{';'.join(names)} {n}")
+        return "\n".join(lines) + "\n"
+
+
+def save(sampler: Sampler, request, status: int) -> str:
+    """Guarda el perfil (.folded) y sus metadatos (.json). Devuelve el nombre del archivo."""
+    os.makedirs(profile_dir(), exist_ok=True)
+    now = datetime.now(timezone.utc)
+    slug = re.sub(r"[^\w]+", "-", request.path).strip("-")[:80] or "root"
+    ms = sampler.elapsed * 1000
+    name = f"{now:%Y%m%dT%H%M%S%f}_{request.method}_{slug}_{ms:.0f}ms{SUFFIX}"
+    path = os.path.join(profile_dir(), name)
+    with open(path, "w") as f:
+        f.write(sampler.folded())
+    meta = {
+        "name": name,
+        "created_at": now.isoformat(),
+        "method": request.method,
+        "path": request.get_full_path(),
+        "status": status,
+        "duration_ms": round(ms, 1),
+        "samples": sum(sampler.samples.values()),
+        "interval_ms": sampler.interval * 1000,
+        "user": getattr(getattr(request, "user", None), "username", None) or None,
+    }
+    with open(path[: -len(SUFFIX)] + ".json", "w") as f:
+        json.dump(meta, f)
+    return name
+
+
+def list_profiles() -> list:
+    """Metadatos de los perfiles guardados, del más reciente al más antiguo."""
+    try:
+        names = sorted((n for n in os.listdir(profile_dir()) if n.endswith(SUFFIX)), reverse=True)
+    except FileNotFoundError:
+        return []
+    out = []
+    for name in names:
+        path = os.path.join(profile_dir(), name)
+        try:
+            with open(path[: -len(SUFFIX)] + ".json") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {"name": name}
+        meta["size"] = os.path.getsize(path)
+        out.append(meta)
+    return out
+
+
+def profile_path(name: str):
+    """Ruta del perfil `name` o None (nombres validados: sin separadores ni '..')."""
+    if not _NAME_OK.match(name) or ".." in name:
+        return None
+    path = os.path.join(profile_dir(), name)
+    return path if os.path.isfile(path) else None
+
+
+class ProfilerMiddleware:
+    """
+    Activo con PROFILER_ENABLED=1. Perfila la request si trae X-Profile válido para su
+    ruta o si la ruta está armada; añade X-Profile-Id con el nombre del perfil.
+    """
+
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.interval = getattr(settings, "PROFILER_INTERVAL_MS", 5) / 1000
+
+    def __call__(self, request):
+        token = request.headers.get(HEADER)
+        if not (_token_matches(token, request.path) if token else _armed_for(request.path)):
+            return self.get_response(request)
+
+        sampler = Sampler(threading.get_ident(), self.interval).start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        response["X-Profile-Id"] = save(sampler, request, response.status_code)
+        return response
@@ -0,0 +1,311 @@
+# inventory/reports.py
+# Consultas de lectura para KPIs/reportes (compartidas por vistas y benchmarks).
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Case, CharField, Count, DateField, F, IntegerField, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Trunc
+from django.utils import timezone
+
+from .archive import sale_item_models, sale_models
+from .models import Product, ProductSalesDaily, SaleDailyRollup, Stock, Store
+from . import sharding
+from .sharding import fan_out
+
+
+def is_day_aligned(dt) -> bool:
+    """True si dt cae exactamente a medianoche (hora local)."""
+    return timezone.localtime(dt).time() == time(0)
+
+
+def top_products_raw(start, end):
+    """
+    Ranking por producto agrupando SaleItem (join con Sale.created_at).
+    Sirve para cualquier rango, pero recorre todas las líneas del rango. Si el rango
+    llega a ventas archivadas suma también ArchivedSaleItem (y devuelve una lista).
+    """
+    querysets = [
+        model.objects
+        .filter(sale__created_at__gte=start, sale__created_at__lt=end)
+        .values("product_id", "product__name", "product__sku")
+        .annotate(
+            total_units=Coalesce(Sum("quantity"), 0),
+            total_sales_lines=Coalesce(Count("id"), 0),
+        )
+        .order_by("-total_units", "-total_sales_lines", "product__name")
+        for model in sale_item_models(start)
+    ]
+    if len(querysets) == 1:
+        return querysets[0]
+    merged = {}
+    for r in (r for qs in querysets for r in qs):
+        row = merged.setdefault(r["product_id"], {**r, "total_units": 0, "total_sales_lines": 0})
+        row["total_units"] += r["total_units"]
+        row["total_sales_lines"] += r["total_sales_lines"]
+    return sorted(merged.values(), key=lambda r: (-r["total_units"], -r["total_sales_lines"], r["product__name"]))
+
+
+def top_products_rollup(start, end):
+    """
+    Ranking por producto sumando días pre-agregados de ProductSalesDaily.
+    Requiere start/end alineados a medianoche (ver is_day_aligned).
+    """
+    return (
+        ProductSalesDaily.objects
+        .filter(day__gte=timezone.localtime(start).date(), day__lt=timezone.localtime(end).date())
+        .values("product_id", "product__name", "product__sku")
+        .annotate(
+            total_units=Coalesce(Sum("units"), 0),
+            total_sales_lines=Coalesce(Sum("lines"), 0),
+        )
+        .order_by("-total_units", "-total_sales_lines", "product__name")
+    )
+
+
+def top_products(start, end):
+    """Usa el resumen diario si el rango es de días completos; si no, la consulta directa."""
+    if is_day_aligned(start) and is_day_aligned(end):
+        return top_products_rollup(start, end)
+    return top_products_raw(start, end)
+
+
+# ---- Con sharding por sede: una consulta por shard en paralelo (sin joins al catálogo) ----
+
+def top_products_sharded(start, end) -> list:
+    """Mismo ranking que top_products() sumando los shards; nombre/sku desde el catálogo."""
+    aligned = is_day_aligned(start) and is_day_aligned(end)
+
+    def per_shard(alias):
+        if aligned:
+            querysets = [ProductSalesDaily.objects.using(alias)
+                         .filter(day__gte=timezone.localtime(start).date(), day__lt=timezone.localtime(end).date())
+                         .values("product_id").annotate(u=Sum("units"), n=Sum("lines"))]
+        else:
+            querysets = [model.objects.using(alias)
+                         .filter(sale__created_at__gte=start, sale__created_at__lt=end)
+                         .values("product_id").annotate(u=Sum("quantity"), n=Count("id"))
+                         for model in sale_item_models(start, using=alias)]
+        return [r for qs in querysets for r in qs.order_by().values_list("product_id", "u", "n")]
+
+    totals = {}
+    for rows in fan_out(per_shard):
+        for product_id, units, lines in rows:
+            u, n = totals.get(product_id, (0, 0))
+            totals[product_id] = (u + int(units or 0), n + int(lines or 0))
+    names = {pid: (name, sku) for pid, name, sku in
+             Product.objects.filter(id__in=totals).values_list("id", "name", "sku")}
+    rows = [
+        {"product_id": pid, "product__name": names.get(pid, ("", ""))[0], "product__sku": names.get(pid, ("", ""))[1],
+         "total_units": u, "total_sales_lines": n}
+        for pid, (u, n) in totals.items()
+    ]
+    rows.sort(key=lambda r: (-r["total_units"], -r["total_sales_lines"], r["product__name"]))
+    return rows
+
+
+def stats_totals_sharded(since):
+    """(stock por sede como en StatsView, {"n", "s"} ventas desde `since`) sumando los shards."""
+    def per_shard(alias):
+        stock = list(Stock.objects.using(alias).values("store_id").annotate(total=Sum("quantity"))
+                     .order_by().values_list("store_id", "total"))
+        ventas = SaleDailyRollup.objects.using(alias).filter(day__gte=since).aggregate(
+            n=Coalesce(Sum("sales_count"), 0), s=Coalesce(Sum("total"), Decimal("0.00")),
+        )
+        return stock, ventas
+
+    per_store, n, total = {}, 0, Decimal("0.00")
+    for stock, ventas in fan_out(per_shard):
+        for store_id, quantity in stock:
+            per_store[store_id] = per_store.get(store_id, 0) + int(quantity or 0)
+        n += int(ventas["n"] or 0)
+        total += Decimal(ventas["s"] or 0)
+    codes = dict(Store.objects.filter(id__in=per_store).values_list("id", "code"))
+    stock_por_sede = sorted(
+        ({"store__code": codes.get(store_id), "total": q} for store_id, q in per_store.items()),
+        key=lambda r: r["store__code"] or "",
+    )
+    return stock_por_sede, {"n": n, "s": total}
+
+
+# ---- Alertas de stock ----
+
+ALERT_KINDS = {
+    "low": "low_stock",
+    "out": "out_of_stock",
+    "inactive": "inactive_products",
+}
+
+
+def stock_alerts_queryset(*, fallback_threshold: int = 5, store_code: str | None = None):
+    """
+    Productos con total de stock y umbral efectivo anotados, y clasificados en SQL:
+    alert = inactive | out | low | "" (sin alerta).
+    Umbral efectivo: max(min_threshold) de sus stocks si es > 0; si no, fallback_threshold.
+    Con store_code solo se consideran los stocks de esa sede.
+    """
+    qs = Product.objects.all()
+    if store_code:
+        # filter() antes de annotate(): el Sum/Max usan el mismo join filtrado por sede
+        qs = qs.filter(stocks__store__code=store_code)
+
+    return (
+        qs
+        .annotate(
+            stock_total=Coalesce(Sum("stocks__quantity"), 0),
+            max_threshold=Coalesce(Max("stocks__min_threshold"), 0),
+        )
+        .annotate(
+            threshold=Case(
+                When(max_threshold__gt=0, then=F("max_threshold")),
+                default=Value(int(fallback_threshold)),
+                output_field=IntegerField(),
+            ),
+        )
+        .annotate(
+            alert=Case(
+                When(is_active=False, then=Value("inactive")),
+                When(stock_total__lte=0, then=Value("out")),
+                When(stock_total__lte=F("threshold"), then=Value("low")),
+                default=Value(""),
+                output_field=CharField(),
+            ),
+        )
+    )
+
+
+def stock_alert_counts(qs) -> dict:
+    """Cuántos productos hay en cada categoría de alerta (una sola consulta agrupada)."""
+    agg = qs.aggregate(**{kind: Count("id", filter=Q(alert=kind)) for kind in ALERT_KINDS})
+    return {kind: int(agg[kind] or 0) for kind in ALERT_KINDS}
+
+
+# ---- Serie temporal de ventas ----
+
+BUCKETS = ("hour", "day", "week", "month")
+MAX_BUCKETS = 24 * 366  # un año de horas
+
+
+def _bucket_floor(dt: datetime, bucket: str) -> datetime:
+    """Inicio (naive, hora local) del bucket que contiene dt."""
+    dt = timezone.localtime(dt).replace(tzinfo=None) if timezone.is_aware(dt) else dt
+    if bucket == "hour":
+        return dt.replace(minute=0, second=0, microsecond=0)
+    dt = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == "week":
+        return dt - timedelta(days=dt.weekday())
+    if bucket == "month":
+        return dt.replace(day=1)
+    return dt
+
+
+def _bucket_next(dt: datetime, bucket: str) -> datetime:
+    if bucket == "hour":
+        return dt + timedelta(hours=1)
+    if bucket == "day":
+        return dt + timedelta(days=1)
+    if bucket == "week":
+        return dt + timedelta(days=7)
+    return dt.replace(year=dt.year + 1, month=1) if dt.month == 12 else dt.replace(month=dt.month + 1)
+
+
+def bucket_starts(start, end, bucket: str) -> list:
+    """Inicios de bucket (naive, hora local) que cubren [start, end)."""
+    out = []
+    cur = _bucket_floor(start, bucket)
+    stop = timezone.localtime(end).replace(tzinfo=None)
+    while cur < stop:
+        out.append(cur)
+        cur = _bucket_next(cur, bucket)
+    return out
+
+
+def sales_timeseries(start, end, bucket: str, *, store_code: str | None = None, payment_method: str | None = None) -> dict:
+    """
+    Totales de venta por bucket (hour/day/week/month) en un solo GROUP BY con truncado
+    de fecha, rellenando con ceros los buckets sin ventas. Devuelve arrays paralelos.
+    - hour, o rango con horas: agrupa Sale.created_at (y ArchivedSale si el rango llega al archivo).
+    - day/week/month con rango de días completos: agrupa el resumen SaleDailyRollup.
+    Con sharding suma los shards.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket inválido. Usa: {', '.join(BUCKETS)}")
+
+    starts = bucket_starts(start, end, bucket)
+    if len(starts) > MAX_BUCKETS:
+        raise ValueError(f"Rango demasiado grande para bucket={bucket} (máx. {MAX_BUCKETS} buckets).")
+
+    zero = Decimal("0.00")
+    aligned = bucket != "hour" and is_day_aligned(start) and is_day_aligned(end)
+    where = {"payment_method": payment_method} if payment_method else {}
+    if store_code and sharding.is_enabled():
+        # en el shard no hay tabla de sedes: se filtra por id
+        where["store_id"] = Store.objects.filter(code=store_code).values_list("id", flat=True).first()
+    elif store_code:
+        where["store__code"] = store_code
+
+    def per_db(using):
+        if aligned:
+            qs = SaleDailyRollup.objects.using(using).filter(
+                day__gte=timezone.localtime(start).date(), day__lt=timezone.localtime(end).date(), **where
+            )
+            return list(
+                qs.annotate(b=Trunc("day", bucket, output_field=DateField()))
+                .values("b")
+                .annotate(
+                    n=Coalesce(Sum("sales_count"), 0),
+                    s_total=Coalesce(Sum("total"), zero),
+                    s_usd=Coalesce(Sum("total_usd"), zero),
+                    s_vat=Coalesce(Sum("vat_bs"), zero),
+                )
+                .order_by("b")
+            )
+        rows = []
+        for model in sale_models(start, using=using):  # ventas recientes y, si el rango llega, archivadas
+            qs = model.objects.using(using).filter(created_at__gte=start, created_at__lt=end, **where)
+            rows += (
+                qs.annotate(b=Trunc("created_at", bucket))
+                .values("b")
+                .annotate(
+                    n=Count("id"),
+                    s_total=Coalesce(Sum("total"), zero),
+                    s_usd=Coalesce(Sum("total_usd"), zero),
+                    s_vat=Coalesce(Sum("vat_bs"), zero),
+                )
+                .order_by("b")
+            )
+        return rows
+
+    # con sharding, cada shard en paralelo; los buckets repetidos se suman abajo
+    rows = [r for part in fan_out(per_db) for r in part] if sharding.is_enabled() else per_db(None)
+
+    found = {}
+    for r in rows:
+        b = r["b"]
+        if not isinstance(b, datetime):
+            b = datetime(b.year, b.month, b.day)
+        key = _bucket_floor(b, bucket)
+        if key in found:  # mismo bucket en otro shard o en ventas archivadas
+            r = {k: found[key][k] + r[k] for k in ("n", "s_total", "s_usd", "s_vat")}
+        found[key] = r
+
+    count, total, total_usd, vat = [], [], [], []
+    for b in starts:
+        r = found.get(b)
+        if r is None:
+            count.append(0)
+            total.append(0.0)
+            total_usd.append(0.0)
+            vat.append(0.0)
+        else:
+            count.append(int(r["n"] or 0))
+            total.append(float(Decimal(r["s_total"]).quantize(Decimal("0.01"))))
+            total_usd.append(float(Decimal(r["s_usd"]).quantize(Decimal("0.01"))))
+            vat.append(float(Decimal(r["s_vat"]).quantize(Decimal("0.01"))))
+
+    return {
+        "t": [timezone.make_aware(b).isoformat() for b in starts],
+        "count": count,
+        "total_bs": total,
+        "total_usd": total_usd,
+        "vat_bs": vat,
+    }
@@ -1,10 +1,15 @@
 from rest_framework import serializers
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+
 from django.db import transaction
 
 from decimal import Decimal, ROUND_HALF_UP
 
 from .models import Store, Category, Product, Stock, Sale, SaleItem, FxRate
+
+from .sharding import product_stocks, store_atomic, store_scope
+
 def _requires_vat(payment_method: str) -> bool:
 
     return (payment_method or "").upper() in ("PAGO_MOVIL", "PUNTO")
@@ -93,7 +98,7 @@ class ProductSerializer(serializers.ModelSerializer):
 
             "image","image_url",
 
-            "price_usd",                
+            "price_usd","price_bs",
 
             "is_active","created_at",
 
@@ -101,7 +106,7 @@ class ProductSerializer(serializers.ModelSerializer):
 
         )
 
-        read_only_fields = ("is_active","created_at","total_stock","stocks_detail","image_url")
+        read_only_fields = ("is_active","created_at","total_stock","stocks_detail","image_url","price_bs")
 
 
 
@@ -173,7 +178,7 @@ class ProductSerializer(serializers.ModelSerializer):
 
             }
 
-            for s in obj.stocks.select_related("store").all()
+            for s in product_stocks(obj)
 
         ]
 
@@ -203,19 +208,21 @@ class ProductSerializer(serializers.ModelSerializer):
 
             thr = item.get("min_threshold", 0)
 
-            st, _ = Stock.objects.get_or_create(
+            with store_scope(store.id):
 
-                product=product, store=store,
+                st, _ = Stock.objects.get_or_create(
 
-                defaults={"quantity": 0, "min_threshold": thr}
+                    product=product, store=store,
 
-            )
+                    defaults={"quantity": 0, "min_threshold": thr}
 
-            st.min_threshold = int(thr)
+                )
 
-            st.quantity = int(qty)
+                st.min_threshold = int(thr)
 
-            st.save(update_fields=["quantity", "min_threshold"])
+                st.quantity = int(qty)
+
+                st.save(update_fields=["quantity", "min_threshold"])
 
 
 
@@ -261,19 +268,21 @@ class ProductSerializer(serializers.ModelSerializer):
 
                 thr = int(item.get("min_threshold", 0))
 
-                st, _ = Stock.objects.get_or_create(
+                with store_scope(store.id):
 
-                    product=instance, store=store,
+                    st, _ = Stock.objects.get_or_create(
 
-                    defaults={"quantity": 0, "min_threshold": thr}
+                        product=instance, store=store,
 
-                )
+                        defaults={"quantity": 0, "min_threshold": thr}
 
-                st.quantity = qty
+                    )
 
-                st.min_threshold = thr
+                    st.quantity = qty
 
-                st.save(update_fields=["quantity", "min_threshold"])
+                    st.min_threshold = thr
+
+                    st.save(update_fields=["quantity", "min_threshold"])
 
 
 
@@ -549,11 +558,27 @@ class SaleSerializer(serializers.ModelSerializer):
 
 
 
-    @transaction.atomic
-
     def create(self, validated_data):
 
-        from .services import adjust_stock, get_current_fx
+        # una transacción en la BD de la sede: su shard con sharding, default sin él
+
+        try:
+
+            with store_atomic(validated_data["store"].id):
+
+                return self._create(validated_data)
+
+        except DjangoValidationError as e:
+
+            # stock insuficiente (adjust_stock): 400, también si la escribió el group commit
+
+            raise serializers.ValidationError(e.messages)
+
+
+
+    def _create(self, validated_data):
+
+        from .services import adjust_stock, get_current_fx, record_sale_rollup, sync_product_active
 
 
 
@@ -581,6 +606,8 @@ class SaleSerializer(serializers.ModelSerializer):
 
         total_usd_acc = Decimal("0.00")
 
+        lines = []  # (product_id, quantity) para los resúmenes diarios
+
 
 
         for it in items:
@@ -593,6 +620,8 @@ class SaleSerializer(serializers.ModelSerializer):
 
             # 1) Resolver unit_price_usd prioritariamente
 
+            list_price = False
+
             if "unit_price_usd" in it and it["unit_price_usd"] is not None:
 
                 up_usd = Decimal(str(it["unit_price_usd"]))
@@ -607,15 +636,23 @@ class SaleSerializer(serializers.ModelSerializer):
 
                 up_usd = Decimal(str(product.price_usd))
 
+                list_price = True
+
 
 
             up_usd = up_usd.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
 
 
-            # 2) Equivalente en Bs (fotografiado)
+            # 2) Equivalente en Bs (fotografiado): el precio de lista ya calculado con esta tasa
 
-            up_bs = (up_usd * (fx or Decimal("1"))).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            if list_price and product.price_bs_fx is not None and product.price_bs_fx == fx:
+
+                up_bs = product.price_bs
+
+            else:
+
+                up_bs = (up_usd * (fx or Decimal("1"))).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
 
 
@@ -635,6 +672,8 @@ class SaleSerializer(serializers.ModelSerializer):
 
 
 
+            lines.append((product.id, qty))
+
             total_usd_acc += (up_usd * Decimal(qty))
 
             total_bs += (up_bs * Decimal(qty))
@@ -643,9 +682,9 @@ class SaleSerializer(serializers.ModelSerializer):
 
             adjust_stock(product=product, store=sale.store, delta=-qty)
 
-            product.is_active = (product.total_stock > 0)
+            # solo si cambia; con sharding, al confirmar el shard (el producto vive en default)
 
-            product.save(update_fields=["is_active"])
+            sync_product_active(product)
 
 
 
@@ -757,6 +796,12 @@ class SaleSerializer(serializers.ModelSerializer):
 
         ])
 
+
+
+        # resumen diario (misma transacción)
+
+        record_sale_rollup(sale, lines=lines)
+
         return sale
 
     
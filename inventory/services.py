@@ -1,11 +1,25 @@
-from django.db import transaction
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate
 from django.core.exceptions import ValidationError
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
+from bisect import bisect_right
+import threading
+import time
 from django.utils import timezone
-from .models import Product, Store, Stock, FxRate
+from .models import (
+    ArchivedSale, ArchivedSaleItem, Product, Store, Stock, FxRate, Sale, SaleItem, SaleDailyRollup, ProductSalesDaily,
+)
 from django.conf import settings
+from . import sharding
+from .kpi_cache import generations
 
-@transaction.atomic
+try:
+    import numpy as np
+except ImportError:  # opcional: sin NumPy el cálculo entero se hace en Python
+    np = None
+
+@sharding.atomic  # transacción en el shard de la sede (default sin sharding)
 def adjust_stock(*, product: Product, store: Store, delta: int):
     stock, _ = Stock.objects.select_for_update().get_or_create(
         product=product, store=store, defaults={"quantity": 0}
@@ -17,21 +31,273 @@ def adjust_stock(*, product: Product, store: Store, delta: int):
     stock.save(update_fields=["quantity"])
     return stock
 
-def get_current_fx() -> Decimal:
+def sync_product_active(product: Product) -> None:
     """
-    Devuelve la tasa Bs por USD desde settings.FX_USD_TO_BS.
-    Si no está definida o no es válida, usa 1.00.
+    is_active = hay stock en alguna sede. Con sharding el stock vive en el shard y el
+    producto en default: se actualiza cuando el shard confirma (una venta revertida no lo toca).
     """
+    def apply():
+        active = product.total_stock > 0
+        if product.is_active != active:
+            product.is_active = active
+            product.save(update_fields=["is_active"])
+
+    if sharding.current() is None:
+        apply()
+    else:
+        sharding.on_commit(apply)
+
+# ---- Tasa de cambio ----
+# Historial de FxRate en memoria del proceso, ordenado por (effective_date, id).
+# Se valida con la generación "fx" del cache (la incrementa el signal de FxRate al
+# hacer commit), así que una venta no paga una consulta extra por la tasa. Con un cache
+# compartido (Redis) una tasa publicada en otro worker se ve en la siguiente lectura;
+# con LocMem (por proceso) el bump no sale del worker que la publicó, y lo que acota el
+# retraso en los demás es FX_HISTORY_TTL: el historial se recarga al vencer.
+
+fx_stats = {"hits": 0, "loads": 0}
+
+
+class _FxHistory:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gen = None
+        self._loaded_at = 0.0
+        self._dates = []
+        self._rates = []
+
+    def invalidate(self):
+        with self._lock:
+            self._gen = None
+
+    def snapshot(self):
+        """(fechas, tasas) vigentes; recarga si cambió la generación "fx" o venció el TTL."""
+        gen = generations(("fx",))
+        ttl = getattr(settings, "FX_HISTORY_TTL", 5)
+        if gen == self._gen and time.monotonic() - self._loaded_at < ttl:
+            fx_stats["hits"] += 1
+            return self._dates, self._rates
+        with self._lock:
+            if gen != self._gen or time.monotonic() - self._loaded_at >= ttl:
+                # siempre del primario: el historial es de todo el proceso y lo usan las ventas
+                rows = list(FxRate.objects.using(DEFAULT_DB_ALIAS).order_by("effective_date", "id")
+                            .values_list("effective_date", "usd_to_bs"))
+                self._dates = [d for d, _ in rows]
+                self._rates = [Decimal(r) for _, r in rows]
+                self._gen = gen
+                self._loaded_at = time.monotonic()
+                fx_stats["loads"] += 1
+            return self._dates, self._rates
+
+
+_fx_history = _FxHistory()
+
+
+def _fx_fallback() -> Decimal:
     try:
         val = getattr(settings, "FX_USD_TO_BS", Decimal("1.00"))
         return Decimal(str(val))
     except Exception:
         return Decimal("1.00")
 
+
+def get_current_fx() -> Decimal:
+    """
+    Devuelve la tasa Bs por USD vigente: último FxRate por (effective_date, id).
+    Sin historial usa settings.FX_USD_TO_BS (o 1.00 si no es válida).
+    """
+    _, rates = _fx_history.snapshot()
+    return rates[-1] if rates else _fx_fallback()
+
+
+def get_fx_as_of(day) -> Decimal:
+    """
+    Tasa vigente en la fecha `day` (último FxRate con effective_date <= day), por
+    búsqueda binaria sobre el historial en memoria. Antes del primer registro usa
+    settings.FX_USD_TO_BS.
+    """
+    dates, rates = _fx_history.snapshot()
+    i = bisect_right(dates, day)
+    return rates[i - 1] if i else _fx_fallback()
+
 @transaction.atomic
 def set_fx(usd_to_bs: Decimal, *, user) -> FxRate:
-    return FxRate.objects.create(
+    fx = FxRate.objects.create(
         usd_to_bs=Decimal(usd_to_bs),
         effective_date=timezone.now().date(),
         created_by=user
     )
+    # este proceso recarga aunque el cache compartido no esté disponible
+    transaction.on_commit(_fx_history.invalidate)
+    return fx
+
+# ---- Precios en Bs precalculados ----
+# Product.price_bs = price_usd (a 0.01) × tasa, a 0.01 con ROUND_HALF_UP: el mismo
+# redondeo que SaleSerializer.create, así el precio listado es el que se factura.
+
+CENT = Decimal("0.01")
+
+
+def price_bs_for(price_usd, fx: Decimal) -> Decimal:
+    """Precio en Bs de un precio USD con la tasa fx (redondeo de la factura)."""
+    up_usd = Decimal(str(price_usd or 0)).quantize(CENT, rounding=ROUND_HALF_UP)
+    return (up_usd * fx).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _bs_cents(usd_cents: list, fx: Decimal) -> list:
+    """
+    Centavos de Bs para una lista de centavos USD en una sola pasada entera:
+    con fx en diezmilésimas, bs = (usd_cents · fx_units + 5000) // 10000 es
+    exactamente ROUND_HALF_UP a 0.01 (precios no negativos).
+    """
+    fx_units = fx * 10000
+    if fx_units != fx_units.to_integral_value() or fx < 0:
+        # más de 4 decimales (p. ej. settings): camino Decimal, mismo resultado
+        return [int(price_bs_for(Decimal(c) / 100, fx) * 100) for c in usd_cents]
+    fx_units = int(fx_units)
+    if np is not None and usd_cents and max(usd_cents) * fx_units < 2 ** 62:
+        arr = np.fromiter(usd_cents, dtype=np.int64, count=len(usd_cents))
+        return ((arr * fx_units + 5000) // 10000).tolist()
+    return [(c * fx_units + 5000) // 10000 for c in usd_cents]
+
+
+def latest_fx_rate():
+    """Tasa vigente leída de la BD (dentro de la transacción actual), o None."""
+    return FxRate.objects.order_by("-effective_date", "-id").values_list("usd_to_bs", flat=True).first()
+
+
+@transaction.atomic
+def reprice_catalog(fx: Decimal = None) -> int:
+    """
+    Recalcula price_bs de todo el catálogo con la tasa fx (default: la vigente)
+    en una sola pasada: lectura de (id, price_usd), cálculo entero y bulk_update.
+    Solo escribe los productos cuyo precio o tasa cambió. Devuelve cuántos.
+    """
+    if fx is None:
+        rate = latest_fx_rate()
+        fx = Decimal(rate) if rate is not None else _fx_fallback()
+    fx = Decimal(fx)
+
+    rows = list(Product.objects.values_list("id", "price_usd", "price_bs", "price_bs_fx"))
+    if not rows:
+        return 0
+    usd_cents = [int((Decimal(p or 0).quantize(CENT, rounding=ROUND_HALF_UP) * 100)) for _, p, _, _ in rows]
+    bs = _bs_cents(usd_cents, fx)
+
+    changed = []
+    for (pid, _, old_bs, old_fx), cents in zip(rows, bs):
+        new_bs = Decimal(cents) / 100
+        if old_bs != new_bs or old_fx != fx:
+            changed.append(Product(id=pid, price_bs=new_bs.quantize(CENT), price_bs_fx=fx))
+    Product.objects.bulk_update(changed, ["price_bs", "price_bs_fx"], batch_size=1000)
+    return len(changed)
+
+
+# ---- Resumen diario de ventas ----
+
+@sharding.atomic
+def record_sale_rollup(sale: Sale, *, sign: int = 1, lines=None) -> SaleDailyRollup:
+    """
+    Suma (sign=1) o resta (sign=-1) la venta en los resúmenes diarios:
+    - SaleDailyRollup: fila store × día × forma de pago.
+    - ProductSalesDaily: unidades/líneas por producto × día.
+    lines: iterable de (product_id, quantity); si no viene se lee de sale.items.
+    Se llama dentro de la transacción que crea/borra la venta.
+    """
+    day = timezone.localtime(sale.created_at).date()
+    row, _ = SaleDailyRollup.objects.select_for_update().get_or_create(
+        store_id=sale.store_id, day=day, payment_method=sale.payment_method or ""
+    )
+    row.sales_count = max(0, row.sales_count + sign)
+    row.total += sign * Decimal(sale.total or 0)
+    row.total_usd += sign * Decimal(sale.total_usd or 0)
+    row.vat_bs += sign * Decimal(sale.vat_bs or 0)
+    row.save(update_fields=["sales_count", "total", "total_usd", "vat_bs"])
+
+    if lines is None:
+        lines = sale.items.values_list("product_id", "quantity")
+
+    per_product = {}
+    for product_id, qty in lines:
+        units, n = per_product.get(product_id, (0, 0))
+        per_product[product_id] = (units + int(qty), n + 1)
+
+    if per_product:
+        existing = {
+            r.product_id: r
+            for r in ProductSalesDaily.objects.select_for_update().filter(day=day, product_id__in=per_product)
+        }
+        to_create = []
+        for product_id, (units, n) in per_product.items():
+            r = existing.get(product_id)
+            if r is None:
+                r = ProductSalesDaily(product_id=product_id, day=day)
+                to_create.append(r)
+            r.units = max(0, r.units + sign * units)
+            r.lines = max(0, r.lines + sign * n)
+        if existing:
+            ProductSalesDaily.objects.bulk_update(existing.values(), ["units", "lines"])
+        if to_create:
+            ProductSalesDaily.objects.bulk_create(to_create)
+
+    return row
+
+@sharding.atomic
+def rebuild_sales_rollup() -> int:
+    """
+    Reconstruye SaleDailyRollup y ProductSalesDaily desde Sale/SaleItem y las ventas archivadas.
+    Devuelve cuántas filas quedaron (suma de ambas tablas).
+    """
+    zero = Decimal("0.00")
+    totals = {}
+    for model in (Sale, ArchivedSale):
+        groups = (
+            model.objects
+            .annotate(day=TruncDate("created_at"))
+            .values("store_id", "day", "payment_method")
+            .annotate(
+                n=Count("id"),
+                s_total=Coalesce(Sum("total"), zero),
+                s_usd=Coalesce(Sum("total_usd"), zero),
+                s_vat=Coalesce(Sum("vat_bs"), zero),
+            )
+            .order_by()
+        )
+        for g in groups:
+            key = (g["store_id"], g["day"], g["payment_method"] or "")
+            acc = totals.setdefault(key, [0, zero, zero, zero])
+            acc[0] += g["n"]
+            acc[1] += g["s_total"]
+            acc[2] += g["s_usd"]
+            acc[3] += g["s_vat"]
+    rows = [
+        SaleDailyRollup(
+            store_id=store_id, day=day, payment_method=payment_method,
+            sales_count=n, total=s_total, total_usd=s_usd, vat_bs=s_vat,
+        )
+        for (store_id, day, payment_method), (n, s_total, s_usd, s_vat) in totals.items()
+    ]
+    SaleDailyRollup.objects.all().delete()
+    SaleDailyRollup.objects.bulk_create(rows, batch_size=1000)
+
+    product_totals = {}
+    for model in (SaleItem, ArchivedSaleItem):
+        product_groups = (
+            model.objects
+            .annotate(day=TruncDate("sale__created_at"))
+            .values("product_id", "day")
+            .annotate(units=Coalesce(Sum("quantity"), 0), n=Count("id"))
+            .order_by()
+        )
+        for g in product_groups:
+            acc = product_totals.setdefault((g["product_id"], g["day"]), [0, 0])
+            acc[0] += g["units"]
+            acc[1] += g["n"]
+    product_rows = [
+        ProductSalesDaily(product_id=product_id, day=day, units=units, lines=n)
+        for (product_id, day), (units, n) in product_totals.items()
+    ]
+    ProductSalesDaily.objects.all().delete()
+    ProductSalesDaily.objects.bulk_create(product_rows, batch_size=1000)
+
+    return len(rows) + len(product_rows)
@@ -0,0 +1,183 @@
+# inventory/sharding.py
+# Sharding opcional por sede (SHARD_COUNT > 0).
+#
+# Ventas y stock (Stock, Sale, SaleItem, SaleDailyRollup, ProductSalesDaily y las ventas
+# archivadas) viven en la BD de su sede: alias shard_<store_id % SHARD_COUNT>. El catálogo
+# (sedes, productos, categorías, tasas, usuarios, KPIs calculados) queda en "default".
+# Cada shard tiene el esquema completo pero sin catálogo, por eso sus conexiones van sin
+# foreign_keys y las consultas de un shard no hacen join con tablas del catálogo (se
+# completan con una lectura aparte en default).
+#
+# Ruteo: dentro de store_scope()/store_atomic() los modelos de ventas/stock van al shard de la
+# sede; fuera, se usa el shard de la instancia (objeto leído de un shard). Los ids de venta
+# llevan el shard (migrate_shards arranca cada secuencia en (n + 1) · SALE_ID_BLOCK), así
+# sales/<id>/ e invoice/ encuentran su BD sin consultar a todos. Las vistas entre sedes
+# (stats, top-products, serie temporal) consultan los shards en paralelo con fan_out() y suman;
+# compute_reorder_points y compute_abc leen shard por shard y guardan el resultado en default,
+# de donde lo sirven reorden/ABC.
+#
+# Fuera de alcance por ahora: alertas de stock y pivot responden 501 con sharding. Borrar un
+# producto o una sede no borra en cascada sus filas en los shards.
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Sum
+
+SHARDED_MODELS = {
+    "stock", "sale", "saleitem", "saledailyrollup", "productsalesdaily", "archivedsale", "archivedsaleitem",
+}
+SALE_ID_BLOCK = 10 ** 12
+
+_current = contextvars.ContextVar("store_shard", default=None)
+
+
+def shard_aliases() -> list:
+    return [f"shard_{i}" for i in range(getattr(settings, "SHARD_COUNT", 0))]
+
+
+def is_enabled() -> bool:
+    return getattr(settings, "SHARD_COUNT", 0) > 0
+
+
+def shard_for_store(store_id) -> str:
+    return f"shard_{int(store_id) % settings.SHARD_COUNT}"
+
+
+def shard_for_sale(sale_id):
+    """Alias del shard de una venta por su id; None si el id no es de ningún shard."""
+    try:
+        index = int(sale_id) // SALE_ID_BLOCK - 1
+    except (TypeError, ValueError):
+        return None
+    return f"shard_{index}" if 0 <= index < getattr(settings, "SHARD_COUNT", 0) else None
+
+
+# ---- Alcance: a qué shard van los modelos de ventas/stock ----
+
+def current():
+    """Alias del shard del alcance actual (None: default)."""
+    return _current.get()
+
+
+def on_commit(fn):
+    """
+    transaction.on_commit en la BD de ventas del alcance actual (el shard de la sede, o
+    default): dentro de store_atomic() corre cuando el shard confirma, no antes.
+    """
+    transaction.on_commit(fn, using=_current.get())
+
+
+@contextmanager
+def using_shard(alias):
+    if alias is None:
+        yield
+        return
+    token = _current.set(alias)
+    try:
+        yield alias
+    finally:
+        _current.reset(token)
+
+
+def store_scope(store_id):
+    """Rutea ventas/stock al shard de la sede (sin sharding: no hace nada)."""
+    return using_shard(shard_for_store(store_id)) if is_enabled() else nullcontext()
+
+
+@contextmanager
+def store_atomic(store_id):
+    """Transacción en la BD de la sede: su shard, o default sin sharding."""
+    if not is_enabled():
+        with transaction.atomic():
+            yield
+        return
+    alias = shard_for_store(store_id)
+    with using_shard(alias), transaction.atomic(using=alias):
+        yield
+
+
+def atomic(fn):
+    """Como @transaction.atomic, pero en el shard del alcance actual (default si no hay)."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with transaction.atomic(using=_current.get()):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+# ---- Fan-out ----
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def fan_out(fn) -> list:
+    """fn(alias) en paralelo en cada shard; resultados en el orden de shard_aliases()."""
+    global _pool
+    aliases = shard_aliases()
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=4 * len(aliases), thread_name_prefix="shard-fanout")
+
+    def run(alias):
+        try:
+            return fn(alias)
+        finally:
+            connections.close_all()  # conexiones del hilo del pool, no de la request
+
+    return list(_pool.map(run, aliases))
+
+
+def total_stock(product) -> int:
+    """Stock total del producto en todas las sedes."""
+    if not is_enabled():
+        return product.stocks.aggregate(s=Sum("quantity"))["s"] or 0
+    from .models import Stock
+    return sum(
+        Stock.objects.using(alias).filter(product_id=product.id).aggregate(s=Sum("quantity"))["s"] or 0
+        for alias in shard_aliases()
+    )
+
+
+def product_stocks(product) -> list:
+    """Stocks del producto con su sede cargada (con sharding: de todos los shards, sede desde default)."""
+    if not is_enabled():
+        return list(product.stocks.select_related("store"))
+    from .models import Stock, Store
+    rows = [st for alias in shard_aliases() for st in Stock.objects.using(alias).filter(product_id=product.id)]
+    stores = Store.objects.in_bulk({st.store_id for st in rows})
+    for st in rows:
+        st.store = stores[st.store_id]
+    return sorted(rows, key=lambda st: st.store_id)
+
+
+class ShardRouter:
+    def _route(self, model, hints):
+        if model._meta.app_label != "inventory" or model._meta.model_name not in SHARDED_MODELS:
+            # catálogo: también al navegar desde un objeto leído de un shard (venta.store)
+            return DEFAULT_DB_ALIAS
+        alias = _current.get()
+        if alias is not None:
+            return alias
+        instance = hints.get("instance")
+        if instance is not None:
+            if instance._state.db and instance._state.db.startswith("shard_"):
+                return instance._state.db
+            if getattr(instance, "store_id", None) is not None:
+                return shard_for_store(instance.store_id)
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._route(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._route(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # las FK cruzan BD (venta en shard → sede en default)
@@ -1,22 +1,90 @@
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from django.db.models import Sum
-from .models import Stock, Product, SaleItem
+from .models import Stock, Product, Sale, SaleItem, FxRate
+from .kpi_cache import bump_on_commit
+from .events import publish_on_commit, stock_crossing
 
 def _sync_product_active(product: Product):
-    total = product.stocks.aggregate(s=Sum("quantity"))["s"] or 0
-    new_active = total > 0
-    if product.is_active != new_active:
-        product.is_active = new_active
-        product.save(update_fields=["is_active"])
+    from .services import sync_product_active
+    sync_product_active(product)
 
 @receiver([post_save, post_delete], sender=Stock)
 def stock_changed(sender, instance: Stock, **kwargs):
     _sync_product_active(instance.product)
+    bump_on_commit("stock")
 
 @receiver([post_save, post_delete], sender=SaleItem)
 def saleitem_changed(sender, instance: SaleItem, **kwargs):
     _sync_product_active(instance.product)
+    bump_on_commit("sales")
+
+# ---- Generaciones del cache de KPIs ----
+@receiver([post_save, post_delete], sender=Sale)
+def sale_changed(sender, instance: Sale, **kwargs):
+    bump_on_commit("sales")
+
+@receiver([post_save, post_delete], sender=Product)
+def product_changed(sender, instance: Product, **kwargs):
+    bump_on_commit("stock")
+
+@receiver([post_save, post_delete], sender=FxRate)
+def fx_changed(sender, instance: FxRate, **kwargs):
+    bump_on_commit("fx")
+
+# ---- Precios en Bs precalculados ----
+@receiver([post_save, post_delete], sender=FxRate)
+def fx_reprice(sender, instance: FxRate, **kwargs):
+    # en la misma transacción que la tasa: la vigente se lee de la BD, no del cache
+    from .services import reprice_catalog
+    reprice_catalog()
+
+@receiver(pre_save, sender=Product)
+def product_price_bs(sender, instance: Product, update_fields=None, **kwargs):
+    if update_fields is not None and "price_usd" not in update_fields:
+        return  # p. ej. save(update_fields=["is_active"]) al vender
+    from .services import get_current_fx, price_bs_for
+    fx = get_current_fx()
+    instance.price_bs = price_bs_for(instance.price_usd, fx)
+    instance.price_bs_fx = fx
+
+@receiver(pre_delete, sender=Sale)
+def sale_deleted(sender, instance: Sale, **kwargs):
+    # pre_delete: los items aún existen y se descuentan del resumen por producto
+    from .services import record_sale_rollup
+    record_sale_rollup(instance, sign=-1)
+
+# ---- Eventos en vivo (SSE) ----
+def _stock_payload(st: Stock, **extra):
+    return {"product_id": st.product_id, "store_id": st.store_id,
+            "quantity": st.quantity, "min_threshold": st.min_threshold, **extra}
+
+@receiver(post_save, sender=Stock)
+def stock_event(sender, instance: Stock, **kwargs):
+    old = getattr(instance, "_loaded_quantity", None)
+    instance._loaded_quantity = instance.quantity
+    data = _stock_payload(instance, previous=old)
+    publish_on_commit("stock", data, store_id=instance.store_id)
+    crossing = stock_crossing(old, instance.quantity, instance.min_threshold)
+    if crossing:
+        publish_on_commit(crossing, data, store_id=instance.store_id)
+
+@receiver(post_delete, sender=Stock)
+def stock_deleted_event(sender, instance: Stock, **kwargs):
+    publish_on_commit("stock", _stock_payload(instance, deleted=True), store_id=instance.store_id)
+
+@receiver(post_save, sender=Sale)
+def sale_event(sender, instance: Sale, created, **kwargs):
+    if not created:
+        return
+    # los totales se guardan al final del create: se leen al hacer commit
+    publish_on_commit("sale", lambda: {
+        "id": instance.id, "store_id": instance.store_id, "created_at": instance.created_at,
+        "total": instance.total, "total_usd": instance.total_usd, "payment_method": instance.payment_method,
+    }, store_id=instance.store_id)
+
+@receiver(post_save, sender=FxRate)
+def fx_event(sender, instance: FxRate, created, **kwargs):
+    publish_on_commit("fx", {"usd_to_bs": instance.usd_to_bs, "effective_date": instance.effective_date})
 
 # ---- Limpieza de archivos de imagen ----
 @receiver(pre_save, sender=Product)
@@ -0,0 +1,144 @@
+# inventory/singleflight.py
+# Single-flight: peticiones idénticas concurrentes esperan un único cálculo y
+# comparten su resultado.
+#
+# - Entre hilos del mismo worker: mapa key → llamada en curso + threading.Event.
+# - Entre procesos: lock con cache.add() en el backend compartido; el líder deja el
+#   resultado en el cache bajo una clave con su token y los demás lo sondean.
+#   Con LocMemCache (por proceso) solo aplica la parte local.
+import functools
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .kpi_cache import request_fingerprint
+
+LOCK_PREFIX = "sf:lock:"
+RESULT_PREFIX = "sf:res:"
+
+# contadores (los lee /metrics): líderes, coalescidas en el proceso y desde otro proceso
+stats = {"leaders": 0, "coalesced": 0, "coalesced_remote": 0}
+
+_lock = threading.Lock()
+_calls = {}
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+def _run_across_processes(key: str, fn, lease: float):
+    if not getattr(settings, "SINGLEFLIGHT_CROSS_PROCESS", True):
+        return fn(), False
+
+    lock_key = LOCK_PREFIX + key
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, timeout=int(lease) + 1):
+        try:
+            result = fn()
+            cache.set(f"{RESULT_PREFIX}{key}:{token}", result, timeout=int(lease) + 1)
+            return result, False
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    # otro proceso está calculando: esperar su resultado
+    poll = getattr(settings, "SINGLEFLIGHT_POLL_SECONDS", 0.05)
+    deadline = time.monotonic() + lease
+    owner = None
+    while time.monotonic() < deadline:
+        current = cache.get(lock_key)
+        owner = current or owner
+        if owner is not None:
+            result = cache.get(f"{RESULT_PREFIX}{key}:{owner}")
+            if result is not None:
+                return result, True
+        if current is None:
+            break
+        time.sleep(poll)
+
+    # el líder terminó sin dejar resultado (error / expiró): calcular aquí
+    return fn(), False
+
+
+def do(key: str, fn, *, lease: float = None):
+    """
+    Ejecuta fn() una sola vez para todas las llamadas concurrentes con la misma key.
+    Devuelve (resultado, origen, seguidores) donde origen es "leader", "local" o "remote"
+    y seguidores es cuántas llamadas del proceso compartieron el cálculo (solo el líder).
+    """
+    lease = lease or getattr(settings, "SINGLEFLIGHT_LEASE_SECONDS", 30)
+
+    with _lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+        else:
+            call.waiters += 1
+
+    if not leader:
+        if not call.event.wait(lease):
+            return fn(), "leader", 0
+        if call.error is not None:
+            raise call.error
+        stats["coalesced"] += 1
+        return call.result, "local", 0
+
+    try:
+        result, remote = _run_across_processes(key, fn, lease)
+        call.result = result
+    except BaseException as exc:
+        call.error = exc
+        raise
+    finally:
+        with _lock:
+            _calls.pop(key, None)
+            followers = call.waiters
+        call.event.set()
+
+    if remote:
+        stats["coalesced_remote"] += 1
+        return result, "remote", followers
+    stats["leaders"] += 1
+    return result, "leader", followers
+
+
+def single_flight(fn=None, *, lease=None):
+    """
+    Decorador para métodos GET de cualquier APIView: peticiones concurrentes con la
+    misma huella (vista, params, permisos) comparten un solo cálculo. Debajo de
+    @cached_kpi usa su clave, que incluye las generaciones de las dependencias.
+    Cabeceras: X-Coalesced: local | remote en las que esperaron;
+    X-Coalesced-Count: n en la que calculó.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            key = getattr(request, "kpi_cache_key", None) or request_fingerprint(self, request, args, kwargs)
+
+            def compute():
+                response = method(self, request, *args, **kwargs)
+                return response.status_code, response.data
+
+            (status_code, data), origin, followers = do(key, compute, lease=lease)
+
+            response = Response(data, status=status_code)
+            if origin == "leader":
+                response["X-Coalesced-Count"] = str(followers)
+            else:
+                response["X-Coalesced"] = origin
+            return response
+        return wrapper
+
+    return decorator(fn) if fn is not None else decorator
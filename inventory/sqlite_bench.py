@@ -0,0 +1,120 @@
+# inventory/sqlite_bench.py
+# Lectores y escritores concurrentes sobre una BD SQLite de prueba (comando bench_sqlite).
+#
+# Cada worker es un proceso "spawn" (como un worker de gunicorn) que fija SQLITE_PATH y
+# SQLITE_PROFILE antes de django.setup(): se mide exactamente lo que configura settings
+# para cada perfil. Los lectores recorren endpoints de KPIs y listados (cache de KPIs
+# apagado, todo va a la BD); los escritores crean ventas por la API.
+import os
+import random
+import statistics
+import time
+
+import django
+
+READS = (
+    "/api/inventory/stats/",
+    "/api/inventory/kpis/sales/top-products/?period=month",
+    "/api/inventory/kpis/stock/alerts/",
+    "/api/inventory/products/?search=Harina",
+)
+
+
+def _setup(path: str, profile: str):
+    os.environ["SQLITE_PATH"] = path
+    os.environ["SQLITE_PROFILE"] = profile
+    django.setup()
+
+
+def prepare(path: str, cfg: dict) -> dict:
+    """Migra una BD nueva en `path` y carga el dataset sintético. Devuelve los ids que usan los workers."""
+    _setup(path, "dev")
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from .models import Stock
+    from .synthetic import generate
+
+    call_command("migrate", verbosity=0, interactive=False)
+    generate(sales=cfg["sales"], products=cfg["products"], stores=cfg["stores"], categories=10,
+             prefix="sqlb", seed=cfg["seed"])
+    user = get_user_model().objects.create_superuser("bench-sqlite", password=None)
+    store = Stock.objects.order_by("store_id").values_list("store_id", flat=True).first()
+    Stock.objects.filter(store_id=store).update(quantity=10**7)  # los escritores nunca se quedan sin stock
+    products = list(Stock.objects.filter(store_id=store).order_by("product_id")
+                    .values_list("product_id", flat=True)[:200])
+    return {"user_id": user.id, "store_id": store, "products": products}
+
+
+def worker(path: str, profile: str, role: str, cfg: dict, index: int, barrier) -> dict:
+    """Un proceso lector ("read") o escritor ("write") durante cfg["duration"] segundos."""
+    _setup(path, profile)
+    import logging
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, connections
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    rnd = random.Random(cfg["seed"] * 100 + index)
+    client = APIClient()
+    client.force_authenticate(get_user_model().objects.get(pk=cfg["user_id"]))
+    out = {"role": role, "ok": 0, "lock_errors": 0, "errors": {}, "latencies_ms": []}
+
+    with override_settings(KPI_CACHE_ENABLED=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+        barrier.wait()  # todos arrancan juntos, ya inicializados
+        deadline = time.perf_counter() + cfg["duration"]
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                if role == "read":
+                    response = client.get(rnd.choice(READS))
+                else:
+                    items = [{"product_id": pid, "quantity": 1}
+                             for pid in rnd.sample(cfg["products"], k=rnd.randint(1, 5))]
+                    response = client.post("/api/inventory/sales/", {
+                        "store": cfg["store_id"], "payment_method": "DIVISAS", "customer_name": "Bench",
+                        "items": items,
+                    }, format="json")
+                error = None if response.status_code < 400 else f"HTTP {response.status_code}"
+            except OperationalError as e:
+                error = f"OperationalError: {e}"
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)[:120]}"
+            ms = (time.perf_counter() - t0) * 1000
+            if error is None:
+                out["ok"] += 1
+                out["latencies_ms"].append(ms)
+            elif "locked" in error:
+                out["lock_errors"] += 1
+            else:
+                out["errors"][error] = out["errors"].get(error, 0) + 1
+    connections.close_all()
+    return out
+
+
+def summarize(parts, duration: float) -> dict:
+    """Agrega los resultados de los workers por rol."""
+    out = {}
+    for role in ("read", "write"):
+        mine = [p for p in parts if p["role"] == role]
+        if not mine:
+            continue
+        lat = sorted(ms for p in mine for ms in p["latencies_ms"])
+        errors = {}
+        for p in mine:
+            for k, v in p["errors"].items():
+                errors[k] = errors.get(k, 0) + v
+        out[role] = {
+            "workers": len(mine),
+            "ok": len(lat),
+            "per_s": round(len(lat) / duration, 1),
+            "p50_ms": round(statistics.median(lat), 1) if lat else None,
+            "p95_ms": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))], 1) if lat else None,
+            "max_ms": round(lat[-1], 1) if lat else None,
+            "lock_errors": sum(p["lock_errors"] for p in mine),
+            "errors": errors,
+        }
+    return out
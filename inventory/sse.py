@@ -0,0 +1,186 @@
+# inventory/sse.py
+# Stream SSE de inventory/events/ (eventos del broker de events.py).
+#
+# Bajo ASGI, core/asgi.py enruta la ruta a `application` (antes de Django): Django
+# envuelve cada request en un ThreadSensitiveContext y sus middlewares pasan por
+# sync_to_async, así que cada stream abierto retendría un hilo. Aquí la auth JWT y la
+# búsqueda de la sede corren en el pool compartido y el resto en el event loop.
+# Con WSGI (runserver) la misma lógica la sirve views.events_stream.
+import asyncio
+import json
+from urllib.parse import unquote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, QueryDict
+from django.http.cookie import parse_cookie
+from rest_framework.exceptions import AuthenticationFailed
+
+from authapi.auth import CookieJWTAuthentication
+
+from .events import EVENT_TYPES, broker
+from .models import Store
+
+PATH = "/api/inventory/events/"
+HEARTBEAT = 15  # segundos entre comentarios "ping" (mantiene viva la conexión en proxies)
+
+
+def _authenticate(request):
+    try:
+        auth = CookieJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    user = auth[0] if auth else None
+    return user if user is not None and user.is_active else None
+
+
+def _store_id(code):
+    return Store.objects.filter(code=code).values_list("id", flat=True).first()
+
+
+async def open_subscription(request):
+    """
+    Valida auth y parámetros y suscribe al broker.
+    Devuelve (status, detail) si hay error o (None, (sub, replay, gap)).
+    """
+    if request.method != "GET":
+        return 405, "Método no permitido."
+
+    user = await sync_to_async(_authenticate, thread_sensitive=False)(request)
+    if user is None:
+        return 401, "No autenticado."
+
+    store_id = None
+    store_code = (request.GET.get("store") or "").strip()
+    if store_code:
+        store_id = await sync_to_async(_store_id, thread_sensitive=False)(store_code)
+        if store_id is None:
+            return 404, "Sede no encontrada."
+
+    types = [t.strip().lower() for t in (request.GET.get("types") or "").split(",") if t.strip()]
+    if any(t not in EVENT_TYPES for t in types):
+        return 400, f"types inválido. Usa: {', '.join(EVENT_TYPES)}"
+
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return 400, "Last-Event-ID inválido."
+
+    return None, broker.subscribe(store_id=store_id, types=types or None, last_event_id=last_id)
+
+
+def _ping(sub):
+    if sub.queue.empty():
+        sub.queue.put_nowait(None)  # None = heartbeat
+
+
+async def frames(sub, replay, gap):
+    """
+    Cuerpo del stream: retry, reset (si se perdieron eventos), replay y luego en vivo.
+    Los eventos acumulados se envían juntos en un solo chunk; el heartbeat es un timer
+    del loop (no una tarea por espera).
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        yield b"retry: 3000\n\n"
+        if gap:
+            yield b"event: reset\ndata: {}\n\n"
+        if replay:
+            yield b"".join(e.encode() for e in replay)
+        while True:
+            if sub.overflowed and sub.queue.empty():
+                break  # el broker lo cortó por lento: el cliente reconecta con su último id
+            timer = loop.call_later(HEARTBEAT, _ping, sub)
+            event = await sub.queue.get()
+            timer.cancel()
+            if event is None:
+                yield b": ping\n\n"
+                continue
+            chunk = [event.encode()]
+            while not sub.queue.empty():
+                event = sub.queue.get_nowait()
+                if event is not None:
+                    chunk.append(event.encode())
+            yield b"".join(chunk)
+    finally:
+        sub.close()
+
+
+def _request_from_scope(scope) -> HttpRequest:
+    request = HttpRequest()
+    request.method = scope["method"]
+    request.path = request.path_info = unquote(scope["path"])
+    request.GET = QueryDict(scope.get("query_string", b"").decode("latin-1"))
+    for name, value in scope.get("headers", ()):
+        key = name.decode("latin-1").upper().replace("-", "_")
+        request.META[key if key in ("CONTENT_TYPE", "CONTENT_LENGTH") else f"HTTP_{key}"] = value.decode("latin-1")
+    request.COOKIES = parse_cookie(request.META.get("HTTP_COOKIE", ""))
+    return request
+
+
+def _cors_headers(request) -> list:
+    origin = request.headers.get("Origin")
+    allowed = getattr(settings, "CORS_ALLOW_ALL_ORIGINS", False) or origin in getattr(settings, "CORS_ALLOWED_ORIGINS", ())
+    if not origin or not allowed:
+        return []
+    headers = [(b"access-control-allow-origin", origin.encode()), (b"vary", b"Origin")]
+    if getattr(settings, "CORS_ALLOW_CREDENTIALS", False):
+        headers.append((b"access-control-allow-credentials", b"true"))
+    return headers
+
+
+async def _send_json(send, status, detail, extra_headers):
+    body = json.dumps({"detail": detail}).encode()
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), *extra_headers]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def application(scope, receive, send):
+    """App ASGI del stream (solo scope http en PATH)."""
+    request = _request_from_scope(scope)
+    cors = _cors_headers(request)
+
+    # el cuerpo del GET (vacío) se consume antes de responder
+    message = await receive()
+    while message["type"] == "http.request" and message.get("more_body"):
+        message = await receive()
+    if message["type"] == "http.disconnect":
+        return
+
+    error, result = await open_subscription(request)
+    if error:
+        await _send_json(send, error, result, cors)
+        return
+
+    await send({"type": "http.response.start", "status": 200, "headers": [
+        (b"content-type", b"text/event-stream"),
+        (b"cache-control", b"no-cache"),
+        (b"x-accel-buffering", b"no"),
+        *cors,
+    ]})
+
+    stream = frames(*result)
+
+    async def pump():
+        async for chunk in stream:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    async def disconnected():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    tasks = [asyncio.ensure_future(pump()), asyncio.ensure_future(disconnected())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await stream.aclose()
+        result[0].close()
+    try:
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    except Exception:
+        pass  # el cliente ya cerró
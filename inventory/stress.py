@@ -0,0 +1,186 @@
+# inventory/stress.py
+# Arnés de concurrencia del camino de venta y stock (comando stress_oversell).
+#
+# Varios procesos × hilos disparan ventas (POST sales/), adjust_stock y set_stock por la
+# API real contra pocos SKUs "calientes" de una sede propia. Cada hilo lleva su libro de
+# operaciones exitosas; al final el comando verifica invariantes contra la BD.
+#
+# Los procesos se crean con "spawn" (también sirve en Windows): este módulo no importa
+# modelos al cargarse, process_main() inicializa Django en el proceso hijo.
+import random
+import sys
+import statistics
+import threading
+import time
+
+import django
+
+# excepción de la última request de cada hilo (got_request_exception se emite en el hilo
+# que atendió la request; el exc_info del test Client es global y mezcla hilos)
+_local = threading.local()
+
+LOCK_MARKERS = ("database is locked", "database table is locked", "deadlock", "could not serialize",
+                "lock timeout", "lock wait timeout")
+
+
+def _is_lock_error(exc) -> bool:
+    from django.db import OperationalError
+    return isinstance(exc, OperationalError) and any(m in str(exc).lower() for m in LOCK_MARKERS)
+
+
+def _record_exception(sender, request=None, **kwargs):
+    _local.exc = sys.exc_info()[1]
+
+
+def _new_stats() -> dict:
+    return {
+        "ops": {"sale": 0, "adjust": 0, "set": 0},
+        "ok": {"sale": 0, "adjust": 0, "set": 0},
+        "rejected": {"sale": 0, "adjust": 0, "set": 0},  # stock insuficiente (esperado)
+        "rejected_500": 0,  # de ellos, los que la API devolvió como 500 (ValidationError sin traducir)
+        "failed": {"sale": 0, "adjust": 0, "set": 0},    # reintentos agotados u otros errores
+        "retries": 0,
+        "lock_errors": 0,
+        "lock_wait_s": 0.0,  # tiempo perdido en intentos que fallaron por lock
+        "latencies_ms": [],
+        "errors": {},
+        "sold": {},       # product_id → unidades vendidas (ventas 201)
+        "adjusted": {},   # product_id → delta aplicado (adjust 200)
+        "sales": 0,
+    }
+
+
+def _merge(into: dict, part: dict) -> dict:
+    for key in ("ops", "ok", "rejected", "failed"):
+        for k, v in part[key].items():
+            into[key][k] += v
+    for key in ("retries", "lock_errors", "lock_wait_s", "sales", "rejected_500"):
+        into[key] += part[key]
+    into["latencies_ms"] += part["latencies_ms"]
+    for key in ("errors", "sold", "adjusted"):
+        for k, v in part[key].items():
+            into[key][k] = into[key].get(k, 0) + v
+    return into
+
+
+def _request(client, kind, cfg, rnd):
+    """(método del client, url, body, {product_id: efecto}) de una operación aleatoria."""
+    if kind == "sale":
+        skus = rnd.sample(cfg["ledger_skus"] + cfg["set_skus"], k=min(rnd.randint(1, 3), cfg["n_skus"]))
+        items = [{"product_id": pid, "quantity": rnd.randint(1, 3)} for pid in skus]
+        body = {"store": cfg["store_id"], "payment_method": "DIVISAS", "customer_name": "Stress",
+                "items": items}
+        return client.post, "/api/inventory/sales/", body, {i["product_id"]: i["quantity"] for i in items}
+    if kind == "adjust":
+        pid = rnd.choice(cfg["ledger_skus"] + cfg["set_skus"])
+        delta = rnd.choice((-3, -2, -1, -1, 1, 2, 4))
+        return client.post, f"/api/inventory/products/{pid}/adjust_stock/", \
+            {"store_id": cfg["store_id"], "delta": delta}, {pid: delta}
+    pid = rnd.choice(cfg["set_skus"])
+    return client.post, f"/api/inventory/products/{pid}/set_stock/", \
+        {"store_id": cfg["store_id"], "quantity": rnd.randint(0, 20)}, {}
+
+
+def _thread_main(cfg, seed, stats):
+    from django.contrib.auth import get_user_model
+    from django.core.exceptions import ValidationError
+    from django.db import connections
+    from rest_framework.test import APIClient
+
+    rnd = random.Random(seed)
+    client = APIClient()
+    client.raise_request_exception = False
+    client.force_authenticate(get_user_model().objects.get(pk=cfg["user_id"]))
+    kinds = ("sale", "adjust", "set") if cfg["set_skus"] else ("sale", "adjust")
+    weights = cfg["mix"][: len(kinds)]
+    try:
+        while time.time() < cfg["deadline"] and sum(stats["ops"].values()) < cfg["ops"]:
+            kind = rnd.choices(kinds, weights=weights)[0]
+            send, url, body, effect = _request(client, kind, cfg, rnd)
+            stats["ops"][kind] += 1
+            t_op = time.perf_counter()
+            for attempt in range(cfg["max_retries"] + 1):
+                t0 = time.perf_counter()
+                _local.exc = None
+                response = send(url, body, format="json")
+                error = _local.exc if response.status_code >= 500 else None
+                detail = f"{type(error).__name__}: {error}" if error else str(getattr(response, "data", ""))
+                if isinstance(error, ValidationError):  # adjust_stock dentro de la venta: stock insuficiente
+                    stats["rejected"][kind] += 1
+                    stats["rejected_500"] += 1
+                    break
+
+                # el lock puede llegar como excepción o como 400 (adjust_stock captura todo)
+                if _is_lock_error(error) or (
+                    response.status_code >= 400 and any(m in detail.lower() for m in LOCK_MARKERS)
+                ):
+                    stats["lock_errors"] += 1
+                    stats["lock_wait_s"] += time.perf_counter() - t0
+                    if attempt < cfg["max_retries"]:
+                        stats["retries"] += 1
+                        time.sleep(rnd.uniform(0, 0.005 * 2 ** attempt))  # backoff exponencial con jitter
+                        continue
+
+                if response.status_code in (200, 201):
+                    stats["ok"][kind] += 1
+                    if kind == "sale":
+                        stats["sales"] += 1
+                        for pid, qty in effect.items():
+                            stats["sold"][pid] = stats["sold"].get(pid, 0) + qty
+                    elif kind == "adjust":
+                        for pid, delta in effect.items():
+                            stats["adjusted"][pid] = stats["adjusted"].get(pid, 0) + delta
+                elif response.status_code == 400 and "insuficiente" in detail:
+                    stats["rejected"][kind] += 1
+                else:
+                    name = f"{kind}: {response.status_code}: {detail[:120]}"
+                    stats["errors"][name] = stats["errors"].get(name, 0) + 1
+                    stats["failed"][kind] += 1
+                break
+            stats["latencies_ms"].append((time.perf_counter() - t_op) * 1000)
+    finally:
+        connections.close_all()
+
+
+def process_main(cfg: dict, index: int) -> dict:
+    """Un proceso: cfg["threads"] hilos sobre los SKUs calientes. Devuelve stats agregadas."""
+    django.setup()  # idempotente si el proceso ya está inicializado
+    import logging
+
+    from django.conf import settings
+    from django.core.signals import got_request_exception
+    from django.test.utils import override_settings
+
+    got_request_exception.connect(_record_exception, dispatch_uid="inventory.stress")
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)  # los 400/500 esperados no van al log
+
+    parts = [_new_stats() for _ in range(cfg["threads"])]
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+        threads = [
+            threading.Thread(target=_thread_main, args=(cfg, cfg["seed"] * 1000 + index * 100 + i, parts[i]))
+            for i in range(cfg["threads"])
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    return merge(parts)
+
+
+def summarize(stats: dict) -> dict:
+    lat = sorted(stats["latencies_ms"])
+    if not lat:
+        return {"p50_ms": 0, "p95_ms": 0, "max_ms": 0}
+    return {
+        "p50_ms": round(statistics.median(lat), 1),
+        "p95_ms": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))], 1),
+        "max_ms": round(lat[-1], 1),
+    }
+
+
+def merge(parts) -> dict:
+    out = _new_stats()
+    for part in parts:
+        _merge(out, part)
+    return out
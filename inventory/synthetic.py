@@ -0,0 +1,264 @@
+# inventory/synthetic.py
+# Generador de un dataset grande y realista (comando seed_synthetic): sedes, categorías,
+# productos, stock, historial de tasas y ventas con sesgo configurable (SKUs calientes,
+# sedes con más movimiento, mezcla de formas de pago, estacionalidad semanal y horaria).
+#
+# A diferencia de bench.seed_sales, los datos quedan en la BD: se escriben con
+# bulk_create en transacciones por lote. Los signals no corren (bulk_create), así que al
+# final se reconstruyen los resúmenes, se recalculan los precios en Bs y se invalidan
+# los caches. Mismo seed + misma fecha final = mismos datos.
+import math
+import random
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .kpi_cache import bump
+from .models import Category, FxRate, Product, Sale, SaleItem, Stock, Store
+from .services import _bs_cents, rebuild_sales_rollup, reprice_catalog
+
+VAT_METHODS = ("PAGO_MOVIL", "PUNTO")  # IVA incluido en el precio (ver SaleSerializer)
+DEFAULT_PAYMENT_MIX = {"PAGO_MOVIL": 45, "PUNTO": 25, "DIVISAS": 22, "USDT": 8}
+
+# ventas relativas por día de la semana (lunes..domingo) y por hora de apertura (8..20)
+WEEKDAY_WEIGHTS = (0.8, 0.85, 0.9, 1.0, 1.3, 1.6, 0.7)
+HOUR_WEIGHTS = (0.3, 0.6, 0.9, 1.0, 1.2, 1.1, 0.8, 0.9, 1.0, 1.2, 1.1, 0.7, 0.4)
+
+_WORDS = (
+    "Harina", "Arroz", "Café", "Aceite", "Azúcar", "Pasta", "Leche", "Queso", "Jabón", "Detergente",
+    "Atún", "Sardina", "Galletas", "Jugo", "Refresco", "Agua", "Pan", "Mantequilla", "Salsa", "Avena",
+)
+_SIZES = ("250 g", "500 g", "1 kg", "2 kg", "1 L", "2 L", "355 ml", "pack x6", "x12", "familiar")
+
+
+def parse_mix(text: str) -> dict:
+    """'PAGO_MOVIL=45,PUNTO=25,...' → {método: peso}. Valida contra Sale.PAYMENT_METHODS."""
+    valid = {m for m, _ in Sale.PAYMENT_METHODS}
+    mix = {}
+    for part in (text or "").split(","):
+        if not part.strip():
+            continue
+        method, _, weight = part.partition("=")
+        method = method.strip().upper()
+        if method not in valid:
+            raise ValueError(f"forma de pago inválida: {method}. Usa: {', '.join(sorted(valid))}")
+        mix[method] = float(weight or 0)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("la mezcla de pagos necesita al menos un peso > 0")
+    return mix
+
+
+def _zipf_weights(n: int, skew: float) -> list:
+    return [1.0 / (rank + 1) ** skew for rank in range(n)]
+
+
+def _split(total: int, weights: list) -> list:
+    """Reparte `total` en enteros proporcionales a weights (resto a las mayores fracciones)."""
+    w_sum = sum(weights)
+    exact = [total * w / w_sum for w in weights]
+    out = [int(x) for x in exact]
+    by_fraction = sorted(range(len(weights)), key=lambda i: out[i] - exact[i])
+    for i in by_fraction[: total - sum(out)]:
+        out[i] += 1
+    return out
+
+
+def _cents(c: int) -> Decimal:
+    return Decimal(c).scaleb(-2)
+
+
+def generate(*, stores: int = 5, categories: int = 30, products: int = 5000, sales: int = 1_000_000,
+             lines_per_sale: float = 3.0, days: int = 730, end_date=None, sku_skew: float = 1.1,
+             store_skew: float = 0.8, payment_mix: dict = None, fx_start: float = 36.0,
+             fx_daily_drift: float = 0.0015, prefix: str = "syn", seed: int = 42,
+             batch: int = 10_000, rollup: bool = True, log=None) -> dict:
+    """
+    Genera el dataset y devuelve conteos por tabla. Cada lote de `batch` ventas
+    (con sus líneas) es una transacción; si se interrumpe, lo ya escrito queda.
+    """
+    log = log or (lambda msg: None)
+    rnd = random.Random(seed)
+    tz = timezone.get_current_timezone()
+    end_date = end_date or timezone.localdate()
+    start_date = end_date - timedelta(days=days - 1)
+    mix = payment_mix or DEFAULT_PAYMENT_MIX
+
+    if Store.objects.filter(code__startswith=f"{prefix}-").exists():
+        raise ValueError(f"ya hay sedes con prefijo '{prefix}-': usa otro --prefix")
+
+    # ---- Catálogo ----
+    with transaction.atomic():
+        user, _ = get_user_model().objects.get_or_create(username=f"{prefix}-seed", defaults={"is_active": False})
+
+        store_objs = Store.objects.bulk_create([
+            Store(name=f"Sede {prefix.upper()} {i + 1:02d}", code=f"{prefix}-{i + 1:02d}",
+                  address=f"Av. {rnd.choice(_WORDS)} {rnd.randint(1, 200)}")
+            for i in range(max(1, stores))
+        ])
+        cat_objs = Category.objects.bulk_create([
+            Category(name=f"{prefix.upper()} Categoría {i + 1:03d}", slug=f"{prefix}-cat-{i + 1:03d}")
+            for i in range(categories)
+        ])
+
+        # precios log-normales (mediana ~4.5 USD, cola larga), redondeados a centavos
+        price_cents = [max(25, int(round(math.exp(rnd.gauss(1.5, 0.9)) * 100))) for _ in range(products)]
+        product_objs = Product.objects.bulk_create(
+            [
+                Product(
+                    sku=f"{prefix.upper()}-{i + 1:07d}",
+                    name=f"{rnd.choice(_WORDS)} {rnd.choice(_WORDS).lower()} {rnd.choice(_SIZES)} #{i + 1}",
+                    price_usd=_cents(price_cents[i]),
+                )
+                for i in range(products)
+            ],
+            batch_size=1000,
+        )
+        if cat_objs:
+            Through = Product.categories.through
+            links = []
+            for p in product_objs:
+                for c in rnd.sample(cat_objs, k=min(len(cat_objs), rnd.choice((1, 1, 1, 2)))):
+                    links.append(Through(product_id=p.id, category_id=c.id))
+            Through.objects.bulk_create(links, batch_size=5000)
+    log(f"catálogo: {len(store_objs)} sedes, {len(cat_objs)} categorías, {len(product_objs)} productos")
+
+    # ---- Sesgos: popularidad de SKU (orden aleatorio) y de sede ----
+    ranks = list(range(products))
+    rnd.shuffle(ranks)
+    sku_w = _zipf_weights(products, sku_skew)
+    product_w = [sku_w[r] for r in ranks]
+    store_w = _zipf_weights(len(store_objs), store_skew)
+    product_ids = [p.id for p in product_objs]
+    total_pw = sum(product_w)
+    total_sw = sum(store_w)
+
+    # ---- Tasas: una por día, random walk con devaluación ----
+    fx_by_day = {}
+    fx = fx_start
+    day = start_date
+    while day <= end_date:
+        fx *= math.exp(rnd.gauss(fx_daily_drift, 0.004))
+        fx_by_day[day] = Decimal(f"{fx:.4f}")
+        day += timedelta(days=1)
+    with transaction.atomic():
+        FxRate.objects.bulk_create(
+            [FxRate(usd_to_bs=v, effective_date=d, created_by=user) for d, v in fx_by_day.items()],
+            batch_size=1000,
+        )
+    log(f"tasas: {len(fx_by_day)} días ({fx_start:.2f} → {fx:.2f})")
+
+    # ---- Stock: cobertura proporcional a la demanda esperada; algunos agotados ----
+    lines_total = sales * lines_per_sale
+    stock_rows = []
+    active = set()
+    for p, pw in zip(product_objs, product_w):
+        for s, sw in zip(store_objs, store_w):
+            daily = lines_total * 3 * (pw / total_pw) * (sw / total_sw) / days  # ~3 unidades por línea
+            qty = 0 if rnd.random() < 0.03 else int(daily * rnd.uniform(7, 45)) + rnd.randint(0, 5)
+            threshold = int(daily * rnd.uniform(3, 10)) if rnd.random() < 0.8 else 0
+            stock_rows.append(Stock(product=p, store=s, quantity=qty, min_threshold=threshold))
+            if qty:
+                active.add(p.id)
+    with transaction.atomic():
+        Stock.objects.bulk_create(stock_rows, batch_size=5000)
+        inactive = [pid for pid in product_ids if pid not in active]  # agotado en todas las sedes
+        for i in range(0, len(inactive), 500):
+            Product.objects.filter(id__in=inactive[i:i + 500]).update(is_active=False)
+    log(f"stock: {len(stock_rows)} filas")
+
+    # ---- Ventas (en orden cronológico: los ids crecen con created_at) ----
+    day_list = sorted(fx_by_day)
+    # tendencia de crecimiento (+50% en el período) × estacionalidad semanal × ruido diario
+    day_w = [
+        (1 + 0.5 * i / max(1, days - 1)) * WEEKDAY_WEIGHTS[d.weekday()] * rnd.uniform(0.8, 1.2)
+        for i, d in enumerate(day_list)
+    ]
+    per_day = _split(sales, day_w)
+
+    hours = list(range(8, 8 + len(HOUR_WEIGHTS)))
+    methods = list(mix)
+    method_w = [mix[m] for m in methods]
+    line_counts = list(range(1, 11))
+    # número de líneas ~ geométrica con media lines_per_sale
+    q = 1 - 1 / max(1.0, lines_per_sale)
+    line_w = [q ** (k - 1) for k in line_counts]
+    usd_dec = [_cents(c) for c in price_cents]
+    n_products = len(product_ids)
+
+    n_sales = n_items = 0
+    sale_objs, sale_items = [], []
+
+    def flush():
+        nonlocal n_sales, n_items, sale_objs, sale_items
+        with transaction.atomic():
+            Sale.objects.bulk_create(sale_objs, batch_size=2000)
+            SaleItem.objects.bulk_create(
+                [
+                    SaleItem(sale_id=sale.id, product_id=product_ids[i], quantity=qty,
+                             unit_price_usd=usd_dec[i], unit_price=_cents(bs))
+                    for sale, items in zip(sale_objs, sale_items)
+                    for i, qty, bs in items
+                ],
+                batch_size=5000,
+            )
+        n_sales += len(sale_objs)
+        n_items += sum(len(items) for items in sale_items)
+        sale_objs, sale_items = [], []
+        log(f"  ventas {n_sales}/{sales} ({n_items} líneas)")
+
+    for day, k in zip(day_list, per_day):
+        if not k:
+            continue
+        fx_day = fx_by_day[day]
+        fxu = int(fx_day * 10000)
+        bs_row = _bs_cents(price_cents, fx_day)  # precio en Bs de cada producto ese día
+        sale_stores = rnd.choices(store_objs, weights=store_w, k=k)
+        sale_methods = rnd.choices(methods, weights=method_w, k=k)
+        sale_lines = rnd.choices(line_counts, weights=line_w, k=k)
+        picks = rnd.choices(range(n_products), weights=product_w, k=sum(sale_lines))
+        times = sorted(
+            time(h, rnd.randrange(60), rnd.randrange(60))
+            for h in rnd.choices(hours, weights=HOUR_WEIGHTS, k=k)
+        )
+
+        pos = 0
+        for store, method, n_lines, at in zip(sale_stores, sale_methods, sale_lines, times):
+            lines = {}
+            for i in picks[pos:pos + n_lines]:
+                lines[i] = lines.get(i, 0) + rnd.choice((1, 1, 1, 2, 2, 3, 4, 6))
+            pos += n_lines
+
+            total = 0
+            items = []
+            for i, qty in lines.items():
+                total += bs_row[i] * qty
+                items.append((i, qty, bs_row[i]))
+            # IVA incluido: base = total / 1.16 (ROUND_HALF_UP), iva = total - base
+            base = (total * 10000 + 5800) // 11600 if method in VAT_METHODS else total
+            sale_objs.append(Sale(
+                store=store, created_by=user, created_at=datetime.combine(day, at, tz), payment_method=method,
+                payment_reference=f"{rnd.randrange(10**6):06d}" if method in VAT_METHODS else "",
+                customer_name=f"Cliente {rnd.randrange(50_000) + 1}",
+                customer_id_doc=f"V{rnd.randrange(4_000_000, 32_000_000)}",
+                fx_usd=fx_day, total=_cents(total), subtotal_bs=_cents(base), vat_bs=_cents(total - base),
+                total_usd=_cents((total * 10000 + fxu // 2) // fxu),
+            ))
+            sale_items.append(items)
+        if len(sale_objs) >= batch:
+            flush()
+    if sale_objs:
+        flush()
+
+    # ---- Derivados: precios en Bs, resúmenes y caches ----
+    reprice_catalog()
+    rollup_rows = rebuild_sales_rollup() if rollup else 0
+    bump("sales", "stock", "fx")
+
+    return {
+        "stores": len(store_objs), "categories": len(cat_objs), "products": len(product_objs),
+        "stocks": len(stock_rows), "fx_rates": len(fx_by_day), "sales": n_sales, "sale_items": n_items,
+        "rollup_rows": rollup_rows,
+    }
@@ -1,3 +1,742 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+
+try:
+    import numpy as np
+except ImportError:  # opcional, como en analytics: sin NumPy se saltan sus pruebas
+    np = None
+
+from . import archive, db_router, events, group_commit, kpi_cache, metrics, sharding, singleflight, sse
+from .analytics import compute_abc, compute_reorder_points, forecast_demand, pivot_sales
+from .models import (
+    AbcAnalysis, Category, FxRate, Product, ProductSalesDaily, ReorderSuggestion, Sale, SaleDailyRollup, SaleItem,
+    Stock, Store,
+)
+from .reports import sales_timeseries, stock_alert_counts, stock_alerts_queryset
+from .services import (
+    _bs_cents, _fx_history, get_current_fx, get_fx_as_of, price_bs_for, rebuild_sales_rollup, set_fx,
+)
+
+
+class SalesMixin:
+    """Sede, producto con stock y un cliente autenticado; las ventas van por la API."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_superuser("tester", password=None)
+        self.store = Store.objects.create(name="Centro", code="ctr")
+        self.product = Product.objects.create(sku="p-1", name="Producto 1", price_usd="2.50")
+        with sharding.store_scope(self.store.id):
+            Stock.objects.create(product=self.product, store=self.store, quantity=100)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sell(self, quantity=1, payment_method="DIVISAS", **extra):
+        data = {
+            "store": self.store.id, "payment_method": payment_method, "customer_name": "Cliente",
+            "items": [{"product_id": self.product.id, "quantity": quantity}], **extra,
+        }
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            return self.client.post("/api/inventory/sales/", data, format="json")
+
+    def get(self, path):
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            return self.client.get(path)
+
+
+class SalesTimeSeriesRollupTests(SalesMixin, TestCase):
+    def test_rollup_and_raw_branches_agree_on_aligned_range(self):
+        for qty in (1, 2, 3):
+            self.assertEqual(self.sell(qty).status_code, 201)
+        # dos ventas a días anteriores (resumen reconstruido) y dos de hoy (resumen incremental)
+        first, second = Sale.objects.order_by("id")[:2]
+        Sale.objects.filter(pk=first.pk).update(created_at=timezone.now() - timedelta(days=3))
+        Sale.objects.filter(pk=second.pk).update(created_at=timezone.now() - timedelta(days=40))
+        rebuild_sales_rollup()
+        self.assertEqual(self.sell(4, payment_method="PUNTO", customer_id_doc="V-1").status_code, 201)
+
+        today = timezone.localdate()
+        start = timezone.make_aware(datetime(today.year, today.month, 1)) - timedelta(days=62)
+        start = timezone.make_aware(datetime(start.year, start.month, 1))
+        end = timezone.make_aware(datetime.combine(today + timedelta(days=1), datetime.min.time()))
+
+        for bucket in ("day", "week", "month"):
+            with self.subTest(bucket=bucket):
+                rollup = sales_timeseries(start, end, bucket)
+                with mock.patch("inventory.reports.is_day_aligned", return_value=False):
+                    raw = sales_timeseries(start, end, bucket)
+                self.assertEqual(rollup, raw)
+                self.assertEqual(sum(rollup["count"]), 4)
+
+
+class SaleRollupSignalTests(SalesMixin, TestCase):
+    def rollup(self):
+        row = SaleDailyRollup.objects.get(store=self.store, day=timezone.localdate(), payment_method="DIVISAS")
+        per_product = ProductSalesDaily.objects.get(product=self.product, day=timezone.localdate())
+        return row.sales_count, row.total_usd, per_product.units, per_product.lines
+
+    def test_sale_create_increments_and_delete_decrements(self):
+        self.assertEqual(self.sell(3).status_code, 201)
+        self.assertEqual(self.sell(2).status_code, 201)
+        self.assertEqual(self.rollup(), (2, Decimal("12.50"), 5, 2))
+
+        Sale.objects.order_by("id").first().delete()
+        self.assertEqual(self.rollup(), (1, Decimal("5.00"), 2, 1))
+        Sale.objects.get().delete()
+        self.assertEqual(self.rollup(), (0, Decimal("0.00"), 0, 0))
+
+
+class BsCentsTests(TestCase):
+    # 0, un centavo, medios centavos exactos (redondeo hacia arriba) y montos grandes
+    USD_CENTS = [0, 1, 5, 99, 250, 12345, 999_999_99, 10 ** 12]
+    RATES = ["0.5", "0.0001", "36.5050", "382.1234", "1.23456"]  # la última va por el camino Decimal
+
+    def expected(self, fx):
+        return [int(price_bs_for(Decimal(c) / 100, fx) * 100) for c in self.USD_CENTS]
+
+    def test_matches_price_bs_for(self):
+        for rate in self.RATES:
+            fx = Decimal(rate)
+            with self.subTest(fx=rate):
+                self.assertEqual(_bs_cents(self.USD_CENTS, fx), self.expected(fx))
+
+    def test_matches_price_bs_for_without_numpy(self):
+        with mock.patch("inventory.services.np", None):
+            for rate in self.RATES:
+                fx = Decimal(rate)
+                with self.subTest(fx=rate):
+                    self.assertEqual(_bs_cents(self.USD_CENTS, fx), self.expected(fx))
+
+
+class KpiCacheInvalidationTests(SalesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_sale_invalidates_cached_stats(self):
+        first = self.get("/api/inventory/stats/")
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(self.get("/api/inventory/stats/")["X-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.sell(2).status_code, 201)
+
+        after = self.get("/api/inventory/stats/")
+        self.assertEqual(after["X-Cache"], "MISS")
+        self.assertEqual(after.data["sales_last_30d"]["count"], first.data["sales_last_30d"]["count"] + 1)
+
+
+class GroupCommitTests(TestCase):
+    def test_failed_job_rolls_back_alone(self):
+        def create(code):
+            return lambda: Store.objects.create(name=code, code=code).code
+
+        def fail():
+            Store.objects.create(name="gc-x", code="gc-x")
+            raise ValueError("falla")
+
+        jobs = [group_commit._Job(fn) for fn in (create("gc-1"), fail, create("gc-2"))]
+        for job in jobs:
+            self.assertTrue(job.start())
+        group_commit.Writer()._commit_group(None, jobs)
+
+        self.assertEqual([job.result for job in jobs], ["gc-1", None, "gc-2"])
+        self.assertIsInstance(jobs[1].error, ValueError)
+        self.assertIsNone(jobs[0].error)
+        self.assertTrue(all(job.state == "done" and job.event.is_set() for job in jobs))
+        self.assertEqual(set(Store.objects.filter(code__startswith="gc-").values_list("code", flat=True)), {"gc-1", "gc-2"})
+
+
+class _SlowKpiView:
+    """Vista mínima: el primer cálculo se bloquea hasta `gate` para simular un reporte lento."""
+
+    def __init__(self):
+        self.value = 1
+        self.calls = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    @kpi_cache.cached_kpi("sales")
+    @singleflight.single_flight
+    def get(self, request):
+        value = self.value
+        self.calls.append(value)
+        if len(self.calls) == 1:
+            self.started.set()
+            self.gate.wait(5)
+        return Response({"value": value})
+
+
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.view = _SlowKpiView()
+
+    def request(self):
+        return Request(APIRequestFactory().get("/kpi/"))
+
+    def in_thread(self, results):
+        thread = threading.Thread(target=lambda: results.append(self.view.get(self.request())))
+        thread.start()
+        return thread
+
+    def test_concurrent_requests_share_one_computation(self):
+        results = []
+        threads = [self.in_thread(results)]
+        self.view.started.wait(5)
+        threads += [self.in_thread(results) for _ in range(2)]
+        # liberar al líder cuando los otros dos ya esperan su resultado
+        for _ in range(500):
+            if any(call.waiters == 2 for call in list(singleflight._calls.values())):
+                break
+            threading.Event().wait(0.01)
+        self.view.gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(self.view.calls, [1])
+        self.assertEqual([r.data for r in results], [{"value": 1}] * 3)
+        self.assertEqual(sorted(r.get("X-Coalesced", "") for r in results), ["", "local", "local"])
+
+    def test_request_after_bump_does_not_join_stale_computation(self):
+        first, second = [], []
+        slow = self.in_thread(first)
+        self.view.started.wait(5)
+        # una venta confirma mientras el cálculo anterior sigue en curso
+        self.view.value = 2
+        kpi_cache.bump("sales")
+        fresh = self.in_thread(second)
+        fresh.join(2)
+        self.assertFalse(fresh.is_alive(), "la petición nueva esperó al cálculo de la generación anterior")
+        self.view.gate.set()
+        slow.join(5)
+
+        self.assertEqual(first[0].data, {"value": 1})
+        self.assertEqual(second[0].data, {"value": 2})
+        again = self.view.get(self.request())
+        self.assertEqual((again["X-Cache"], again.data), ("HIT", {"value": 2}))
+
+
+class _CountingKpiView:
+    def __init__(self):
+        self.calls = 0
+
+    @kpi_cache.cached_kpi("sales")
+    def get(self, request):
+        self.calls += 1
+        return Response({"calls": self.calls})
+
+
+class ReplicaKpiCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.view = _CountingKpiView()
+        token = db_router._use_replica.set(True)
+        self.addCleanup(db_router._use_replica.reset, token)
+
+    def get(self, snapshot):
+        with mock.patch("inventory.db_router._refreshed_at", return_value=snapshot):
+            return self.view.get(Request(APIRequestFactory().get("/kpi/")))
+
+    def test_replica_responses_are_keyed_by_snapshot(self):
+        self.assertEqual(self.get(1000.0)["X-Cache"], "MISS")
+        kpi_cache.bump("sales")  # venta en el primario: el snapshot todavía no la tiene
+        self.assertEqual(self.get(1000.0).data, {"calls": 2})
+        self.assertEqual(self.get(1000.0)["X-Cache"], "HIT")
+        # nuevo snapshot sin bump (refresh_replica en otro proceso, cache por proceso)
+        fresh = self.get(2000.0)
+        self.assertEqual((fresh["X-Cache"], fresh.data), ("MISS", {"calls": 3}))
+
+
+@override_settings(FX_USD_TO_BS=Decimal("100"))
+class FxHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _fx_history.invalidate()
+        self.user = get_user_model().objects.create_user("fx", password=None)
+        self.today = timezone.localdate()
+        for days_ago, rate in ((10, "200.0000"), (5, "300.0000")):
+            FxRate.objects.create(usd_to_bs=rate, effective_date=self.today - timedelta(days=days_ago), created_by=self.user)
+
+    def test_as_of_boundaries(self):
+        cases = [
+            (11, Decimal("100")),  # antes del primer registro: settings.FX_USD_TO_BS
+            (10, Decimal("200")),  # exactamente en el cambio
+            (6, Decimal("200")),
+            (5, Decimal("300")),
+            (0, Decimal("300")),
+        ]
+        for days_ago, rate in cases:
+            with self.subTest(days_ago=days_ago):
+                self.assertEqual(get_fx_as_of(self.today - timedelta(days=days_ago)), rate)
+
+    def test_set_fx_invalidates_history(self):
+        self.assertEqual(get_current_fx(), Decimal("300"))
+        with self.captureOnCommitCallbacks(execute=True):
+            set_fx(Decimal("400"), user=self.user)
+        self.assertEqual(get_current_fx(), Decimal("400"))
+        self.assertEqual(get_fx_as_of(self.today - timedelta(days=1)), Decimal("300"))
+
+    def test_ttl_bounds_staleness_without_shared_cache(self):
+        self.assertEqual(get_current_fx(), Decimal("300"))
+        # tasa publicada por otro worker: su bump no llega a este proceso (LocMem)
+        with mock.patch("inventory.services.generations", return_value=(1,)):
+            _fx_history.invalidate()
+            get_current_fx()
+            FxRate.objects.create(usd_to_bs="500.0000", effective_date=self.today, created_by=self.user)
+            self.assertEqual(get_current_fx(), Decimal("300"))
+            with override_settings(FX_HISTORY_TTL=0):
+                self.assertEqual(get_current_fx(), Decimal("500"))
+
+
+class ArchiveSalesTests(SalesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_archived_sale_is_still_found(self):
+        self.assertEqual(self.sell(3).status_code, 201)
+        sale = Sale.objects.get()
+        day = timezone.now() - timedelta(days=400)
+        Sale.objects.filter(pk=sale.pk).update(created_at=day)
+
+        before = kpi_cache.generations(("sales",))
+        with self.captureOnCommitCallbacks(execute=True):
+            moved = archive.archive_sales(timezone.now() - timedelta(days=30))
+        self.assertEqual((moved["sales"], moved["items"]), (1, 1))
+        self.assertNotEqual(kpi_cache.generations(("sales",)), before)
+
+        self.assertFalse(Sale.objects.exists())
+        self.assertEqual(archive.get_archived_sale(sale.pk).total, sale.total)
+        self.assertEqual(self.get(f"/api/inventory/sales/{sale.pk}/").data["id"], sale.pk)
+        invoice = self.get(f"/api/inventory/sales/{sale.pk}/invoice/")
+        self.assertEqual((invoice.status_code, invoice["Content-Type"]), (200, "application/pdf"))
+
+        rebuild_sales_rollup()
+        row = SaleDailyRollup.objects.get(day=timezone.localtime(day).date())
+        self.assertEqual((row.sales_count, row.total), (1, sale.total))
+        self.assertEqual(ProductSalesDaily.objects.get(day=row.day).units, 3)
+
+    def test_batch_size_is_capped(self):
+        for _ in range(3):
+            self.assertEqual(self.sell().status_code, 201)
+        with mock.patch("inventory.archive.MAX_BATCH", 2):
+            moved = archive.archive_sales(timezone.now() + timedelta(days=1), batch_size=10_000)
+        self.assertEqual((moved["sales"], moved["batches"]), (3, 2))
+
+
+@override_settings(SHARD_COUNT=2)
+class ShardRoutingTests(SimpleTestCase):
+    def test_router_sends_sales_to_scope_instance_or_store_shard(self):
+        router = sharding.ShardRouter()
+        self.assertIsNone(router.db_for_read(Sale))
+        self.assertEqual(router.db_for_read(Store), DEFAULT_DB_ALIAS)
+        with sharding.using_shard("shard_1"):
+            self.assertEqual(router.db_for_read(Stock), "shard_1")
+            self.assertEqual(router.db_for_write(Product), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_write(Sale, instance=Sale(store_id=3)), "shard_1")
+        loaded = Sale(store_id=3)
+        loaded._state.db = "shard_0"
+        self.assertEqual(router.db_for_read(Sale, instance=loaded), "shard_0")
+
+    def test_shard_for_sale_reads_the_id_block(self):
+        block = sharding.SALE_ID_BLOCK
+        self.assertEqual(sharding.shard_for_sale(block + 1), "shard_0")
+        self.assertEqual(sharding.shard_for_sale(str(2 * block + 7)), "shard_1")
+        for pk in (1, 3 * block + 1, "abc", None):
+            with self.subTest(pk=pk):
+                self.assertIsNone(sharding.shard_for_sale(pk))
+
+    def test_store_atomic_opens_the_store_shard(self):
+        with mock.patch("inventory.sharding.transaction.atomic") as atomic:
+            with sharding.store_atomic(5):
+                self.assertEqual(sharding.current(), "shard_1")
+        atomic.assert_called_once_with(using="shard_1")
+        self.assertIsNone(sharding.current())
+
+
+class ShardedUnavailableViewsTests(TestCase):
+    def test_alerts_and_pivot_refuse(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_superuser("tester", password=None))
+        for path in ("/api/inventory/kpis/stock/alerts/", "/api/inventory/reports/pivot/"):
+            with self.subTest(path=path), self.settings(SHARD_COUNT=2, ALLOWED_HOSTS=["testserver"]):
+                self.assertEqual(client.get(path).status_code, 501)
+
+
+@skipUnless(getattr(settings, "SHARD_COUNT", 0) == 2, "correr con SHARD_COUNT=2")
+class ShardedSalesTests(SalesMixin, TransactionTestCase):
+    """Ventas por la API con dos shards reales: SHARD_COUNT=2 python manage.py test inventory.tests.ShardedSalesTests"""
+
+    databases = "__all__"
+
+    def setUp(self):
+        # lo que hace migrate_shards: cada shard numera sus ventas desde (n + 1) · SALE_ID_BLOCK.
+        # La BD de prueba en memoria conserva la conexión del migrate, que deja foreign_keys=ON.
+        for i, alias in enumerate(sharding.shard_aliases()):
+            with connections[alias].cursor() as cur:
+                cur.execute("PRAGMA foreign_keys=OFF")
+                cur.execute("DELETE FROM sqlite_sequence WHERE name = %s", [Sale._meta.db_table])
+                cur.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)",
+                            [Sale._meta.db_table, (i + 1) * sharding.SALE_ID_BLOCK])
+        super().setUp()
+        self.other = Store.objects.create(name="Norte", code="nte")  # el otro shard
+        with sharding.store_scope(self.other.id):
+            Stock.objects.create(product=self.product, store=self.other, quantity=100)
+
+    def test_sales_live_in_their_shard_and_list_merges_by_date(self):
+        ids = []
+        for store in (self.store, self.other, self.store):
+            response = self.sell(store=store.id)
+            self.assertEqual(response.status_code, 201, response.data)
+            ids.append(response.data["id"])
+
+        self.assertFalse(Sale.objects.using(DEFAULT_DB_ALIAS).exists())
+        self.assertEqual([sharding.shard_for_sale(pk) for pk in ids],
+                         [sharding.shard_for_store(s.id) for s in (self.store, self.other, self.store)])
+        for pk in ids:
+            self.assertEqual(self.get(f"/api/inventory/sales/{pk}/").data["id"], pk)
+        listed = self.get("/api/inventory/sales/").data
+        self.assertEqual([row["id"] for row in listed], ids[::-1])
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"], METRICS_ENABLED=True, METRICS_TOKEN="")
+class MetricsViewTests(TestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create_user("staff", password=None, is_staff=True)
+        self.clerk = get_user_model().objects.create_user("clerk", password=None)
+
+    def test_disabled_is_404(self):
+        self.client.force_login(self.staff)
+        with self.settings(METRICS_ENABLED=False):
+            self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+    def test_without_token_only_staff(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.client.force_login(self.clerk)
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    def test_token_is_required_when_set(self):
+        with self.settings(METRICS_TOKEN="s3cret"):
+            self.client.force_login(self.staff)  # con token la sesión no basta
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer otro").status_code, 403)
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret").status_code, 200)
+
+    def test_route_counters(self):
+        middleware = metrics.MetricsMiddleware(lambda request: HttpResponse("abc", status=201))
+        for _ in range(2):
+            request = RequestFactory().post("/x")
+            request.resolver_match = mock.Mock(view_name="metrics-test")
+            middleware(request)
+
+        lines = metrics.render().splitlines()
+        lab = 'route="metrics-test",method="POST"'
+        self.assertIn(f"tienda_http_request_duration_seconds_count{{{lab}}} 2", lines)
+        self.assertIn(f'tienda_http_request_duration_seconds_bucket{{{lab},le="+Inf"}} 2', lines)
+        self.assertIn(f"tienda_http_response_bytes_total{{{lab}}} 6", lines)
+        self.assertIn(f'tienda_http_responses_total{{{lab},status="2xx"}} 2', lines)
+        self.assertTrue(any(line.startswith('tienda_cache_requests_total{cache="kpi",result="hit"}') for line in lines))
+
+
+class StockAlertsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.centro = Store.objects.create(name="Centro", code="ctr")
+        self.norte = Store.objects.create(name="Norte", code="nte")
+        self.products = {}
+        # sku: {sede: (cantidad, umbral mínimo)}
+        for sku, stocks in {
+            "a-low": {self.centro: (3, 0)},                       # 3 <= 5 (umbral por defecto)
+            "b-low": {self.centro: (8, 10)},                      # 8 <= 10 (umbral del stock)
+            "c-low": {self.centro: (5, 0)},                       # justo en el umbral
+            "d-ok": {self.centro: (6, 0)},
+            "e-ok": {self.centro: (2, 0), self.norte: (40, 0)},   # bajo solo en Centro
+            "f-out": {},                                          # activo y sin stock
+            "g-inactive": {self.centro: (20, 0)},
+        }.items():
+            product = self.products[sku] = Product.objects.create(sku=sku, name=sku, price_usd="1.00")
+            for store, (quantity, threshold) in stocks.items():
+                Stock.objects.create(product=product, store=store, quantity=quantity, min_threshold=threshold)
+        Product.objects.filter(sku="g-inactive").update(is_active=False)
+
+    def classes(self, **kwargs):
+        return dict(stock_alerts_queryset(**kwargs).values_list("sku", "alert"))
+
+    def test_classification_and_counts(self):
+        self.assertEqual(self.classes(), {
+            "a-low": "low", "b-low": "low", "c-low": "low", "d-ok": "", "e-ok": "",
+            "f-out": "out", "g-inactive": "inactive",
+        })
+        self.assertEqual(stock_alert_counts(stock_alerts_queryset()), {"low": 3, "out": 1, "inactive": 1})
+        # con sede solo cuentan sus stocks; sin stocks en la sede el producto no aparece
+        self.assertEqual(self.classes(store_code="ctr")["e-ok"], "low")
+        self.assertNotIn("f-out", self.classes(store_code="ctr"))
+        self.assertEqual(self.classes(fallback_threshold=2)["a-low"], "")
+
+    def test_view_pages(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_superuser("tester", password=None))
+        pages = []
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for page in (1, 2, 3):
+                response = client.get(f"/api/inventory/kpis/stock/alerts/?category=low&page_size=2&page={page}")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data["counts"], {"low": 3, "out": 1, "inactive": 1})
+                self.assertEqual(response.data["out_of_stock"], [])  # solo la categoría pedida
+                pages.append([r["sku"] for r in response.data["low_stock"]])
+        self.assertEqual(pages, [["a-low", "b-low"], ["c-low"], []])
+        self.assertEqual(response.data["page"], 3)
+
+
+class BrokerTests(SimpleTestCase):
+    def publish(self, broker, n):
+        return [broker.publish("stock", {"n": i}, store_id=i % 2) for i in range(n)]
+
+    def test_replay_from_mid_stream_id(self):
+        broker = events.Broker(buffer_size=16)
+        published = self.publish(broker, 10)
+
+        async def resume():
+            sub, replay, gap = broker.subscribe(last_event_id=published[4].id)
+            only_store, store_replay, _ = broker.subscribe(store_id=1, last_event_id=published[4].id)
+            sub.close()
+            only_store.close()
+            return replay, gap, store_replay
+
+        replay, gap, store_replay = asyncio.run(resume())
+        self.assertEqual([e.id for e in replay], [e.id for e in published[5:]])
+        self.assertFalse(gap)
+        self.assertEqual([json.loads(e.data)["n"] for e in store_replay], [5, 7, 9])
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    def test_buffer_overflow_reports_gap(self):
+        broker = events.Broker(buffer_size=4)
+        published = self.publish(broker, 10)
+
+        async def resume(last_event_id):
+            sub, replay, gap = broker.subscribe(last_event_id=last_event_id)
+            sub.close()
+            return [e.id for e in replay], gap
+
+        # el id 2 ya salió del buffer: se reanuda desde lo que queda y se avisa el hueco
+        self.assertEqual(asyncio.run(resume(published[2].id)), ([e.id for e in published[6:]], True))
+        # el anterior al primero del buffer: no se perdió nada
+        self.assertEqual(asyncio.run(resume(published[5].id)), ([e.id for e in published[6:]], False))
+
+    def test_slow_client_is_dropped_after_queue_overflow(self):
+        broker = events.Broker()
+
+        async def slow_client():
+            with mock.patch("inventory.events.QUEUE_SIZE", 2):
+                sub, replay, gap = broker.subscribe()
+            self.publish(broker, 3)
+            await asyncio.sleep(0)  # entrega (call_soon_threadsafe)
+            chunks = [chunk async for chunk in sse.frames(sub, replay, gap)]
+            return sub, chunks
+
+        sub, chunks = asyncio.run(slow_client())
+        self.assertTrue(sub.overflowed)
+        self.assertEqual(broker.subscriber_count(), 0)
+        # lo encolado antes del corte se entrega y el stream termina
+        self.assertEqual(chunks[0], b"retry: 3000\n\n")
+        self.assertEqual(b"".join(chunks[1:]).count(b"event: stock"), 2)
+
+
+class AsgiRoutingTests(SimpleTestCase):
+    def call(self, path):
+        from core import asgi
+
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []}
+        with mock.patch.object(asgi, "django_application", mock.AsyncMock()) as django_app:
+            asyncio.run(asgi.application(scope, receive, send))
+        return sent, django_app
+
+    def test_events_path_skips_django(self):
+        sent, django_app = self.call(sse.PATH)
+        django_app.assert_not_called()
+        self.assertEqual(sent[0]["status"], 401)  # sin cookie JWT
+
+    def test_other_paths_go_to_django(self):
+        sent, django_app = self.call("/api/inventory/products/")
+        django_app.assert_awaited_once()
+        self.assertEqual(sent, [])
+
+
+class AnalyticsFixtureMixin:
+    """Dos sedes, dos categorías y ventas creadas por el ORM en fechas fijas."""
+
+    NOW = timezone.make_aware(datetime(2026, 3, 15, 12))
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user("analista", password=None)
+        self.ctr = Store.objects.create(name="Centro", code="ctr")
+        self.nte = Store.objects.create(name="Norte", code="nte")
+        self.bebidas = Category.objects.create(name="Bebidas", slug="bebidas")
+        self.snacks = Category.objects.create(name="Snacks", slug="snacks")
+
+    def product(self, sku, *categories):
+        product = Product.objects.create(sku=sku, name=sku, price_usd="1.00")
+        product.categories.set(categories)
+        return product
+
+    def sale(self, store, created_at, *lines, payment_method="DIVISAS"):
+        """lines: (producto, cantidad, precio Bs, precio USD)."""
+        sale = Sale.objects.create(store=store, created_by=self.user, created_at=created_at, payment_method=payment_method)
+        SaleItem.objects.bulk_create([
+            SaleItem(sale=sale, product=product, quantity=qty, unit_price=Decimal(bs), unit_price_usd=Decimal(usd))
+            for product, qty, bs, usd in lines
+        ])
+        return sale
+
+
+@skipUnless(np is not None, "requiere NumPy")
+class PivotSalesTests(AnalyticsFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        agua = self.product("agua", self.bebidas)
+        combo = self.product("combo", self.bebidas, self.snacks)  # cuenta en ambas categorías
+        self.sale(self.ctr, self.NOW, (agua, 2, "10.00", "1.00"), (combo, 1, "5.50", "0.55"))
+        self.sale(self.nte, self.NOW, (agua, 3, "10.00", "1.00"), payment_method="PUNTO")
+        self.sale(self.ctr, self.NOW - timedelta(days=31), (combo, 4, "5.50", "0.55"), payment_method="PUNTO")
+        self.range = (timezone.make_aware(datetime(2026, 1, 1)), timezone.make_aware(datetime(2026, 4, 1)))
+
+    def test_store_by_payment_method_cells(self):
+        out = pivot_sales(*self.range, dims=["store", "payment_method"])
+        self.assertEqual(out["lines_scanned"], 4)
+        self.assertEqual(
+            {k: out[k] for k in ("store", "payment_method", "lines", "units", "revenue_bs", "revenue_usd")},
+            {
+                "store": ["ctr", "ctr", "nte"],
+                "payment_method": ["DIVISAS", "PUNTO", "PUNTO"],
+                "lines": [2, 1, 1],
+                "units": [3, 4, 3],
+                "revenue_bs": [25.5, 22.0, 30.0],
+                "revenue_usd": [2.55, 2.2, 3.0],
+            },
+        )
+
+    def test_category_by_month_cells(self):
+        out = pivot_sales(*self.range, dims=["category", "period"], bucket="month")
+        cells = {(c, p): (n, u) for c, p, n, u in zip(out["category"], out["period"], out["lines"], out["units"])}
+        self.assertEqual(cells, {
+            ("bebidas", "2026-02-01"): (1, 4),
+            ("bebidas", "2026-03-01"): (3, 6),
+            ("snacks", "2026-02-01"): (1, 4),
+            ("snacks", "2026-03-01"): (1, 1),
+        })
+
+    def test_filters_and_totals(self):
+        out = pivot_sales(*self.range, dims=[], store_code="nte")
+        self.assertEqual((out["lines"], out["units"], out["revenue_bs"]), ([1], [3], [30.0]))
+        with self.assertRaises(ValueError):
+            pivot_sales(*self.range, dims=["store", "store"])
+
+
+@skipUnless(np is not None, "requiere NumPy")
+class ReorderPointTests(AnalyticsFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.steady = self.product("estable")
+        self.spiky = self.product("pico")
+        for product, store, quantity, threshold in (
+            (self.steady, self.ctr, 20, 0), (self.spiky, self.ctr, 30, 0), (self.steady, self.nte, 15, 9),
+        ):
+            Stock.objects.create(product=product, store=store, quantity=quantity, min_threshold=threshold)
+        # 10 días: "estable" vende 2 por día en Centro, "pico" 10 en un solo día; Norte no vende
+        for days_ago in range(10):
+            self.sale(self.ctr, self.NOW - timedelta(days=days_ago), (self.steady, 2, "10.00", "1.00"))
+        self.sale(self.ctr, self.NOW - timedelta(days=5), (self.spiky, 10, "10.00", "1.00"))
+
+    def test_forecast_methods(self):
+        demand = np.array([[0.0, 0.0, 0.0, 10.0], [2.0, 2.0, 2.0, 2.0]])
+        forecast, avg, std = forecast_demand(demand, method="ses", alpha=0.3, window=4)
+        self.assertEqual(forecast.round(6).tolist(), [3.0, 2.0])
+        self.assertEqual(avg.tolist(), [2.5, 2.0])
+        self.assertEqual(std.round(6).tolist(), [round(75 ** 0.5 / 2, 6), 0.0])
+        forecast, _, _ = forecast_demand(demand, method="sma", window=2)
+        self.assertEqual(forecast.tolist(), [5.0, 2.0])
+
+    def test_reorder_points_and_apply(self):
+        result = compute_reorder_points(days=10, method="sma", window=10, lead_time_days=2, service_z=1,
+                                        apply=True, now=self.NOW)
+        self.assertEqual((result["pairs"], result["applied"]), (3, 2))
+
+        rows = {
+            (r.product.sku, r.store.code): r
+            for r in ReorderSuggestion.objects.select_related("product", "store")
+        }
+        steady = rows["estable", "ctr"]
+        # σ = 0: umbral = ⌈2 · 2⌉, cobertura = 20 / 2
+        self.assertEqual((steady.forecast_daily, steady.safety_stock, steady.suggested_threshold),
+                         (Decimal("2.000"), 0, 4))
+        self.assertEqual(steady.days_of_cover, Decimal("10.0"))
+        spiky = rows["pico", "ctr"]
+        # media 1, σ = 3: seguridad = ⌈3 · √2⌉ = 5, umbral = ⌈1 · 2 + 5⌉
+        self.assertEqual((spiky.demand_std, spiky.safety_stock, spiky.suggested_threshold), (Decimal("3.000"), 5, 7))
+        idle = rows["estable", "nte"]
+        self.assertEqual((idle.suggested_threshold, idle.days_of_cover), (0, None))
+
+        self.assertEqual(
+            sorted(Stock.objects.values_list("product__sku", "store__code", "min_threshold")),
+            [("estable", "ctr", 4), ("estable", "nte", 9), ("pico", "ctr", 7)],  # sin demanda: umbral manual
+        )
+
+
+@skipUnless(np is not None, "requiere NumPy")
+class AbcAnalysisTests(AnalyticsFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # Centro: ingresos 70 / 20 / 8 / 2 / 0 (precio 1 Bs: unidades = ingreso); Norte: un solo producto
+        for sku, units in (("p70", 70), ("p20", 20), ("p08", 8), ("p02", 2), ("p00", 0)):
+            product = self.product(sku)
+            Stock.objects.create(product=product, store=self.ctr, quantity=35)
+            if units:
+                self.sale(self.ctr, self.NOW - timedelta(days=1), (product, units, "1.00", "0.10"))
+        lone = self.product("solo")
+        Stock.objects.create(product=lone, store=self.nte, quantity=5)
+        self.sale(self.nte, self.NOW, (lone, 1, "1.00", "0.10"))
+
+    def test_classes_share_and_turnover(self):
+        result = compute_abc(days=30, a_cut=0.8, b_cut=0.95, now=self.NOW)
+        self.assertEqual(result["counts"], {"A": 3, "B": 1, "C": 2})
+
+        rows = {(r.product.sku, r.store.code): r for r in AbcAnalysis.objects.select_related("product", "store")}
+        # acumulado previo: 0 → A, 0.70 → A (< 0.80), 0.90 → B (< 0.95), 0.98 → C; sin ventas → C
+        self.assertEqual(
+            {key: (r.abc_revenue, r.abc_units) for key, r in rows.items()},
+            {("p70", "ctr"): ("A", "A"), ("p20", "ctr"): ("A", "A"), ("p08", "ctr"): ("B", "B"),
+             ("p02", "ctr"): ("C", "C"), ("p00", "ctr"): ("C", "C"), ("solo", "nte"): ("A", "A")},
+        )
+        top = rows["p70", "ctr"]
+        self.assertEqual((top.revenue, top.revenue_usd, top.revenue_share),
+                         (Decimal("70.00"), Decimal("7.00"), Decimal("0.7000")))
+        # inventario promedio 35 + 70 / 2 = 70 → rotación 1 · 365 / 30; 35 / (70 / 30) días de inventario
+        self.assertEqual((top.turnover, top.days_on_hand), (Decimal("12.17"), Decimal("15.0")))
+        self.assertIsNone(rows["p00", "ctr"].days_on_hand)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import StoreViewSet, CategoryViewSet, ProductViewSet, SaleViewSet, FxView, StatsView, TopSellingProductsView, StockAlertsView
+from .views import StoreViewSet, CategoryViewSet, ProductViewSet, SaleViewSet, FxView, StatsView, TopSellingProductsView, StockAlertsView, SalesTimeSeriesView, SalesPivotView, ReorderSuggestionsView, AbcAnalysisView, events_stream, ProfilesView, profile_download
 
 router = DefaultRouter()
 router.register(r"stores", StoreViewSet)
@@ -14,4 +14,11 @@ urlpatterns = [
     path("stats/", StatsView.as_view(), name="stats"),
     path("kpis/sales/top-products/", TopSellingProductsView.as_view(), name="kpis_sales_top_products"),
     path("kpis/stock/alerts/", StockAlertsView.as_view(), name="kpis_stock_alerts"),
+    path("kpis/stock/reorder/", ReorderSuggestionsView.as_view(), name="kpis_stock_reorder"),
+    path("kpis/stock/abc/", AbcAnalysisView.as_view(), name="kpis_stock_abc"),
+    path("kpis/sales/timeseries/", SalesTimeSeriesView.as_view(), name="kpis_sales_timeseries"),
+    path("events/", events_stream, name="events_stream"),
+    path("reports/pivot/", SalesPivotView.as_view(), name="reports_pivot"),
+    path("profiles/", ProfilesView.as_view(), name="profiles"),
+    path("profiles/<str:name>/", profile_download, name="profile_download"),
 ]   
@@ -1,13 +1,14 @@
 # Python stdlib
+import heapq
 import os
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 # Django
 from django.conf import settings
-from django.db.models import Count, Max, Sum
+from django.db.models import Count, F, Max, Q, Sum
 from django.db.models.functions import Coalesce
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
@@ -20,9 +21,22 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 # App
+from . import archive, group_commit, profiler, sharding
+from .analytics import PIVOT_DIMS, AnalyticsUnavailable, pivot_sales
+from .db_router import replica_reads
 from .filters import ProductFilter
-from .models import Category, Product, Sale, SaleItem, Stock, Store
+from .kpi_cache import cached_kpi
+from .models import AbcAnalysis, Category, Product, ReorderSuggestion, Sale, SaleDailyRollup, SaleItem, Stock, Store
 from .pdf import render_sale_pdf
+from .reports import (
+    ALERT_KINDS,
+    sales_timeseries,
+    stock_alert_counts,
+    stats_totals_sharded,
+    stock_alerts_queryset,
+    top_products,
+    top_products_sharded,
+)
 from .serializers import (
     CategorySerializer,
     FxRateSerializer,
@@ -30,8 +44,11 @@ from .serializers import (
     SaleSerializer,
     StockSerializer,
     StoreSerializer,
+    _extract_pay_currency,
 )
-from .services import adjust_stock, get_current_fx, set_fx
+from .services import adjust_stock, get_current_fx, get_fx_as_of, set_fx
+from .singleflight import single_flight
+from .sse import frames, open_subscription
 
 
 # --------- CRUD básicos ---------
@@ -61,7 +78,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"])
     def stocks(self, request, pk=None):
         product = self.get_object()
-        data = StockSerializer(product.stocks.select_related("store"), many=True).data
+        data = StockSerializer(sharding.product_stocks(product), many=True).data
         return Response(data)
 
     @action(detail=True, methods=["post"])
@@ -77,15 +94,16 @@ class ProductViewSet(viewsets.ModelViewSet):
 
         store = get_object_or_404(Store, pk=store_id)
 
-        stock, _ = Stock.objects.get_or_create(
-            product=product,
-            store=store,
-            defaults={"quantity": 0},
-        )
-        stock.quantity = int(quantity)
-        if min_threshold is not None:
-            stock.min_threshold = int(min_threshold)
-        stock.save()
+        with sharding.store_scope(store.id):
+            stock, _ = Stock.objects.get_or_create(
+                product=product,
+                store=store,
+                defaults={"quantity": 0},
+            )
+            stock.quantity = int(quantity)
+            if min_threshold is not None:
+                stock.min_threshold = int(min_threshold)
+            stock.save()
 
         product.is_active = product.total_stock > 0
         product.save(update_fields=["is_active"])
@@ -112,7 +130,8 @@ class ProductViewSet(viewsets.ModelViewSet):
         store = get_object_or_404(Store, pk=store_id)
 
         try:
-            st = adjust_stock(product=product, store=store, delta=int(delta))
+            with sharding.store_scope(store.id):
+                st = adjust_stock(product=product, store=store, delta=int(delta))
         except Exception as e:
             return Response({"detail": str(e)}, status=400)
 
@@ -162,8 +181,56 @@ class SaleViewSet(viewsets.ModelViewSet):
     serializer_class = SaleSerializer
     permission_classes = [DjangoModelPermissions]
 
+    def dispatch(self, request, *args, **kwargs):
+        # con sharding, sales/<id>/... se atiende en el shard que indica el id
+        alias = sharding.shard_for_sale(kwargs.get("pk")) if sharding.is_enabled() and "pk" in kwargs else None
+        with sharding.using_shard(alias):
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        if not sharding.is_enabled():
+            return super().get_queryset()
+        # sin select_related: sede y usuario están en default, no en el shard
+        return Sale.objects.prefetch_related("store", "created_by", "items", "items__product")
+
+    def list(self, request, *args, **kwargs):
+        if not sharding.is_enabled():
+            return super().list(request, *args, **kwargs)
+
+        def per_shard(alias):
+            with sharding.using_shard(alias):
+                return list(self.filter_queryset(self.get_queryset()).order_by("-created_at", "-id"))
+
+        # cada shard llega ordenado; los ids llevan el shard, así que el orden global es por fecha
+        sales = heapq.merge(*sharding.fan_out(per_shard), key=lambda s: (s.created_at, s.id), reverse=True)
+        return Response(self.get_serializer(list(sales), many=True).data)
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            # venta archivada: detalle y factura siguen respondiendo (solo lectura)
+            sale = archive.get_archived_sale(self.kwargs.get("pk")) if self.action in ("retrieve", "invoice") else None
+            if sale is None:
+                raise
+            self.check_object_permissions(self.request, sale)
+            return sale
+
+    def create(self, request, *args, **kwargs):
+        try:
+            return super().create(request, *args, **kwargs)
+        except group_commit.GroupCommitBusy as e:
+            return Response({"detail": str(e)}, status=503)
+
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        if group_commit.is_enabled():
+            # la validación ya corrió aquí; la escritura va al escritor único del proceso,
+            # en el lote de la BD de la sede (su shard con sharding)
+            store_id = serializer.validated_data["store"].id
+            using = sharding.shard_for_store(store_id) if sharding.is_enabled() else None
+            group_commit.submit(lambda: serializer.save(created_by=self.request.user), using=using)
+        else:
+            serializer.save(created_by=self.request.user)
 
     @action(detail=True, methods=["get"], url_path="invoice")
     def invoice(self, request, pk=None):
@@ -175,7 +242,6 @@ class SaleViewSet(viewsets.ModelViewSet):
         elif param in ("VES", "BS", "BSS"):
             currency = "VES"
         else:
-            # OJO: _extract_pay_currency debe existir donde sea que lo tengas
             currency = _extract_pay_currency(sale.notes) or "USD"
 
         pdf_bytes = render_sale_pdf(sale, currency=currency)
@@ -214,6 +280,16 @@ class FxView(APIView):
         return [IsAuthenticated()]
 
     def get(self, request):
+        # ?date=YYYY-MM-DD → tasa vigente en esa fecha (reportes históricos)
+        raw = (request.query_params.get("date") or "").strip()
+        if raw:
+            try:
+                day = datetime.strptime(raw, "%Y-%m-%d").date()
+            except ValueError:
+                return Response({"detail": "date inválida. Usa YYYY-MM-DD."}, status=400)
+            fx = get_fx_as_of(day).quantize(Decimal("0.01"))
+            return Response({"usd_to_bs": str(fx), "date": day.isoformat()})
+
         fx = get_current_fx().quantize(Decimal("0.01"))
         return Response({"usd_to_bs": str(fx)})
 
@@ -235,34 +311,37 @@ class StatsView(APIView):
     permission_classes = [DjangoModelPermissions]
     queryset = Product.objects.all()  # ✅ obligatorio para DjangoModelPermissions
 
+    @replica_reads
+    @cached_kpi("sales", "stock", "fx")
+    @single_flight
     def get(self, request):
-        from django.db.models import Sum
-        from django.db.models.functions import Coalesce
-        from django.utils import timezone
-        from datetime import timedelta
-        from decimal import Decimal
-
         queryset = self.queryset
 
-        total_products = queryset.count()
-        active_products = queryset.filter(is_active=True).count()
-        inactive_products = total_products - active_products
-
-        stock_global = Stock.objects.aggregate(
-            total=Coalesce(Sum("quantity"), 0)
-        )["total"]
-
-        stock_por_sede = list(
-            Stock.objects.values("store__code")
-            .annotate(total=Coalesce(Sum("quantity"), 0))
-            .order_by("store__code")
+        # conteos de productos en una sola consulta
+        counts = queryset.aggregate(
+            total=Count("id"),
+            active=Count("id", filter=Q(is_active=True)),
         )
+        total_products = counts["total"]
+        active_products = counts["active"]
+        inactive_products = total_products - active_products
 
-        desde = timezone.now() - timedelta(days=30)
-        ventas = Sale.objects.filter(created_at__gte=desde)
-        ventas_total_bs = ventas.aggregate(
-            s=Coalesce(Sum("total"), Decimal("0.00"))
-        )["s"]
+        # ventas: desde el resumen diario (30 días calendario, incluye hoy),
+        # no depende del tamaño del historial de Sale
+        desde = timezone.localdate() - timedelta(days=29)
+        if sharding.is_enabled():
+            stock_por_sede, ventas = stats_totals_sharded(desde)
+        else:
+            stock_por_sede = list(
+                Stock.objects.values("store__code")
+                .annotate(total=Coalesce(Sum("quantity"), 0))
+                .order_by("store__code")
+            )
+            ventas = SaleDailyRollup.objects.filter(day__gte=desde).aggregate(
+                n=Coalesce(Sum("sales_count"), 0),
+                s=Coalesce(Sum("total"), Decimal("0.00")),
+            )
+        stock_global = sum(int(r["total"] or 0) for r in stock_por_sede)
 
         fx = get_current_fx().quantize(Decimal("0.01"))
 
@@ -278,9 +357,9 @@ class StatsView(APIView):
                     "por_sede": stock_por_sede,
                 },
                 "sales_last_30d": {
-                    "count": ventas.count(),
+                    "count": int(ventas["n"] or 0),
                     "total": float(
-                        Decimal(ventas_total_bs).quantize(Decimal("0.01"))
+                        Decimal(ventas["s"]).quantize(Decimal("0.01"))
                     ),
                 },
                 "fx_usd": float(fx),
@@ -293,71 +372,239 @@ class StockAlertsView(APIView):
     permission_classes = [DjangoModelPermissions]
     queryset = Product.objects.all()  # ✅ requerido por DjangoModelPermissions
 
+    @replica_reads
+    @cached_kpi("stock")
+    @single_flight
     def get(self, request):
-        fallback_threshold = int(request.query_params.get("threshold", 5))
+        """
+        Clasificación en SQL (un GROUP BY con total y umbral anotados), paginada por categoría.
+        Query params:
+        - threshold: umbral si ningún stock define min_threshold (default 5)
+        - store: code de sede (solo cuenta los stocks de esa sede)
+        - category: low | out | inactive (default: las tres)
+        - page, page_size (default 1 y 100; máx. 500)
+        Consultas constantes: conteos + una página por categoría + stocks de los productos listados.
+        """
+        if sharding.is_enabled():
+            # la clasificación hace join de Stock con el catálogo; con sharding no hay un solo SQL
+            return Response({"detail": "Alertas de stock no disponibles con sharding."}, status=501)
+        try:
+            fallback_threshold = int(request.query_params.get("threshold", 5))
+            page = max(1, int(request.query_params.get("page", 1)))
+            page_size = min(500, max(1, int(request.query_params.get("page_size", 100))))
+        except ValueError:
+            return Response({"detail": "threshold, page y page_size deben ser enteros."}, status=400)
+
+        store_code = (request.query_params.get("store") or "").strip() or None
+
+        category = (request.query_params.get("category") or "").lower().strip()
+        if category and category not in ALERT_KINDS:
+            return Response({"detail": "category inválida. Usa: low, out, inactive"}, status=400)
+        kinds = [category] if category else list(ALERT_KINDS)
+
+        qs = stock_alerts_queryset(fallback_threshold=fallback_threshold, store_code=store_code)
+        counts = stock_alert_counts(qs)
+
+        offset = (page - 1) * page_size
+        pages = {
+            kind: list(
+                qs.filter(alert=kind)
+                .order_by("name", "id")
+                .values("id", "name", "sku", "stock_total", "threshold", "is_active")[offset:offset + page_size]
+            )
+            for kind in kinds
+        }
+
+        # stocks de los productos de la página (una consulta)
+        ids = [r["id"] for rows in pages.values() for r in rows]
+        stocks = Stock.objects.filter(product_id__in=ids).select_related("store").order_by("store__code")
+        if store_code:
+            stocks = stocks.filter(store__code=store_code)
+        detail = {}
+        for st in stocks:
+            detail.setdefault(st.product_id, []).append({
+                "store_id": st.store_id,
+                "store_code": st.store.code,
+                "quantity": int(st.quantity),
+                "min_threshold": int(st.min_threshold or 0),
+                "updated_at": st.updated_at.isoformat() if st.updated_at else None,
+            })
+
+        data = {
+            "threshold_fallback": fallback_threshold,
+            "store": store_code,
+            "page": page,
+            "page_size": page_size,
+            "counts": counts,
+        }
+        for kind, key in ALERT_KINDS.items():
+            data[key] = [
+                {
+                    "id": r["id"],
+                    "name": r["name"],
+                    "sku": r["sku"],
+                    "total_stock": int(r["stock_total"] or 0),
+                    "threshold": int(r["threshold"]),
+                    "is_active": bool(r["is_active"]),
+                    "stocks_detail": detail.get(r["id"], []),
+                }
+                for r in pages.get(kind, [])
+            ]
 
-        qs = (
-            Product.objects
-            .prefetch_related("stocks", "stocks__store")
-            .order_by("name")
-        )
+        return Response(data)
 
-        low_stock = []
-        out_of_stock = []
-        inactive = []
-
-        for p in qs:
-            total_stock = int(getattr(p, "total_stock", 0) or 0)
-
-            thresholds = []
-            for st in p.stocks.all():
-                mt = int(getattr(st, "min_threshold", 0) or 0)
-                if mt > 0:
-                    thresholds.append(mt)
-
-            effective_threshold = max(thresholds) if thresholds else fallback_threshold
-
-            item = {
-                "id": p.id,
-                "name": p.name,
-                "sku": p.sku,
-                "total_stock": total_stock,
-                "threshold": effective_threshold,
-                "is_active": bool(p.is_active),
-                "stocks_detail": [
-                    {
-                        "store_id": st.store_id,
-                        "store_code": st.store.code if st.store_id else None,
-                        "quantity": int(st.quantity),
-                        "min_threshold": int(st.min_threshold or 0),
-                        "updated_at": st.updated_at.isoformat() if getattr(st, "updated_at", None) else None,
-                    }
-                    for st in p.stocks.all()
-                ],
-            }
 
-            if not p.is_active:
-                inactive.append(item)
-                continue
+class ReorderSuggestionsView(APIView):
+    """
+    Umbrales sugeridos por `compute_reorder_points` (pronóstico de demanda + stock de seguridad).
+    Query params:
+    - store: code de sede
+    - below: 1 → solo pares con quantity <= suggested_threshold
+    - page, page_size (default 1 y 100; máx. 500). Orden: menos días de cobertura primero.
+    """
+    permission_classes = [DjangoModelPermissions]
+    queryset = Stock.objects.all()  # ✅ requerido por DjangoModelPermissions
 
-            if total_stock <= 0:
-                out_of_stock.append(item)
-            elif total_stock <= effective_threshold:
-                low_stock.append(item)
+    @replica_reads
+    @cached_kpi("stock")
+    def get(self, request):
+        try:
+            page = max(1, int(request.query_params.get("page", 1)))
+            page_size = min(500, max(1, int(request.query_params.get("page_size", 100))))
+        except ValueError:
+            return Response({"detail": "page y page_size deben ser enteros."}, status=400)
+
+        qs = ReorderSuggestion.objects.all()
+        store_code = (request.query_params.get("store") or "").strip() or None
+        if store_code:
+            qs = qs.filter(store__code=store_code)
+        if (request.query_params.get("below") or "").lower().strip() in ("1", "true", "yes"):
+            qs = qs.filter(quantity__lte=F("suggested_threshold"))
+
+        total = qs.count()
+        offset = (page - 1) * page_size
+        rows = list(
+            qs.order_by(F("days_of_cover").asc(nulls_last=True), "product__name")
+            .values(
+                "product_id", "product__sku", "product__name", "store_id", "store__code",
+                "method", "avg_daily_demand", "forecast_daily", "demand_std", "safety_stock",
+                "suggested_threshold", "quantity", "min_threshold", "days_of_cover", "computed_at",
+            )[offset:offset + page_size]
+        )
 
         return Response({
-            "threshold_fallback": fallback_threshold,
-            "low_stock": low_stock,
-            "out_of_stock": out_of_stock,
-            "inactive_products": inactive,
+            "computed_at": rows[0]["computed_at"].isoformat() if rows else None,
+            "store": store_code,
+            "count": total,
+            "page": page,
+            "page_size": page_size,
+            "results": [
+                {
+                    "product_id": r["product_id"],
+                    "sku": r["product__sku"],
+                    "name": r["product__name"],
+                    "store_id": r["store_id"],
+                    "store_code": r["store__code"],
+                    "method": r["method"],
+                    "avg_daily_demand": float(r["avg_daily_demand"]),
+                    "forecast_daily": float(r["forecast_daily"]),
+                    "demand_std": float(r["demand_std"]),
+                    "safety_stock": r["safety_stock"],
+                    "suggested_threshold": r["suggested_threshold"],
+                    "quantity": r["quantity"],
+                    "min_threshold": r["min_threshold"],
+                    "days_of_cover": float(r["days_of_cover"]) if r["days_of_cover"] is not None else None,
+                }
+                for r in rows
+            ],
         })
 
 
-class TopSellingProductsView(APIView):
+class AbcAnalysisView(APIView):
+    """
+    Clasificación ABC y rotación por producto × sede (la calcula `compute_abc`).
+    Query params:
+    - store: code de sede
+    - by: revenue (default) | units → criterio de la clase
+    - class: A | B | C
+    - page, page_size (default 1 y 100; máx. 500). Orden: mayor ingreso/unidades primero.
+    """
     permission_classes = [DjangoModelPermissions]
+    queryset = Stock.objects.all()  # ✅ requerido por DjangoModelPermissions
 
-    # ✅ obligatorio para DjangoModelPermissions (elige un modelo “representativo”)
-    queryset = SaleItem.objects.all()
+    @replica_reads
+    @cached_kpi("stock")
+    def get(self, request):
+        try:
+            page = max(1, int(request.query_params.get("page", 1)))
+            page_size = min(500, max(1, int(request.query_params.get("page_size", 100))))
+        except ValueError:
+            return Response({"detail": "page y page_size deben ser enteros."}, status=400)
+
+        by = (request.query_params.get("by") or "revenue").lower().strip()
+        if by not in ("revenue", "units"):
+            return Response({"detail": "by inválido. Usa: revenue, units"}, status=400)
+        cls_field = "abc_revenue" if by == "revenue" else "abc_units"
+
+        qs = AbcAnalysis.objects.all()
+        store_code = (request.query_params.get("store") or "").strip() or None
+        if store_code:
+            qs = qs.filter(store__code=store_code)
+
+        counts = {c: 0 for c in "ABC"}
+        for row in qs.values(cls_field).annotate(n=Count("id")):
+            counts[row[cls_field]] = row["n"]
+
+        cls = (request.query_params.get("class") or "").upper().strip()
+        if cls:
+            if cls not in counts:
+                return Response({"detail": "class inválida. Usa: A, B, C"}, status=400)
+            qs = qs.filter(**{cls_field: cls})
+
+        total = qs.count()
+        offset = (page - 1) * page_size
+        rows = list(
+            qs.order_by(f"-{by}", "product__name")
+            .values(
+                "product_id", "product__sku", "product__name", "store_id", "store__code", "days",
+                "units", "revenue", "revenue_usd", "revenue_share", "abc_revenue", "abc_units",
+                "quantity", "turnover", "days_on_hand", "computed_at",
+            )[offset:offset + page_size]
+        )
+
+        return Response({
+            "computed_at": rows[0]["computed_at"].isoformat() if rows else None,
+            "store": store_code,
+            "by": by,
+            "counts": counts,
+            "count": total,
+            "page": page,
+            "page_size": page_size,
+            "results": [
+                {
+                    "product_id": r["product_id"],
+                    "sku": r["product__sku"],
+                    "name": r["product__name"],
+                    "store_id": r["store_id"],
+                    "store_code": r["store__code"],
+                    "days": r["days"],
+                    "units": r["units"],
+                    "revenue_bs": float(r["revenue"]),
+                    "revenue_usd": float(r["revenue_usd"]),
+                    "revenue_share": float(r["revenue_share"]),
+                    "abc_revenue": r["abc_revenue"],
+                    "abc_units": r["abc_units"],
+                    "quantity": r["quantity"],
+                    "turnover": float(r["turnover"]),
+                    "days_on_hand": float(r["days_on_hand"]) if r["days_on_hand"] is not None else None,
+                }
+                for r in rows
+            ],
+        })
+
+
+class PeriodRangeMixin:
+    """Rangos week/month/year y parseo de start/end (ISO) compartidos por los KPIs de ventas."""
 
     def _period_range(self, period: str, now=None):
         now = now or timezone.now()
@@ -393,6 +640,16 @@ class TopSellingProductsView(APIView):
         except Exception:
             return None
 
+
+class TopSellingProductsView(PeriodRangeMixin, APIView):
+    permission_classes = [DjangoModelPermissions]
+
+    # ✅ obligatorio para DjangoModelPermissions (elige un modelo “representativo”)
+    queryset = SaleItem.objects.all()
+
+    @replica_reads
+    @cached_kpi("sales")
+    @single_flight
     def get(self, request):
         period = (request.query_params.get("period") or "month").lower().strip()
         limit = int(request.query_params.get("limit", 10))
@@ -406,16 +663,8 @@ class TopSellingProductsView(APIView):
             except ValueError:
                 return Response({"detail": "period inválido. Usa: week, month, year"}, status=400)
 
-        qs = (
-            SaleItem.objects
-            .filter(sale__created_at__gte=start, sale__created_at__lt=end)
-            .values("product_id", "product__name", "product__sku")
-            .annotate(
-                total_units=Coalesce(Sum("quantity"), 0),
-                total_sales_lines=Coalesce(Count("id"), 0),
-            )
-            .order_by("-total_units", "-total_sales_lines", "product__name")
-        )
+        # días completos → resumen diario por producto; rango con horas → SaleItem
+        qs = top_products_sharded(start, end) if sharding.is_enabled() else top_products(start, end)
 
         rows = [
             {
@@ -435,4 +684,171 @@ class TopSellingProductsView(APIView):
                 "best_seller": rows[0] if rows else None,
                 "top_products": rows,
             }
-        )
\ No newline at end of file
+        )
+
+
+class SalesTimeSeriesView(PeriodRangeMixin, APIView):
+    """
+    Serie temporal de ventas en arrays paralelos, con buckets vacíos en cero.
+    Query params:
+    - bucket: hour | day | week | month (default day)
+    - start/end (ISO) o period: week | month | year (default month)
+    - store: code de sede; payment_method: PAGO_MOVIL | PUNTO | DIVISAS | USDT
+    """
+    permission_classes = [DjangoModelPermissions]
+    queryset = Sale.objects.all()  # ✅ requerido por DjangoModelPermissions
+
+    @replica_reads
+    @cached_kpi("sales")
+    @single_flight
+    def get(self, request):
+        bucket = (request.query_params.get("bucket") or "day").lower().strip()
+        period = (request.query_params.get("period") or "month").lower().strip()
+        store_code = (request.query_params.get("store") or "").strip() or None
+        payment_method = (request.query_params.get("payment_method") or "").upper().strip() or None
+
+        start = self._parse_dt(request.query_params.get("start"))
+        end = self._parse_dt(request.query_params.get("end"))
+
+        if not (start and end):
+            try:
+                start, end = self._period_range(period)
+            except ValueError:
+                return Response({"detail": "period inválido. Usa: week, month, year"}, status=400)
+
+        if end <= start:
+            return Response({"detail": "end debe ser posterior a start."}, status=400)
+
+        try:
+            series = sales_timeseries(start, end, bucket, store_code=store_code, payment_method=payment_method)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        return Response(
+            {
+                "range": {"start": start.isoformat(), "end": end.isoformat()},
+                "bucket": bucket,
+                "store": store_code,
+                "payment_method": payment_method,
+                **series,
+            }
+        )
+
+
+# ------------------ REPORTES ------------------
+
+class SalesPivotView(PeriodRangeMixin, APIView):
+    """
+    Pivot de ventas por cualquier combinación de sede, categoría, forma de pago y periodo.
+    Query params:
+    - by: dims separadas por coma (store, category, payment_method, period). Default: store,period
+    - bucket: day | week | month | quarter | year (para period, default month)
+    - start/end (ISO) o period: week | month | year (default year)
+    - filtros: store (code), category (slug), payment_method
+    """
+    permission_classes = [DjangoModelPermissions]
+    queryset = SaleItem.objects.all()  # ✅ requerido por DjangoModelPermissions
+
+    @replica_reads
+    @cached_kpi("sales")
+    @single_flight
+    def get(self, request):
+        if sharding.is_enabled():
+            return Response({"detail": "Pivot de ventas no disponible con sharding."}, status=501)
+        dims = [d.strip().lower() for d in request.query_params.get("by", "store,period").split(",") if d.strip()]
+        bucket = (request.query_params.get("bucket") or "month").lower().strip()
+        period = (request.query_params.get("period") or "year").lower().strip()
+
+        start = self._parse_dt(request.query_params.get("start"))
+        end = self._parse_dt(request.query_params.get("end"))
+        if not (start and end):
+            try:
+                start, end = self._period_range(period)
+            except ValueError:
+                return Response({"detail": "period inválido. Usa: week, month, year"}, status=400)
+
+        try:
+            data = pivot_sales(
+                start, end,
+                dims=dims,
+                bucket=bucket,
+                store_code=(request.query_params.get("store") or "").strip() or None,
+                category=(request.query_params.get("category") or "").strip() or None,
+                payment_method=(request.query_params.get("payment_method") or "").upper().strip() or None,
+            )
+        except AnalyticsUnavailable as e:
+            return Response({"detail": str(e)}, status=503)
+        except ValueError as e:
+            return Response({"detail": str(e), "dims_disponibles": list(PIVOT_DIMS)}, status=400)
+
+        return Response({"range": {"start": start.isoformat(), "end": end.isoformat()}, **data})
+
+
+# ------------------ EVENTOS EN VIVO (SSE) ------------------
+
+async def events_stream(request):
+    """
+    GET text/event-stream: stock, low_stock / out_of_stock / restocked, sale y fx.
+    Query params:
+    - store: code de sede (los eventos sin sede, como fx, llegan siempre)
+    - types: lista separada por comas (default: todos)
+    Reanuda con el header Last-Event-ID (o ?last_event_id=); si el id ya no está en el
+    buffer se envía primero un evento `reset` para que el cliente recargue su estado.
+    Bajo ASGI esta ruta la atiende inventory.sse.application (ver core/asgi.py);
+    esta vista cubre runserver/WSGI, donde cada conexión ocupa un hilo.
+    """
+    error, result = await open_subscription(request)
+    if error:
+        return JsonResponse({"detail": result}, status=error)
+
+    response = StreamingHttpResponse(frames(*result), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: no bufferizar el stream
+    return response
+
+
+# ------------------ PROFILER (solo admin) ------------------
+
+class ProfilesView(APIView):
+    """
+    GET: perfiles guardados (más recientes primero) y estado armado.
+    POST {"path": "/api/inventory/sales/", "count": 1, "ttl": 600}: perfila las próximas
+    `count` requests cuya ruta empiece con path. DELETE: desarma.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "enabled": profiler.is_enabled(),
+            "armed": profiler.armed_state(),
+            "results": profiler.list_profiles(),
+        })
+
+    def post(self, request):
+        path = str(request.data.get("path") or "").strip()
+        if not path.startswith("/"):
+            return Response({"detail": "path debe empezar con '/'."}, status=400)
+        try:
+            count = int(request.data.get("count") or 1)
+            ttl = int(request.data.get("ttl") or 600)
+        except (TypeError, ValueError):
+            return Response({"detail": "count y ttl deben ser enteros."}, status=400)
+        if not (1 <= count <= 100 and 1 <= ttl <= 86400):
+            return Response({"detail": "count: 1..100, ttl: 1..86400 segundos."}, status=400)
+        if not profiler.is_enabled():
+            return Response({"detail": "PROFILER_ENABLED está apagado."}, status=409)
+        return Response(profiler.arm(path, count=count, ttl=ttl), status=201)
+
+    def delete(self, request):
+        profiler.disarm()
+        return Response(status=204)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_download(request, name):
+    """Descarga un perfil en formato folded (flamegraph.pl / speedscope)."""
+    path = profiler.profile_path(name)
+    if path is None:
+        return Response({"detail": "Perfil no encontrado."}, status=404)
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=name, content_type="text/plain")